@@ -3,6 +3,7 @@ from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 from alembic import context
 import os
+import re
 import sys
 
 # Add the backend directory to the path
@@ -32,6 +33,17 @@ target_metadata = Base.metadata
 def get_url():
     return settings.DATABASE_URL
 
+# Індекси лише для PostgreSQL, створені міграціями поза моделями
+MIGRATION_ONLY_INDEXES = {"ix_photos_filename_c"}
+
+def include_name(name, type_, parent_names):
+    # FTS5-таблиці пошуку в SQLite (та їх службові *_fts_*) створюються міграцією 0009 поза моделями
+    if type_ == "table":
+        return not re.match(r"^\w+_fts(_\w+)?$", name)
+    if type_ == "index":
+        return name not in MIGRATION_ONLY_INDEXES
+    return True
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -48,6 +60,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_name=include_name,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -73,7 +86,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_name=include_name
         )
 
         with context.begin_transaction():
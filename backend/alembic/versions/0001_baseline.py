@@ -0,0 +1,139 @@
+"""baseline schema
+
+Creates the tables that main.py used to create with Base.metadata.create_all.
+Databases that were already created that way keep their tables: existing
+tables are skipped, so `alembic upgrade head` adopts them.
+
+Revision ID: 0001_baseline
+Revises: 
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_baseline'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # В offline-режимі (--sql) з'єднання немає - генеруємо повну схему
+    if op.get_context().as_sql:
+        existing = set()
+    else:
+        existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'users' not in existing:
+        op.create_table(
+            'users',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('email', sa.String(), nullable=False),
+            sa.Column('name', sa.String(), nullable=False),
+            sa.Column('phone', sa.String(), nullable=True),
+            sa.Column('hashed_password', sa.String(), nullable=False),
+            sa.Column('is_active', sa.Boolean(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+        op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+
+    if 'contact_messages' not in existing:
+        op.create_table(
+            'contact_messages',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(), nullable=False),
+            sa.Column('email', sa.String(), nullable=False),
+            sa.Column('message', sa.Text(), nullable=False),
+            sa.Column('is_read', sa.Boolean(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_contact_messages_id'), 'contact_messages', ['id'], unique=False)
+
+    if 'galleries' not in existing:
+        op.create_table(
+            'galleries',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(), nullable=False),
+            sa.Column('shooting_date', sa.DateTime(), nullable=False),
+            sa.Column('is_public', sa.Boolean(), nullable=True),
+            sa.Column('is_password_protected', sa.Boolean(), nullable=True),
+            sa.Column('password_hash', sa.String(), nullable=True),
+            sa.Column('cover_photo_id', sa.Integer(), nullable=True),
+            sa.Column('view_count', sa.Integer(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('owner_id', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_galleries_id'), 'galleries', ['id'], unique=False)
+
+    if 'scenes' not in existing:
+        op.create_table(
+            'scenes',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(), nullable=False),
+            sa.Column('order_index', sa.Integer(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('gallery_id', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['gallery_id'], ['galleries.id'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_scenes_id'), 'scenes', ['id'], unique=False)
+
+    if 'photos' not in existing:
+        op.create_table(
+            'photos',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('filename', sa.String(), nullable=False),
+            sa.Column('original_filename', sa.String(), nullable=False),
+            sa.Column('file_path', sa.String(), nullable=False),
+            sa.Column('file_size', sa.Integer(), nullable=False),
+            sa.Column('mime_type', sa.String(), nullable=False),
+            sa.Column('width', sa.Integer(), nullable=True),
+            sa.Column('height', sa.Integer(), nullable=True),
+            sa.Column('order_index', sa.Integer(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column('scene_id', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['scene_id'], ['scenes.id'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_photos_id'), 'photos', ['id'], unique=False)
+
+    if 'user_favorites' not in existing:
+        op.create_table(
+            'user_favorites',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=True),
+            sa.Column('session_id', sa.String(), nullable=True),
+            sa.Column('photo_id', sa.Integer(), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.ForeignKeyConstraint(['photo_id'], ['photos.id'], ),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_user_favorites_id'), 'user_favorites', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_user_favorites_id'), table_name='user_favorites')
+    op.drop_table('user_favorites')
+    op.drop_index(op.f('ix_photos_id'), table_name='photos')
+    op.drop_table('photos')
+    op.drop_index(op.f('ix_scenes_id'), table_name='scenes')
+    op.drop_table('scenes')
+    op.drop_index(op.f('ix_galleries_id'), table_name='galleries')
+    op.drop_table('galleries')
+    op.drop_index(op.f('ix_contact_messages_id'), table_name='contact_messages')
+    op.drop_table('contact_messages')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
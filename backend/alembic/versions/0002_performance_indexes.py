@@ -0,0 +1,45 @@
+"""performance indexes
+
+Indexes for the foreign keys and ORDER BY columns the routers filter on.
+On PostgreSQL they are built CONCURRENTLY, outside a transaction, so
+writes to photos/scenes are not blocked while a large table is indexed.
+If a concurrent build fails it leaves an INVALID index behind - drop it
+and run the upgrade again.
+
+Revision ID: 0002_performance_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_performance_indexes'
+down_revision = '0001_baseline'
+branch_labels = None
+depends_on = None
+
+# (name, table, columns)
+INDEXES = [
+    ('ix_galleries_owner_id', 'galleries', ['owner_id']),
+    ('ix_scenes_gallery_id_order_index', 'scenes', ['gallery_id', 'order_index']),
+    ('ix_photos_scene_id_order_index', 'photos', ['scene_id', 'order_index']),
+    ('ix_photos_filename', 'photos', ['filename']),
+    ('ix_user_favorites_photo_id', 'user_favorites', ['photo_id']),
+    ('ix_user_favorites_user_id_photo_id', 'user_favorites', ['user_id', 'photo_id']),
+    ('ix_user_favorites_session_id_photo_id', 'user_favorites', ['session_id', 'photo_id']),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY не можна виконувати всередині транзакції
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,78 @@
+"""denormalize gallery_id and owner_id onto photos
+
+Gallery-wide queries and ownership checks on photos no longer have to join
+scenes and galleries. The columns are added nullable, backfilled in id
+batches that commit one at a time (no long table lock), then made NOT NULL
+with foreign keys. Indexes are built CONCURRENTLY on PostgreSQL.
+
+Revision ID: 0003_photo_gallery_owner
+Revises: 0002_performance_indexes
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_photo_gallery_owner'
+down_revision = '0002_performance_indexes'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH = 10000
+
+BACKFILL_SQL = """
+    UPDATE photos SET
+        gallery_id = (SELECT scenes.gallery_id FROM scenes WHERE scenes.id = photos.scene_id),
+        owner_id = (
+            SELECT galleries.owner_id FROM scenes
+            JOIN galleries ON galleries.id = scenes.gallery_id
+            WHERE scenes.id = photos.scene_id
+        )
+    WHERE photos.gallery_id IS NULL
+"""
+BACKFILL_RANGE = sa.text(BACKFILL_SQL + " AND photos.id BETWEEN :low AND :high")
+
+
+def upgrade() -> None:
+    op.add_column('photos', sa.Column('gallery_id', sa.Integer(), nullable=True))
+    op.add_column('photos', sa.Column('owner_id', sa.Integer(), nullable=True))
+
+    if op.get_context().as_sql:
+        op.execute(BACKFILL_SQL)
+    else:
+        bind = op.get_bind()
+        low, high = bind.execute(sa.text("SELECT min(id), max(id) FROM photos")).one()
+        if low is not None:
+            with op.get_context().autocommit_block():
+                for start in range(low, high + 1, BACKFILL_BATCH):
+                    bind.execute(BACKFILL_RANGE, {"low": start, "high": start + BACKFILL_BATCH - 1})
+            # Фото, які старий код встиг додати під час backfill
+            low, high = bind.execute(sa.text("SELECT min(id), max(id) FROM photos WHERE gallery_id IS NULL")).one()
+            if low is not None:
+                bind.execute(BACKFILL_RANGE, {"low": low, "high": high})
+
+    with op.batch_alter_table('photos') as batch_op:
+        batch_op.alter_column('gallery_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.alter_column('owner_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key('fk_photos_gallery_id_galleries', 'galleries', ['gallery_id'], ['id'])
+        batch_op.create_foreign_key('fk_photos_owner_id_users', 'users', ['owner_id'], ['id'])
+
+    with op.get_context().autocommit_block():
+        op.create_index('ix_photos_gallery_id_order_index', 'photos', ['gallery_id', 'order_index'],
+                        if_not_exists=True, postgresql_concurrently=True)
+        op.create_index('ix_photos_owner_id', 'photos', ['owner_id'],
+                        if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_photos_owner_id', table_name='photos', if_exists=True, postgresql_concurrently=True)
+        op.drop_index('ix_photos_gallery_id_order_index', table_name='photos', if_exists=True, postgresql_concurrently=True)
+
+    with op.batch_alter_table('photos') as batch_op:
+        batch_op.drop_constraint('fk_photos_owner_id_users', type_='foreignkey')
+        batch_op.drop_constraint('fk_photos_gallery_id_galleries', type_='foreignkey')
+        batch_op.drop_column('owner_id')
+        batch_op.drop_column('gallery_id')
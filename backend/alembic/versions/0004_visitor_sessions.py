@@ -0,0 +1,133 @@
+"""gallery-scoped visitor sessions for anonymous favorites
+
+Anonymous favorites used to be keyed by a free-form session_id string on
+user_favorites, so every lookup scanned a visitor's favorites across all
+galleries and abandoned sessions were never removed. Each (session_id,
+gallery) pair becomes a row in visitor_sessions with a last_seen_at used for
+expiry, favorites point to it (ON DELETE CASCADE) and carry the gallery_id
+of their photo. Backfills run in id batches like 0003.
+
+Revision ID: 0004_visitor_sessions
+Revises: 0003_photo_gallery_owner
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_visitor_sessions'
+down_revision = '0003_photo_gallery_owner'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH = 10000
+
+GALLERY_SQL = """
+    UPDATE user_favorites SET
+        gallery_id = (SELECT photos.gallery_id FROM photos WHERE photos.id = user_favorites.photo_id)
+    WHERE user_favorites.gallery_id IS NULL
+"""
+
+SESSIONS_SQL = """
+    INSERT INTO visitor_sessions (token, gallery_id, created_at, last_seen_at)
+    SELECT session_id, gallery_id, min(created_at), coalesce(max(created_at), CURRENT_TIMESTAMP)
+    FROM user_favorites
+    WHERE user_id IS NULL AND session_id IS NOT NULL
+    GROUP BY session_id, gallery_id
+"""
+
+SESSION_ID_SQL = """
+    UPDATE user_favorites SET
+        visitor_session_id = (
+            SELECT visitor_sessions.id FROM visitor_sessions
+            WHERE visitor_sessions.token = user_favorites.session_id
+            AND visitor_sessions.gallery_id = user_favorites.gallery_id
+        )
+    WHERE user_favorites.user_id IS NULL AND user_favorites.visitor_session_id IS NULL
+"""
+
+# Обрані без користувача і без сесії ніхто не може побачити
+ORPHANS_SQL = "DELETE FROM user_favorites WHERE user_id IS NULL AND session_id IS NULL"
+
+
+def _backfill(sql: str) -> None:
+    if op.get_context().as_sql:
+        op.execute(sql)
+        return
+    bind = op.get_bind()
+    low, high = bind.execute(sa.text("SELECT min(id), max(id) FROM user_favorites")).one()
+    if low is None:
+        return
+    statement = sa.text(sql + " AND user_favorites.id BETWEEN :low AND :high")
+    with op.get_context().autocommit_block():
+        for start in range(low, high + 1, BACKFILL_BATCH):
+            bind.execute(statement, {"low": start, "high": start + BACKFILL_BATCH - 1})
+
+
+def upgrade() -> None:
+    op.create_table(
+        'visitor_sessions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('token', sa.String(), nullable=False),
+        sa.Column('gallery_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('last_seen_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['gallery_id'], ['galleries.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('token', 'gallery_id', name='uq_visitor_sessions_token_gallery_id'),
+    )
+    op.create_index(op.f('ix_visitor_sessions_id'), 'visitor_sessions', ['id'])
+    op.create_index(op.f('ix_visitor_sessions_last_seen_at'), 'visitor_sessions', ['last_seen_at'])
+
+    op.add_column('user_favorites', sa.Column('gallery_id', sa.Integer(), nullable=True))
+    op.add_column('user_favorites', sa.Column('visitor_session_id', sa.Integer(), nullable=True))
+
+    op.execute(ORPHANS_SQL)
+    _backfill(GALLERY_SQL)
+    op.execute(SESSIONS_SQL)
+    _backfill(SESSION_ID_SQL)
+
+    with op.batch_alter_table('user_favorites') as batch_op:
+        batch_op.drop_index('ix_user_favorites_session_id_photo_id')
+        batch_op.drop_column('session_id')
+        batch_op.alter_column('gallery_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key('fk_user_favorites_gallery_id_galleries', 'galleries', ['gallery_id'], ['id'])
+        batch_op.create_foreign_key('fk_user_favorites_visitor_session_id_visitor_sessions', 'visitor_sessions',
+                                    ['visitor_session_id'], ['id'], ondelete='CASCADE')
+
+    with op.get_context().autocommit_block():
+        op.create_index('ix_user_favorites_visitor_session_id_photo_id', 'user_favorites',
+                        ['visitor_session_id', 'photo_id'], if_not_exists=True, postgresql_concurrently=True)
+        op.create_index('ix_user_favorites_gallery_id_user_id', 'user_favorites', ['gallery_id', 'user_id'],
+                        if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_user_favorites_gallery_id_user_id', table_name='user_favorites',
+                      if_exists=True, postgresql_concurrently=True)
+        op.drop_index('ix_user_favorites_visitor_session_id_photo_id', table_name='user_favorites',
+                      if_exists=True, postgresql_concurrently=True)
+
+    op.add_column('user_favorites', sa.Column('session_id', sa.String(), nullable=True))
+    op.execute("""
+        UPDATE user_favorites SET
+            session_id = (
+                SELECT visitor_sessions.token FROM visitor_sessions
+                WHERE visitor_sessions.id = user_favorites.visitor_session_id
+            )
+        WHERE visitor_session_id IS NOT NULL
+    """)
+
+    with op.batch_alter_table('user_favorites') as batch_op:
+        batch_op.drop_constraint('fk_user_favorites_visitor_session_id_visitor_sessions', type_='foreignkey')
+        batch_op.drop_constraint('fk_user_favorites_gallery_id_galleries', type_='foreignkey')
+        batch_op.drop_column('visitor_session_id')
+        batch_op.drop_column('gallery_id')
+        batch_op.create_index('ix_user_favorites_session_id_photo_id', ['session_id', 'photo_id'])
+
+    op.drop_index(op.f('ix_visitor_sessions_last_seen_at'), table_name='visitor_sessions')
+    op.drop_index(op.f('ix_visitor_sessions_id'), table_name='visitor_sessions')
+    op.drop_table('visitor_sessions')
@@ -0,0 +1,29 @@
+"""photo placeholders and dominant color
+
+Existing photos keep NULL until backfill_photo_metadata.py has processed them.
+
+Revision ID: 0006_photo_placeholders
+Revises: 0005_upload_sessions
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_photo_placeholders'
+down_revision = '0005_upload_sessions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('photos', sa.Column('placeholder', sa.String(), nullable=True))
+    op.add_column('photos', sa.Column('dominant_color', sa.String(length=7), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('photos') as batch_op:
+        batch_op.drop_column('dominant_color')
+        batch_op.drop_column('placeholder')
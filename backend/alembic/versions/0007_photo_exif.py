@@ -0,0 +1,46 @@
+"""photo EXIF details and capture-time indexes
+
+Existing photos keep NULL (orientation NULL marks them as not yet read)
+until backfill_photo_metadata.py has processed them.
+
+Revision ID: 0007_photo_exif
+Revises: 0006_photo_placeholders
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007_photo_exif'
+down_revision = '0006_photo_placeholders'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('photos', sa.Column('taken_at', sa.DateTime(), nullable=True))
+    op.add_column('photos', sa.Column('camera', sa.String(), nullable=True))
+    op.add_column('photos', sa.Column('lens', sa.String(), nullable=True))
+    op.add_column('photos', sa.Column('focal_length', sa.Float(), nullable=True))
+    op.add_column('photos', sa.Column('orientation', sa.Integer(), nullable=True))
+
+    with op.get_context().autocommit_block():
+        op.create_index('ix_photos_scene_id_taken_at', 'photos', ['scene_id', 'taken_at'],
+                        if_not_exists=True, postgresql_concurrently=True)
+        op.create_index('ix_photos_gallery_id_taken_at', 'photos', ['gallery_id', 'taken_at'],
+                        if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_photos_gallery_id_taken_at', table_name='photos', if_exists=True, postgresql_concurrently=True)
+        op.drop_index('ix_photos_scene_id_taken_at', table_name='photos', if_exists=True, postgresql_concurrently=True)
+
+    with op.batch_alter_table('photos') as batch_op:
+        batch_op.drop_column('orientation')
+        batch_op.drop_column('focal_length')
+        batch_op.drop_column('lens')
+        batch_op.drop_column('camera')
+        batch_op.drop_column('taken_at')
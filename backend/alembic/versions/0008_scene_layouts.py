@@ -0,0 +1,45 @@
+"""precomputed justified layouts of scenes
+
+Revision ID: 0008_scene_layouts
+Revises: 0007_photo_exif
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008_scene_layouts'
+down_revision = '0007_photo_exif'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Стала серверна default - у PostgreSQL 11+ колонка додається без переписування таблиці
+    op.add_column('scenes', sa.Column('layout_version', sa.Integer(), server_default='0', nullable=False))
+    # Таблиця - лише кеш: розкладки рахуються при першому запиті, бекфіл не потрібен
+    op.create_table(
+        'scene_layouts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('scene_id', sa.Integer(), nullable=False),
+        sa.Column('viewport_width', sa.Integer(), nullable=False),
+        sa.Column('photo_ids', sa.JSON(), nullable=False),
+        sa.Column('aspects', sa.JSON(), nullable=False),
+        sa.Column('row_starts', sa.JSON(), nullable=False),
+        sa.Column('row_heights', sa.JSON(), nullable=False),
+        sa.Column('scene_version', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['scene_id'], ['scenes.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('scene_id', 'viewport_width', name='uq_scene_layouts_scene_id_viewport_width'),
+    )
+    op.create_index(op.f('ix_scene_layouts_id'), 'scene_layouts', ['id'])
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_scene_layouts_id'), table_name='scene_layouts')
+    op.drop_table('scene_layouts')
+    with op.batch_alter_table('scenes') as batch_op:
+        batch_op.drop_column('layout_version')
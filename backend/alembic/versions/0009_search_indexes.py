@@ -0,0 +1,84 @@
+"""search indexes over gallery, scene and photo names
+
+PostgreSQL gets pg_trgm and expression GIN indexes: a tsvector index for word
+prefix matches and a trigram index for substring matches and similarity. The
+expressions must match search.py exactly or the planner will not use them.
+SQLite gets FTS5 trigram tables kept in sync by triggers (models.SEARCH_COLUMNS).
+
+Revision ID: 0009_search_indexes
+Revises: 0008_scene_layouts
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009_search_indexes'
+down_revision = '0008_scene_layouts'
+branch_labels = None
+depends_on = None
+
+SEARCH_TEXT = {
+    'galleries': "lower(name)",
+    'scenes': "lower(name)",
+    'photos': "lower(coalesce(original_filename, '') || ' ' || coalesce(camera, '') || ' ' || coalesce(lens, ''))",
+}
+
+# Копія models.SEARCH_COLUMNS на момент міграції
+FTS_COLUMNS = {
+    'galleries': ['name'],
+    'scenes': ['name'],
+    'photos': ['original_filename', 'camera', 'lens'],
+}
+
+
+def _fts_statements(table, columns):
+    fts = f"{table}_fts"
+    names = ", ".join(columns)
+    new = ", ".join(f"new.{column}" for column in columns)
+    old = ", ".join(f"old.{column}" for column in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({names}, content='{table}', content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {names} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new}); END",
+        # Наповнення з уже наявних рядків
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def upgrade() -> None:
+    if op.get_context().dialect.name == 'sqlite':
+        for table, columns in FTS_COLUMNS.items():
+            for statement in _fts_statements(table, columns):
+                op.execute(statement)
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        for table, text in SEARCH_TEXT.items():
+            op.create_index(f'ix_{table}_search_tsv', table, [sa.text(f"to_tsvector('simple', {text})")],
+                            postgresql_using='gin', if_not_exists=True, postgresql_concurrently=True)
+            op.create_index(f'ix_{table}_search_trgm', table, [sa.text(f"({text}) gin_trgm_ops")],
+                            postgresql_using='gin', if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name == 'sqlite':
+        for table in FTS_COLUMNS:
+            for suffix in ('ai', 'ad', 'au'):
+                op.execute(f"DROP TRIGGER IF EXISTS {table}_fts_{suffix}")
+            op.execute(f"DROP TABLE IF EXISTS {table}_fts")
+        return
+
+    # Розширення pg_trgm лишається - його можуть використовувати інші об'єкти бази
+    with op.get_context().autocommit_block():
+        for table in SEARCH_TEXT:
+            op.drop_index(f'ix_{table}_search_trgm', table_name=table, if_exists=True, postgresql_concurrently=True)
+            op.drop_index(f'ix_{table}_search_tsv', table_name=table, if_exists=True, postgresql_concurrently=True)
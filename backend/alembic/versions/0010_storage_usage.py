@@ -0,0 +1,46 @@
+"""storage usage counters and per-user quota
+
+The counters are filled from existing photos here; afterwards the
+application maintains them and reconcile_usage.py repairs drift.
+
+Revision ID: 0010_storage_usage
+Revises: 0009_search_indexes
+Create Date: 2026-10-20 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0010_storage_usage'
+down_revision = '0009_search_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    for table in ('users', 'galleries'):
+        op.add_column(table, sa.Column('storage_bytes', sa.BigInteger(), server_default='0', nullable=False))
+        op.add_column(table, sa.Column('photo_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('users', sa.Column('storage_quota', sa.BigInteger(), nullable=True))
+
+    # Лише рядки з фото; решта вже має 0 із server_default
+    for table, column in (('users', 'owner_id'), ('galleries', 'gallery_id')):
+        op.execute(
+            f"UPDATE {table} SET "
+            f"storage_bytes = (SELECT coalesce(sum(file_size), 0) FROM photos WHERE photos.{column} = {table}.id), "
+            f"photo_count = (SELECT count(*) FROM photos WHERE photos.{column} = {table}.id) "
+            f"WHERE EXISTS (SELECT 1 FROM photos WHERE photos.{column} = {table}.id)"
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('storage_quota')
+        batch_op.drop_column('photo_count')
+        batch_op.drop_column('storage_bytes')
+    # Без перестворення таблиці: у SQLite воно знищило б FTS-тригери galleries з 0009
+    with op.batch_alter_table('galleries', recreate='never') as batch_op:
+        batch_op.drop_column('photo_count')
+        batch_op.drop_column('storage_bytes')
@@ -0,0 +1,36 @@
+"""byte-order index over photo filenames for the storage sweeper
+
+sweep_orphans.py reads photos in S3 key order (ORDER BY filename COLLATE "C",
+id) to merge-join them with the bucket listing. In PostgreSQL the regular
+ix_photos_filename follows the database collation and cannot serve that
+order; SQLite compares with BINARY by default and needs nothing.
+
+Revision ID: 0011_photo_filename_order
+Revises: 0010_storage_usage
+Create Date: 2026-10-20 01:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0011_photo_filename_order'
+down_revision = '0010_storage_usage'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_context().dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        op.create_index('ix_photos_filename_c', 'photos', [sa.text('filename COLLATE "C"'), 'id'],
+                        if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_photos_filename_c', table_name='photos', if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,42 @@
+"""cold tier: gallery storage tier, last view and restore queue, archived photos
+
+Galleries start hot; last_viewed_at stays NULL until the next public view,
+so archive.py ages never-viewed galleries by created_at.
+
+Revision ID: 0012_cold_tier
+Revises: 0011_photo_filename_order
+Create Date: 2026-10-20 02:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0012_cold_tier'
+down_revision = '0011_photo_filename_order'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('galleries', sa.Column('storage_tier', sa.String(length=16), server_default='hot', nullable=False))
+    op.add_column('galleries', sa.Column('last_viewed_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('galleries', sa.Column('restore_requested_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('photos', sa.Column('archived', sa.Boolean(), server_default=sa.false(), nullable=False))
+    with op.get_context().autocommit_block():
+        op.create_index('ix_galleries_storage_tier_restore_requested_at', 'galleries',
+                        ['storage_tier', 'restore_requested_at'], if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_galleries_storage_tier_restore_requested_at', table_name='galleries',
+                      if_exists=True, postgresql_concurrently=True)
+    # Без перестворення таблиць: у SQLite воно знищило б FTS-тригери з 0009
+    with op.batch_alter_table('photos', recreate='never') as batch_op:
+        batch_op.drop_column('archived')
+    with op.batch_alter_table('galleries', recreate='never') as batch_op:
+        batch_op.drop_column('restore_requested_at')
+        batch_op.drop_column('last_viewed_at')
+        batch_op.drop_column('storage_tier')
@@ -0,0 +1,218 @@
+"""Cold tier for galleries nobody has viewed for a while.
+
+A gallery without public views for ARCHIVE_AFTER_DAYS becomes cold and
+archive_galleries() moves the originals of its photos to archive_storage
+(the archive bucket or directory). Photo.archived tells which tier holds
+an object. Placeholders, dimensions and colours stay in the database, so
+listings and layouts of a cold gallery touch no storage at all.
+
+A public view of a cold gallery, or a view of one of its photos, queues it
+for restore (storage_tier = restoring, ordered by restore_requested_at);
+meanwhile photos are served straight from the archive. restore_galleries()
+works the queue and moves the objects back.
+
+Objects move copy -> commit -> delete, so the tier a row points to always
+has the object. Photos uploaded after the cutoff stay hot in a cold gallery.
+Both jobs take the same advisory lock, so only one worker moves objects.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import Session
+from database import advisory_lock
+from models import Gallery, Photo
+from ordering import bulk_update
+from storage import storage_service, archive_storage, COPY_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+TIER_HOT = "hot"
+TIER_COLD = "cold"
+TIER_RESTORING = "restoring"
+
+# Фото за одну транзакцію; їхні рядки заблоковані, поки копіюється пачка
+ARCHIVE_BATCH = 100
+
+# Архівація й відновлення - під одним блокуванням: інакше відновлення могло б скопіювати
+# об'єкт назад, поки архівація ще видаляє його з гарячого рівня
+TIER_LOCK = "storage_tiers"
+
+# Архівація рахує дні, тож last_viewed_at досить оновлювати раз на годину, а не на кожен перегляд
+VIEW_TOUCH_INTERVAL = timedelta(hours=1)
+
+
+def mark_cold(db: Session, days: int) -> int:
+    """Make hot galleries without a view for days cold; returns how many"""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    result = db.execute(update(Gallery).where(
+        Gallery.storage_tier == TIER_HOT,
+        func.coalesce(Gallery.last_viewed_at, Gallery.created_at) < cutoff
+    ).values(storage_tier=TIER_COLD).execution_options(synchronize_session=False))
+    db.commit()
+    return result.rowcount
+
+
+def request_restore(db: Session, gallery_id: int) -> bool:
+    """Queue a cold gallery for restore; False if it is not cold. Does not commit."""
+    result = db.execute(update(Gallery).where(
+        Gallery.id == gallery_id,
+        Gallery.storage_tier == TIER_COLD
+    ).values(
+        storage_tier=TIER_RESTORING,
+        restore_requested_at=func.now()
+    ).execution_options(synchronize_session=False))
+    if result.rowcount:
+        logger.info("Queued gallery %s for restore from the archive", gallery_id)
+    return bool(result.rowcount)
+
+
+def touch_gallery(db: Session, gallery_id: int):
+    """Record a public view of the gallery, at most once per VIEW_TOUCH_INTERVAL. Does not commit."""
+    now = datetime.now(timezone.utc)
+    db.execute(update(Gallery).where(
+        Gallery.id == gallery_id,
+        or_(Gallery.last_viewed_at.is_(None), Gallery.last_viewed_at < now - VIEW_TOUCH_INTERVAL)
+    ).values(last_viewed_at=now).execution_options(synchronize_session=False))
+
+
+def restore_status(db: Session, gallery: Gallery) -> dict:
+    """schemas.ArchiveStatus payload of a gallery"""
+    archived = db.query(func.count(Photo.id)).filter(
+        Photo.gallery_id == gallery.id,
+        Photo.archived.is_(True)
+    ).scalar()
+    position = None
+    if gallery.storage_tier == TIER_RESTORING:
+        # Порівняння в самій БД: значення func.now(), повернене в Python, у SQLite не збігається з ним як рядок
+        requested_at = select(Gallery.restore_requested_at).where(Gallery.id == gallery.id).scalar_subquery()
+        position = db.query(func.count(Gallery.id)).filter(
+            Gallery.storage_tier == TIER_RESTORING,
+            or_(
+                Gallery.restore_requested_at < requested_at,
+                and_(Gallery.restore_requested_at == requested_at, Gallery.id < gallery.id)
+            )
+        ).scalar() + 1
+    return {
+        "storage_tier": gallery.storage_tier,
+        "photo_count": gallery.photo_count,
+        "archived_photos": archived,
+        "last_viewed_at": gallery.last_viewed_at,
+        "restore_requested_at": gallery.restore_requested_at,
+        "queue_position": position,
+    }
+
+
+def _move_gallery(db: Session, gallery_id: int, to_archive: bool,
+                  cutoff: Optional[datetime], batch: int) -> Tuple[int, List[int]]:
+    """Move the gallery's photos to the other tier; returns the number moved and the ids that failed"""
+    source, target = (storage_service, archive_storage) if to_archive else (archive_storage, storage_service)
+    expected_tier = TIER_COLD if to_archive else TIER_RESTORING
+    moved_count = 0
+    failed = []
+    last_id = 0
+    while True:
+        # Галерею могли відновити (або видалити), поки йшли попередні пачки
+        tier = db.query(Gallery.storage_tier).filter(Gallery.id == gallery_id).scalar()
+        if tier != expected_tier:
+            db.rollback()
+            return moved_count, failed
+
+        query = db.query(Photo.id, Photo.filename).filter(
+            Photo.gallery_id == gallery_id,
+            Photo.archived.is_(not to_archive),
+            Photo.id > last_id
+        )
+        if cutoff is not None:
+            query = query.filter(Photo.created_at < cutoff)
+        photos = query.order_by(Photo.id).limit(batch).with_for_update().all()
+        if not photos:
+            db.commit()
+            return moved_count, failed
+        last_id = photos[-1].id
+
+        def copy(photo) -> bool:
+            try:
+                source.copy_to(target, photo.filename)
+                return True
+            except Exception as e:
+                logger.error("Error moving photo %s (%s) between tiers: %s", photo.id, photo.filename, e)
+                return False
+
+        with ThreadPoolExecutor(max_workers=COPY_CONCURRENCY) as executor:
+            copied = list(executor.map(copy, photos))
+        moved = [photo for photo, ok in zip(photos, copied) if ok]
+        failed.extend(photo.id for photo, ok in zip(photos, copied) if not ok)
+        bulk_update(db, Photo, [{"id": photo.id, "archived": to_archive} for photo in moved])
+        db.commit()
+        moved_count += len(moved)
+        # Якщо видалення не вдасться, зайва копія лише займає місце
+        source.delete_files([photo.filename for photo in moved])
+
+
+def archive_galleries(db: Session, days: int, batch: int = ARCHIVE_BATCH) -> int:
+    """Mark idle galleries cold and move their originals to the archive; returns photos archived.
+
+    Skipped (returns 0) while another worker or script moves photos between tiers.
+    """
+    with advisory_lock(db.get_bind(), TIER_LOCK) as locked:
+        if not locked:
+            logger.debug("Photos are moved between tiers elsewhere, archival skipped")
+            return 0
+        if mark_cold(db, days):
+            logger.info("Galleries without views for %s days marked cold", days)
+        cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+        archived = 0
+        gallery_ids = [gallery_id for (gallery_id,) in db.query(Gallery.id).filter(
+            Gallery.storage_tier == TIER_COLD
+        ).order_by(Gallery.id)]
+        db.commit()
+        for gallery_id in gallery_ids:
+            moved, failed = _move_gallery(db, gallery_id, True, cutoff, batch)
+            archived += moved
+            if failed:
+                logger.warning("Could not archive %d photos of gallery %s", len(failed), gallery_id)
+        return archived
+
+
+def restore_galleries(db: Session, batch: int = ARCHIVE_BATCH, limit: Optional[int] = None) -> int:
+    """Restore queued galleries in request order; returns how many became hot.
+
+    Skipped (returns 0) while another worker or script moves photos between tiers.
+    """
+    with advisory_lock(db.get_bind(), TIER_LOCK) as locked:
+        if not locked:
+            logger.debug("Photos are moved between tiers elsewhere, restore skipped")
+            return 0
+        query = db.query(Gallery.id).filter(Gallery.storage_tier == TIER_RESTORING).order_by(
+            Gallery.restore_requested_at, Gallery.id
+        )
+        gallery_ids = [gallery_id for (gallery_id,) in query.limit(limit)]
+        db.commit()
+        restored = 0
+        for gallery_id in gallery_ids:
+            _, failed = _move_gallery(db, gallery_id, False, None, batch)
+            if failed:
+                # Лишається в черзі: наступний прохід спробує ці фото знову, а перегляди йдуть з архіву
+                logger.error("Could not restore %d photos of gallery %s", len(failed), gallery_id)
+                continue
+            # Свіжий перегляд - щоб галерея не пішла в архів одразу знову
+            restored += db.execute(update(Gallery).where(
+                Gallery.id == gallery_id,
+                Gallery.storage_tier == TIER_RESTORING
+            ).values(
+                storage_tier=TIER_HOT,
+                restore_requested_at=None,
+                last_viewed_at=func.now()
+            ).execution_options(synchronize_session=False)).rowcount
+            db.commit()
+            logger.info("Restored gallery %s from the archive", gallery_id)
+        return restored
+
+
+def has_archived(db: Session) -> bool:
+    """Whether any gallery is cold or queued for restore, i.e. may have photos in the archive"""
+    return db.query(Gallery.id).filter(
+        Gallery.storage_tier.in_([TIER_COLD, TIER_RESTORING])
+    ).first() is not None
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+
+import argparse
+from config import settings
+from database import SessionLocal
+from archive import archive_galleries as archive, restore_galleries, ARCHIVE_BATCH
+
+def archive_galleries(days=settings.ARCHIVE_AFTER_DAYS, restore_only=False, batch=ARCHIVE_BATCH):
+    """Restore queued galleries, then move originals of galleries idle for days to the archive"""
+    db = SessionLocal()
+    try:
+        restored = restore_galleries(db, batch)
+        print(f"Restored {restored} galleries from the archive")
+        if restore_only:
+            return
+        if days <= 0:
+            print("Archival is disabled: set ARCHIVE_AFTER_DAYS or pass --days")
+            return
+        archived = archive(db, days, batch)
+        print(f"Archived {archived} photos of galleries without views for {days} days")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=archive_galleries.__doc__)
+    parser.add_argument("--days", type=int, default=settings.ARCHIVE_AFTER_DAYS, help="archive galleries idle this long")
+    parser.add_argument("--restore-only", action="store_true", help="only work the restore queue")
+    parser.add_argument("--batch", type=int, default=ARCHIVE_BATCH)
+    args = parser.parse_args()
+    archive_galleries(args.days, args.restore_only, args.batch)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import or_
+from database import SessionLocal
+from models import Photo
+from storage import storage_service
+from imaging import image_info
+from ordering import bulk_update
+from layout import invalidate_layouts
+
+# Фото за одну транзакцію та кількість паралельних завантажень з MinIO
+BATCH = 200
+CONCURRENCY = 4
+
+def _photo_metadata(photo):
+    try:
+        info = image_info(storage_service.get_file(photo.filename))
+    except Exception as e:
+        print(f"Skipping photo {photo.id} ({photo.filename}): {e}")
+        return None
+    return {"id": photo.id, **info._asdict()}
+
+def backfill_photo_metadata(batch=BATCH, concurrency=CONCURRENCY):
+    """Compute EXIF details, placeholder and dominant color for photos uploaded before they existed"""
+    db = SessionLocal()
+    updated = 0
+    last_id = 0
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            while True:
+                # Курсор по id: фото, які не вдалося обробити, не вибираються повторно
+                photos = db.query(Photo.id, Photo.filename, Photo.scene_id).filter(
+                    or_(Photo.placeholder.is_(None), Photo.orientation.is_(None)),
+                    Photo.id > last_id
+                ).order_by(Photo.id).limit(batch).all()
+                if not photos:
+                    break
+                last_id = photos[-1].id
+                rows = [row for row in executor.map(_photo_metadata, photos) if row]
+                updated += bulk_update(db, Photo, rows)
+                # Розміри й орієнтація змінюють розкладку сцен
+                invalidate_layouts(db, [photo.scene_id for photo in photos])
+                db.commit()
+                print(f"Processed photos up to id {last_id}, {updated} updated")
+    finally:
+        db.close()
+    print(f"Metadata computed for {updated} photos")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=backfill_photo_metadata.__doc__)
+    parser.add_argument("--batch", type=int, default=BATCH)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    args = parser.parse_args()
+    backfill_photo_metadata(args.batch, args.concurrency)
@@ -0,0 +1,126 @@
+"""Logging overhead benchmark.
+
+Replays the log calls of a typical image request (three per view_photo, one
+access line) and compares the old setup - logging.basicConfig at INFO with
+f-string messages - against logging_config.setup_logging() with lazy %-style
+messages, debug-level chatter and sampled access lines.
+
+Usage (from backend/):
+
+    python -m benchmarks.logging_bench --requests 50000 --output logbench.json
+
+Log output goes to a temporary file so terminal speed does not skew results;
+the report holds calls/s on the request thread, records and bytes written.
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+
+def reset_logging():
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+
+
+def eager_request(logger, access_logger, photo_id: int):
+    # Виклики як у view_photo до переходу на ледаче форматування
+    filename = f"{photo_id:08x}.jpg"
+    logger.info(f"Viewing photo by ID {photo_id}")
+    logger.info(f"Getting file {filename} from storage")
+    logger.info(f"Successfully retrieved file {filename}, size: {photo_id * 37} bytes")
+    access_logger.info("GET /api/photos/{photo_id}/view 200 3.1ms db=1/0.4ms")
+
+
+def lazy_request(logger, access_logger, photo_id: int, sample_rate: float):
+    filename = "%08x.jpg" % photo_id
+    logger.debug("Viewing photo by ID %s", photo_id)
+    logger.debug("Getting file %s from storage", filename)
+    logger.debug("Successfully retrieved file %s, size: %s bytes", filename, photo_id * 37)
+    if random.random() < sample_rate:
+        access_logger.info(
+            "%s %s %.1fms db=%d/%.1fms", "GET /api/photos/{photo_id}/view", 200, 3.1, 1, 0.4,
+            extra={"route": "GET /api/photos/{photo_id}/view", "status": 200, "sampled": True}
+        )
+
+
+def measure(mode: str, requests: int, sample_rate: float, log_format: str) -> dict:
+    from logging_config import setup_logging, shutdown_logging
+
+    reset_logging()
+    fd, path = tempfile.mkstemp(suffix=".log")
+    os.close(fd)
+    stderr = sys.stderr
+    log_file = open(path, "w")
+    sys.stderr = log_file
+    try:
+        if mode == "basic":
+            logging.basicConfig(level=logging.INFO, stream=log_file, force=True)
+        else:
+            setup_logging(level="INFO", fmt=log_format)
+        logger = logging.getLogger("routers.photos")
+        access_logger = logging.getLogger("access")
+
+        started = time.perf_counter()
+        for photo_id in range(requests):
+            if mode == "basic":
+                eager_request(logger, access_logger, photo_id)
+            else:
+                lazy_request(logger, access_logger, photo_id, sample_rate)
+        request_thread = time.perf_counter() - started
+
+        if mode != "basic":
+            # Дочекатися, поки QueueListener допише чергу
+            shutdown_logging()
+        total = time.perf_counter() - started
+    finally:
+        sys.stderr = stderr
+        reset_logging()
+        log_file.close()
+
+    with open(path) as f:
+        records = sum(1 for _ in f)
+    size = os.path.getsize(path)
+    os.unlink(path)
+    return {
+        "requests": requests,
+        "request_thread_s": round(request_thread, 3),
+        "requests_per_s": round(requests / request_thread, 1) if request_thread else 0.0,
+        "total_s": round(total, 3),
+        "records": records,
+        "bytes": size,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="YouGallery logging overhead benchmark")
+    parser.add_argument("--requests", type=int, default=50000)
+    parser.add_argument("--sample-rate", type=float, default=0.01, help="ACCESS_LOG_SAMPLE_RATE to simulate")
+    parser.add_argument("--format", choices=["text", "json"], default="text")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    random.seed(args.seed)
+    report = {
+        "config": {"requests": args.requests, "sample_rate": args.sample_rate, "format": args.format},
+        "basic_fstring": measure("basic", args.requests, args.sample_rate, args.format),
+        "queue_lazy": measure("queue", args.requests, args.sample_rate, args.format),
+    }
+    for name in ("basic_fstring", "queue_lazy"):
+        print(f"{name:15} {json.dumps(report[name])}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+import hashlib
+import threading
+import uuid
+from datetime import datetime, timezone
+from minio.datatypes import Part
+from minio.error import S3Error
+
+
+class _Object:
+    def __init__(self, object_name: str, data: bytes, content_type: str):
+        self.object_name = object_name
+        self.data = data
+        self.size = len(data)
+        self.content_type = content_type
+        self.etag = hashlib.md5(data).hexdigest()
+        self.last_modified = datetime.now(timezone.utc)
+        self.is_dir = False
+
+
+class _Response:
+    def __init__(self, data: bytes):
+        self._data = data
+
+    def read(self, amt=None):
+        return self._data
+
+    def stream(self, amt=64 * 1024):
+        for start in range(0, len(self._data), amt):
+            yield self._data[start:start + amt]
+
+    def close(self):
+        pass
+
+    def release_conn(self):
+        pass
+
+
+class _PartList:
+    def __init__(self, parts):
+        self.parts = parts
+        self.is_truncated = False
+        self.next_part_number_marker = None
+
+
+class MemoryMinio:
+    """In-process stand-in for the Minio client used by MinIOStorageService.
+
+    Implements only the calls storage.py makes, keeping objects in a dict so
+    benchmarks measure the API rather than the network.
+    """
+
+    def __init__(self):
+        self._buckets = {}
+        self._uploads = {}
+        self._lock = threading.Lock()
+
+    def _missing(self, bucket_name: str, object_name: str):
+        return S3Error("NoSuchKey", "Object does not exist", object_name, None, None, None, bucket_name, object_name)
+
+    def bucket_exists(self, bucket_name: str) -> bool:
+        return bucket_name in self._buckets
+
+    def make_bucket(self, bucket_name: str):
+        self._buckets.setdefault(bucket_name, {})
+
+    def put_object(self, bucket_name, object_name, data, length, content_type="application/octet-stream", **kwargs):
+        with self._lock:
+            self._buckets.setdefault(bucket_name, {})[object_name] = _Object(object_name, data.read(length), content_type)
+
+    def get_object(self, bucket_name, object_name, offset=0, length=0, **kwargs):
+        obj = self._buckets.get(bucket_name, {}).get(object_name)
+        if obj is None:
+            raise self._missing(bucket_name, object_name)
+        return _Response(obj.data[offset:offset + length] if length else obj.data[offset:])
+
+    def stat_object(self, bucket_name, object_name, *args, **kwargs):
+        obj = self._buckets.get(bucket_name, {}).get(object_name)
+        if obj is None:
+            raise self._missing(bucket_name, object_name)
+        return obj
+
+    def copy_object(self, bucket_name, object_name, source, **kwargs):
+        obj = self.stat_object(source.bucket_name, source.object_name)
+        with self._lock:
+            self._buckets.setdefault(bucket_name, {})[object_name] = _Object(object_name, obj.data, obj.content_type)
+
+    def remove_object(self, bucket_name, object_name, *args, **kwargs):
+        with self._lock:
+            self._buckets.get(bucket_name, {}).pop(object_name, None)
+
+    def remove_objects(self, bucket_name, delete_object_list, **kwargs):
+        # Як у Minio - видалення відбувається під час ітерації; помилок не буває
+        with self._lock:
+            for obj in delete_object_list:
+                self._buckets.get(bucket_name, {}).pop(obj._name, None)
+        yield from ()
+
+    def list_objects(self, bucket_name, prefix=None, recursive=False, start_after=None, **kwargs):
+        for name in sorted(self._buckets.get(bucket_name, {})):
+            if prefix and not name.startswith(prefix):
+                continue
+            if start_after and name <= start_after:
+                continue
+            yield self._buckets[bucket_name][name]
+
+    def _create_multipart_upload(self, bucket_name, object_name, headers):
+        upload_id = uuid.uuid4().hex
+        self._uploads[upload_id] = (object_name, headers.get("Content-Type", "application/octet-stream"), {})
+        return upload_id
+
+    def _upload(self, bucket_name, object_name, upload_id):
+        upload = self._uploads.get(upload_id)
+        if upload is None or upload[0] != object_name:
+            raise S3Error("NoSuchUpload", "Upload does not exist", object_name, None, None, None,
+                          bucket_name, object_name)
+        return upload
+
+    def _upload_part(self, bucket_name, object_name, data, headers, upload_id, part_number):
+        etag = hashlib.md5(data).hexdigest()
+        with self._lock:
+            self._upload(bucket_name, object_name, upload_id)[2][part_number] = (etag, bytes(data))
+        return etag
+
+    def _list_parts(self, bucket_name, object_name, upload_id, max_parts=None, part_number_marker=None, **kwargs):
+        parts = self._upload(bucket_name, object_name, upload_id)[2]
+        return _PartList([Part(number, parts[number][0]) for number in sorted(parts)])
+
+    def _complete_multipart_upload(self, bucket_name, object_name, upload_id, parts):
+        _, content_type, stored = self._upload(bucket_name, object_name, upload_id)
+        data = b"".join(stored[part.part_number][1] for part in parts)
+        with self._lock:
+            self._buckets.setdefault(bucket_name, {})[object_name] = _Object(object_name, data, content_type)
+            del self._uploads[upload_id]
+
+    def _abort_multipart_upload(self, bucket_name, object_name, upload_id):
+        self._upload(bucket_name, object_name, upload_id)
+        self._uploads.pop(upload_id, None)
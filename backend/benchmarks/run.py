@@ -0,0 +1,264 @@
+"""Load-testing harness for the gallery API.
+
+Runs the FastAPI app in-process against SQLite (default) or Postgres and an
+in-memory MinIO stand-in, seeds N galleries x M scenes x K photos and drives
+the hot endpoints concurrently.
+
+Usage (from backend/):
+
+    python -m benchmarks.run --galleries 5 --scenes 4 --photos 100 \\
+        --concurrency 8 --requests 300 --output bench.json --baseline baseline.json
+
+The JSON report holds p50/p95/p99 latency, RPS, SQL statements per request
+and peak RSS per scenario. With --baseline the run is diffed against an
+earlier report and regressions beyond --tolerance are listed.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List
+
+SCENARIOS = ["get_public_gallery", "view_photo", "toggle_favorite", "upload_photos", "login"]
+
+# (metric, True якщо більше - краще)
+COMPARED_METRICS = [
+    ("p50_ms", False),
+    ("p95_ms", False),
+    ("p99_ms", False),
+    ("rps", True),
+    ("queries_per_request", False),
+]
+
+
+class QueryCounter:
+    """Counts SQL statements sent through an engine"""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.count = 0
+        self._lock = threading.Lock()
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args, **kwargs):
+        with self._lock:
+            self.count += 1
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss - кілобайти на Linux, байти на macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+async def run_scenario(client, make_request: Callable, total: int, concurrency: int, counter: QueryCounter) -> dict:
+    latencies = []
+    errors = 0
+    indexes = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in indexes:
+            started = time.perf_counter()
+            try:
+                response = await make_request(client, i)
+                if response.status_code >= 400:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    queries_before = counter.count
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "errors": errors,
+        "rps": round(total / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "queries_per_request": round((counter.count - queries_before) / total, 2) if total else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def build_scenarios(seeded: dict, token: str, rng: random.Random) -> Dict[str, Callable]:
+    from benchmarks.seed import BENCH_EMAIL, BENCH_PASSWORD
+
+    auth_headers = {"Authorization": f"Bearer {token}"}
+
+    def get_public_gallery(client, i):
+        return client.get(f"/api/galleries/{rng.choice(seeded['gallery_ids'])}/public")
+
+    def view_photo(client, i):
+        return client.get(f"/api/photos/{rng.choice(seeded['photo_ids'])}/view")
+
+    def toggle_favorite(client, i):
+        return client.post("/api/photos/favorites", json={
+            "photo_id": rng.choice(seeded["photo_ids"]),
+            "session_id": f"bench-session-{i % 50}",
+        })
+
+    def upload_photos(client, i):
+        files = [("files", (f"upload_{i}.jpg", seeded["upload_image"], "image/jpeg"))]
+        return client.post(
+            f"/api/galleries/scenes/{rng.choice(seeded['scene_ids'])}/photos/upload",
+            files=files,
+            headers=auth_headers
+        )
+
+    def login(client, i):
+        return client.post("/api/auth/login", json={"email": BENCH_EMAIL, "password": BENCH_PASSWORD})
+
+    return {
+        "get_public_gallery": get_public_gallery,
+        "view_photo": view_photo,
+        "toggle_favorite": toggle_favorite,
+        "upload_photos": upload_photos,
+        "login": login,
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Return human-readable regressions of report against baseline"""
+    regressions = []
+    for name, metrics in report["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS:
+            old, new = base.get(metric), metrics.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            print(f"  {name:20} {metric:20} {old:>10} -> {new:>10} ({change:+.1%})")
+            worse = change < -tolerance if higher_is_better else change > tolerance
+            if worse:
+                regressions.append(f"{name}.{metric}: {old} -> {new} ({change:+.1%})")
+    return regressions
+
+
+async def run(args) -> dict:
+    import logging
+    import httpx
+    import storage
+
+    if args.storage == "memory":
+        from benchmarks.memory_minio import MemoryMinio
+        storage.storage_service.client = MemoryMinio()
+
+    from database import engine, Base, SessionLocal
+    import main
+    from benchmarks.seed import seed, BENCH_EMAIL, BENCH_PASSWORD
+
+    # Рядок на кожен клієнтський запит httpx спотворює вимірювання
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    if args.reset:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    db = SessionLocal()
+    try:
+        seeded = seed(db, args.galleries, args.scenes, args.photos, args.seed, args.image_size)
+    finally:
+        db.close()
+
+    counter = QueryCounter(engine)
+    rng = random.Random(args.seed)
+    transport = httpx.ASGITransport(app=main.app)
+
+    # ASGITransport не запускає lifespan - робимо це самі, як uvicorn
+    async with main.app.router.lifespan_context(main.app), \
+            httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        response = await client.post("/api/auth/login", json={"email": BENCH_EMAIL, "password": BENCH_PASSWORD})
+        response.raise_for_status()
+        scenarios = build_scenarios(seeded, response.json()["access_token"], rng)
+
+        results = {}
+        for name in args.scenarios:
+            total = args.login_requests if name == "login" else args.requests
+            results[name] = await run_scenario(client, scenarios[name], total, args.concurrency, counter)
+            print(f"{name:20} {json.dumps(results[name])}")
+
+    return {
+        "config": {
+            "galleries": args.galleries,
+            "scenes": args.scenes,
+            "photos": args.photos,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "login_requests": args.login_requests,
+            "seed": args.seed,
+            "database": engine.dialect.name,
+            "storage": args.storage,
+        },
+        "scenarios": results,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="YouGallery API benchmark")
+    parser.add_argument("--galleries", type=int, default=3)
+    parser.add_argument("--scenes", type=int, default=3)
+    parser.add_argument("--photos", type=int, default=50, help="photos per scene")
+    parser.add_argument("--image-size", type=int, default=640, help="synthetic image width in pixels")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--login-requests", type=int, default=20, help="bcrypt makes login slow on purpose")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", help="defaults to a temporary SQLite file")
+    parser.add_argument("--reset", action="store_true", help="drop all tables before seeding")
+    parser.add_argument("--storage", choices=["memory", "minio"], default="memory")
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--baseline", help="JSON report to diff against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed relative regression")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    # DATABASE_URL має бути задано до імпорту config
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+
+    report = asyncio.run(run(args))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"Comparing against {args.baseline}:")
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print("Regressions:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""Seeded data generator for benchmarks.
+
+Creates one owner account with N galleries x M scenes x K photos. Each photo
+gets a synthetic JPEG stored through storage_service, so view and upload
+endpoints work against real bytes.
+"""
+import io
+import random
+from datetime import datetime, timedelta
+from typing import List
+from sqlalchemy.orm import Session
+from models import User, Gallery, Scene, Photo
+from auth import get_password_hash
+from storage import storage_service, gallery_prefix
+from ordering import ORDER_GAP
+from imaging import image_info
+from usage import add_photos
+
+BENCH_EMAIL = "bench@yougallery.local"
+BENCH_PASSWORD = "bench-password"
+
+
+def synthetic_images(rng: random.Random, count: int, width: int, height: int) -> List[bytes]:
+    """Generate distinct noisy JPEGs so decode and size costs are realistic"""
+    from PIL import Image
+
+    images = []
+    for _ in range(count):
+        base = Image.new("RGB", (width, height), tuple(rng.randrange(256) for _ in range(3)))
+        noise = Image.frombytes("RGB", (width, height), rng.randbytes(width * height * 3))
+        buffer = io.BytesIO()
+        Image.blend(base, noise, 0.3).save(buffer, "JPEG", quality=85)
+        images.append(buffer.getvalue())
+    return images
+
+
+def seed(db: Session, galleries: int, scenes: int, photos: int, seed_value: int = 42,
+         image_size: int = 640, image_variants: int = 8) -> dict:
+    """Populate the database and storage, returning ids the scenarios need"""
+    rng = random.Random(seed_value)
+    images = synthetic_images(rng, image_variants, image_size, image_size * 2 // 3)
+    infos = [image_info(data) for data in images]
+
+    owner = User(
+        email=BENCH_EMAIL,
+        name="Benchmark",
+        hashed_password=get_password_hash(BENCH_PASSWORD),
+        is_active=True
+    )
+    db.add(owner)
+    db.flush()
+
+    gallery_ids, scene_ids, photo_ids = [], [], []
+    shooting_date = datetime(2024, 6, 1)
+    for g in range(galleries):
+        gallery = Gallery(
+            name=f"Gallery {g}",
+            shooting_date=shooting_date + timedelta(days=g),
+            is_public=True,
+            owner_id=owner.id
+        )
+        db.add(gallery)
+        db.flush()
+        gallery_ids.append(gallery.id)
+
+        for s in range(scenes):
+            scene = Scene(name=f"Scene {s}", gallery_id=gallery.id, order_index=s * ORDER_GAP)
+            db.add(scene)
+            db.flush()
+            scene_ids.append(scene.id)
+
+            rows = []
+            for p in range(photos):
+                variant = rng.randrange(len(images))
+                data = images[variant]
+                filename = storage_service.upload_file(
+                    data, f"bench_{g}_{s}_{p}.jpg", "image/jpeg", gallery_prefix(owner.id, gallery.id)
+                )
+                # Час зйомки не збігається з порядком завантаження, як у кількох камер
+                metadata = {
+                    **infos[variant]._asdict(),
+                    "taken_at": gallery.shooting_date + timedelta(seconds=(p * 7919) % 43200),
+                }
+                rows.append(Photo(
+                    filename=filename,
+                    original_filename=f"IMG_{p:05d}.jpg",
+                    file_path=f"/uploads/{filename}",
+                    file_size=len(data),
+                    mime_type="image/jpeg",
+                    **metadata,
+                    order_index=p * ORDER_GAP,
+                    scene_id=scene.id,
+                    gallery_id=gallery.id,
+                    owner_id=owner.id
+                ))
+            db.add_all(rows)
+            add_photos(db, rows)
+            db.flush()
+            photo_ids.extend(row.id for row in rows)
+
+    db.commit()
+    return {
+        "gallery_ids": gallery_ids,
+        "scene_ids": scene_ids,
+        "photo_ids": photo_ids,
+        "upload_image": images[0],
+    }
@@ -0,0 +1,97 @@
+"""Cold-start benchmark for the API worker.
+
+Imports main in fresh interpreters and runs the lifespan startup, the same
+work every uvicorn worker does before it can serve. Fails (exit code 1) when
+the median exceeds --target-ms or when importing main loads a library that
+should only be imported on first use.
+
+Usage (from backend/):
+
+    python -m benchmarks.startup --runs 5 --target-ms 1500
+
+MinIO does not have to be reachable: the bucket is prepared in the
+background and never delays startup.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Бібліотеки, які мають завантажуватись лише при першому використанні
+LAZY_MODULES = ["PIL", "numpy", "minio", "passlib", "jose", "bcrypt"]
+
+PROBE = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+async def start():
+    async with main.app.router.lifespan_context(main.app):
+        return time.perf_counter()
+
+ready = asyncio.run(start())
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (ready - started) * 1000,
+    "eager_modules": [m for m in %r if m in sys.modules and m not in before],
+}))
+"""
+
+
+def measure_once(env: dict) -> dict:
+    # Модулі, завантажені до import main (site, conda тощо), не рахуються
+    script = "import sys\nbefore = set(sys.modules)\n" + PROBE % LAZY_MODULES
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="YouGallery cold start benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--target-ms", type=float, default=1500, help="maximum median time to a ready worker")
+    parser.add_argument("--database-url", help="defaults to a temporary SQLite file")
+    parser.add_argument("--output", help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ)
+    env["DATABASE_URL"] = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/startup.db"
+    # Недосяжний MinIO не повинен впливати на час старту
+    env.setdefault("MINIO_ENDPOINT", "127.0.0.1:1")
+
+    runs = [measure_once(env) for _ in range(args.runs)]
+    import_ms = sorted(run["import_ms"] for run in runs)
+    startup_ms = sorted(run["startup_ms"] for run in runs)
+    eager = sorted({module for run in runs for module in run["eager_modules"]})
+    report = {
+        "runs": args.runs,
+        "import_median_ms": round(statistics.median(import_ms), 1),
+        "startup_median_ms": round(statistics.median(startup_ms), 1),
+        "startup_max_ms": round(startup_ms[-1], 1),
+        "target_ms": args.target_ms,
+        "eager_modules": eager,
+    }
+    print(json.dumps(report, indent=2))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    failed = False
+    if report["startup_median_ms"] > args.target_ms:
+        print(f"Startup median {report['startup_median_ms']} ms exceeds target {args.target_ms} ms")
+        failed = True
+    if eager:
+        print(f"Imported eagerly by main: {', '.join(eager)}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+
+import argparse
+from database import SessionLocal
+from visitors import cleanup_expired_sessions
+from uploads import expire_upload_sessions
+
+def cleanup_sessions(ttl_days=None, upload_ttl_hours=None):
+    """Delete expired visitor sessions (with their favorites) and abandoned uploads"""
+    db = SessionLocal()
+    try:
+        removed = cleanup_expired_sessions(db, ttl_days)
+        expired = expire_upload_sessions(db, upload_ttl_hours)
+    finally:
+        db.close()
+    print(f"Removed {removed} expired visitor sessions and {expired} upload sessions")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=cleanup_sessions.__doc__)
+    parser.add_argument("--ttl-days", type=int, help="defaults to VISITOR_SESSION_TTL_DAYS")
+    parser.add_argument("--upload-ttl-hours", type=int, help="defaults to UPLOAD_SESSION_TTL_HOURS")
+    args = parser.parse_args()
+    cleanup_sessions(args.ttl_days, args.upload_ttl_hours)
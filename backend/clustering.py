@@ -0,0 +1,166 @@
+import logging
+from datetime import datetime
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+from sqlalchemy import case, func, select, update
+from sqlalchemy.orm import Session
+from models import Photo, Scene
+from ordering import plan_order, bulk_update
+from layout import invalidate_layouts
+
+# NumPy імпортується при першому розбитті сцени, як Pillow в imaging
+
+logger = logging.getLogger(__name__)
+
+# Зміна кольору враховується лише на паузах, не коротших за цю частку gap_seconds
+COLOR_GAP_FACTOR = 0.25
+# Скільки фото з кожного боку паузи усереднюються при порівнянні кольорів
+COLOR_WINDOW = 3
+SCENE_NAME_FORMAT = "%Y-%m-%d %H:%M"
+
+
+class SceneCluster(NamedTuple):
+    """A run of photos shot without long pauses, in capture-time order"""
+    start: datetime
+    end: datetime
+    photo_count: int
+
+
+def _rgb(colors: Sequence[Optional[str]]):
+    """(n, 3) float array from #rrggbb strings; NaN rows where the color is unknown"""
+    import numpy as np
+
+    packed = np.array([int(color[1:], 16) if color else -1 for color in colors], dtype=np.int64)
+    rgb = np.stack([(packed >> 16) & 0xFF, (packed >> 8) & 0xFF, packed & 0xFF], axis=1).astype(np.float64)
+    rgb[packed < 0] = np.nan
+    return rgb
+
+
+def _color_change(rgb, window: int):
+    """Distance between the mean color of `window` photos before and after each gap.
+
+    Element i belongs to the gap between photos i and i + 1; NaN where one of
+    the sides has no known colors.
+    """
+    import numpy as np
+
+    count = len(rgb)
+    known = ~np.isnan(rgb[:, 0])
+    sums = np.zeros((count + 1, 3))
+    np.cumsum(np.where(known[:, None], rgb, 0.0), axis=0, out=sums[1:])
+    counts = np.concatenate([[0], np.cumsum(known)])
+
+    edge = np.arange(1, count)  # перше фото після паузи
+    low = np.maximum(edge - window, 0)
+    high = np.minimum(edge + window, count)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        before = (sums[edge] - sums[low]) / (counts[edge] - counts[low])[:, None]
+        after = (sums[high] - sums[edge]) / (counts[high] - counts[edge])[:, None]
+    return np.linalg.norm(after - before, axis=1)
+
+
+def cluster_starts(taken_at: Sequence[datetime], colors: Optional[Sequence[Optional[str]]] = None,
+                   gap_seconds: float = 1800, color_threshold: float = 60,
+                   min_photos: int = 1) -> List[int]:
+    """Positions in taken_at (sorted ascending) where a new cluster starts.
+
+    A cluster starts after a pause of at least gap_seconds. With colors, a
+    pause of at least COLOR_GAP_FACTOR * gap_seconds is enough when the mean
+    dominant color around it changes by color_threshold or more (Euclidean
+    RGB distance). Clusters shorter than min_photos join the previous one.
+    """
+    import numpy as np
+
+    count = len(taken_at)
+    if not count:
+        return []
+
+    micros = np.array(taken_at, dtype="datetime64[us]").astype(np.int64)
+    gaps = np.diff(micros) / 1e6
+    split = gaps >= gap_seconds
+    if colors is not None:
+        change = _color_change(_rgb(colors), COLOR_WINDOW)
+        split |= (gaps >= gap_seconds * COLOR_GAP_FACTOR) & (change >= color_threshold)
+
+    starts = [0]
+    for start in (np.flatnonzero(split) + 1).tolist():
+        if start - starts[-1] >= min_photos:
+            starts.append(start)
+    if len(starts) > 1 and count - starts[-1] < min_photos:
+        starts.pop()
+    return starts
+
+
+def scene_clusters(db: Session, scene_id: int, gap_seconds: float, use_color: bool = False,
+                   color_threshold: float = 60, min_photos: int = 1) -> Tuple[List[SceneCluster], int]:
+    """Capture-time clusters of a scene and the number of photos without taken_at"""
+    rows = db.execute(
+        select(Photo.taken_at, Photo.dominant_color).where(
+            Photo.scene_id == scene_id,
+            Photo.taken_at.isnot(None)
+        ).order_by(Photo.taken_at)
+    ).all()
+    undated = db.query(func.count(Photo.id)).filter(
+        Photo.scene_id == scene_id,
+        Photo.taken_at.is_(None)
+    ).scalar()
+    if not rows:
+        return [], undated
+
+    taken_at = [row.taken_at for row in rows]
+    colors = [row.dominant_color for row in rows] if use_color else None
+    starts = cluster_starts(taken_at, colors, gap_seconds, color_threshold, min_photos)
+    ends = starts[1:] + [len(taken_at)]
+    return [
+        SceneCluster(taken_at[start], taken_at[end - 1], end - start)
+        for start, end in zip(starts, ends)
+    ], undated
+
+
+def cluster_name(cluster: SceneCluster) -> str:
+    return cluster.start.strftime(SCENE_NAME_FORMAT)
+
+
+def split_scene(db: Session, scene: Scene, clusters: List[SceneCluster]) -> List[Scene]:
+    """Move every cluster but the first into a new scene placed right after scene.
+
+    The first cluster and photos without taken_at stay where they are; photos
+    keep their order_index. Does not commit; returns the new scenes.
+    """
+    if len(clusters) < 2:
+        return []
+
+    new_scenes = [
+        Scene(name=cluster_name(cluster), gallery_id=scene.gallery_id, order_index=0)
+        for cluster in clusters[1:]
+    ]
+    db.add_all(new_scenes)
+    db.flush()
+
+    # Один UPDATE на всю сцену: нова scene_id за діапазоном taken_at, пізніші межі першими
+    targets = list(zip(clusters[1:], new_scenes))
+    stmt = update(Photo).where(
+        Photo.scene_id == scene.id,
+        Photo.taken_at >= clusters[1].start
+    ).values(scene_id=case(
+        *[(Photo.taken_at >= cluster.start, new_scene.id) for cluster, new_scene in reversed(targets)],
+        else_=Photo.scene_id
+    ))
+    db.execute(stmt.execution_options(synchronize_session=False))
+    invalidate_layouts(db, [scene.id])
+
+    new_ids = [new_scene.id for new_scene in new_scenes]
+    rows = db.query(Scene.id, Scene.order_index).filter(
+        Scene.gallery_id == scene.gallery_id,
+        Scene.id.notin_(new_ids)
+    ).order_by(Scene.order_index, Scene.id).all()
+    ordered_ids = [row.id for row in rows]
+    position = ordered_ids.index(scene.id) + 1
+    ordered_ids[position:position] = new_ids
+    changes = plan_order({row.id: row.order_index for row in rows}, ordered_ids)
+    bulk_update(db, Scene, [
+        {"id": scene_id, "order_index": order_index}
+        for scene_id, order_index in changes.items()
+    ])
+
+    logger.info("Split scene %s into %s scenes", scene.id, len(clusters))
+    return new_scenes
@@ -22,10 +22,66 @@ class Settings(BaseSettings):
     MINIO_ROOT_PASSWORD: str = os.getenv("MINIO_ROOT_PASSWORD", "minioadmin123")
     MINIO_BUCKET_NAME: str = os.getenv("MINIO_BUCKET_NAME", "yougallery")
     MINIO_SECURE: bool = os.getenv("MINIO_SECURE", "false").lower() == "true"
+    # Бакет холодного рівня (archive.py); можна налаштувати на ньому ILM-перехід у дешевший клас
+    MINIO_ARCHIVE_BUCKET_NAME: str = os.getenv("MINIO_ARCHIVE_BUCKET_NAME", "yougallery-archive")
+    
+    # Storage backend: minio (MinIO / S3) або local (каталог STORAGE_LOCAL_PATH на цьому вузлі)
+    STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", "minio")
+    STORAGE_LOCAL_PATH: str = os.getenv("STORAGE_LOCAL_PATH", "storage")
+    STORAGE_ARCHIVE_PATH: str = os.getenv("STORAGE_ARCHIVE_PATH", "storage-archive")
     
     # API Base URL - важливо для генерації правильних URL зображень
     API_BASE_URL: str = os.getenv("API_BASE_URL", "http://localhost:8000")
     
+    # Instrumentation
+    SLOW_QUERY_MS: float = float(os.getenv("SLOW_QUERY_MS", "200"))
+    REQUEST_QUERY_WARN_COUNT: int = int(os.getenv("REQUEST_QUERY_WARN_COUNT", "50"))
+    
+    # Logging
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "text")  # text або json
+    # Частка успішних запитів, що потрапляють в access log; помилки та повільні пишуться завжди
+    ACCESS_LOG_SAMPLE_RATE: float = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", "0.01"))
+    ACCESS_LOG_SLOW_MS: float = float(os.getenv("ACCESS_LOG_SLOW_MS", "1000"))
+    
+    # Health checks
+    HEALTH_CHECK_TIMEOUT: float = float(os.getenv("HEALTH_CHECK_TIMEOUT", "2"))
+    HEALTH_CHECK_CACHE_SECONDS: float = float(os.getenv("HEALTH_CHECK_CACHE_SECONDS", "5"))
+    
+    # Anonymous visitor sessions
+    VISITOR_SESSION_TTL_DAYS: int = int(os.getenv("VISITOR_SESSION_TTL_DAYS", "90"))
+    # Як часто воркер прибирає прострочені сесії відвідувачів і завантажень, секунди; 0 - лише скриптом cleanup_sessions.py
+    VISITOR_SESSION_CLEANUP_INTERVAL: int = int(os.getenv("VISITOR_SESSION_CLEANUP_INTERVAL", "3600"))
+    
+    # Resumable uploads
+    # Розмір частини multipart upload; S3 вимагає щонайменше 5 MiB для всіх частин, крім останньої
+    UPLOAD_PART_SIZE: int = int(os.getenv("UPLOAD_PART_SIZE", str(8 * 1024 * 1024)))
+    UPLOAD_MAX_SIZE: int = int(os.getenv("UPLOAD_MAX_SIZE", str(1024 * 1024 * 1024)))
+    # Незавершені завантаження без активності довше за цей час скасовуються
+    UPLOAD_SESSION_TTL_HOURS: int = int(os.getenv("UPLOAD_SESSION_TTL_HOURS", "24"))
+    
+    # Storage quota
+    # Квота користувача за замовчуванням (User.storage_quota її перевизначає), байти; 0 - без обмеження
+    STORAGE_QUOTA_BYTES: int = int(os.getenv("STORAGE_QUOTA_BYTES", "0"))
+    # Як часто воркер звіряє лічильники використання з фото, секунди; 0 - лише скриптом reconcile_usage.py
+    USAGE_RECONCILE_INTERVAL: int = int(os.getenv("USAGE_RECONCILE_INTERVAL", "86400"))
+
+    # Cold tier
+    # Галерея без публічних переглядів довше за стільки днів стає холодною, а оригінали її
+    # фото переносяться в архів; 0 - не архівувати (напр. 90 - сезон)
+    ARCHIVE_AFTER_DAYS: int = int(os.getenv("ARCHIVE_AFTER_DAYS", "0"))
+    # Як часто воркер архівує холодні галереї, секунди
+    ARCHIVE_INTERVAL: int = int(os.getenv("ARCHIVE_INTERVAL", "3600"))
+    # Як часто воркер бере чергу відновлення, секунди; 0 - лише скриптом archive_galleries.py.
+    # З ARCHIVE_AFTER_DAYS=0 черга зупиняється, щойно в архіві не лишиться галерей
+    RESTORE_INTERVAL: int = int(os.getenv("RESTORE_INTERVAL", "30"))
+
+    # Justified layout
+    # Ширини в'юпорта, для яких сервер рахує розкладку; клієнт бере найближчу й масштабує.
+    # У змінній оточення - JSON-список, напр. LAYOUT_VIEWPORT_WIDTHS=[360,1280]
+    LAYOUT_VIEWPORT_WIDTHS: List[int] = [360, 768, 1280, 1920]
+    LAYOUT_SPACING: int = int(os.getenv("LAYOUT_SPACING", "4"))  # проміжок між фото, пікселі
+    
     # CORS
     CORS_ORIGINS: List[str] = [
         "http://localhost:3000",
@@ -1,9 +1,15 @@
-from sqlalchemy import create_engine
+import zlib
+from contextlib import contextmanager
+from typing import Iterator
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from config import settings
 
-engine = create_engine(settings.DATABASE_URL)
+# SQLite (benchmarks, local runs) is shared across FastAPI's threadpool
+connect_args = {"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {}
+engine = create_engine(settings.DATABASE_URL, connect_args=connect_args)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -14,3 +20,27 @@ def get_db():
         yield db
     finally:
         db.close()
+
+@contextmanager
+def advisory_lock(bind: Engine, name: str) -> Iterator[bool]:
+    """Hold the PostgreSQL advisory lock name for the block; yields whether it was taken.
+
+    Periodic jobs start in every uvicorn worker and the maintenance scripts
+    may run next to them; the lock lets one of them do a run while the others
+    skip it. SQLite has a single process, so there the lock is always taken.
+    """
+    if bind.dialect.name != "postgresql":
+        yield True
+        return
+    key = zlib.crc32(name.encode())
+    # Окреме з'єднання: сесія завдання комітить пачками й може змінити з'єднання з пулу
+    with bind.connect() as connection:
+        locked = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key}).scalar()
+        # Блокування сесійне - транзакцію закриваємо, щоб з'єднання не висіло idle in transaction
+        connection.commit()
+        try:
+            yield locked
+        finally:
+            if locked:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+                connection.commit()
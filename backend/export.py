@@ -0,0 +1,91 @@
+"""Gallery export as a zip archive streamed while it is written.
+
+Photos are stored (ZIP_STORED): JPEG and WebP do not compress further. The
+archive goes to a non-seekable stream, so zipfile writes each entry's size
+and CRC in a data descriptor after the data, and the response starts
+before the last photo is read. Memory stays at one DOWNLOAD_CHUNK.
+Archived photos are read from the cold tier without restoring the gallery.
+"""
+import posixpath
+import time
+import zipfile
+from typing import Iterator, List, NamedTuple
+from sqlalchemy.orm import Session
+from models import Photo, Scene
+from storage import tier_storage
+
+
+class ExportEntry(NamedTuple):
+    arcname: str  # шлях всередині архіву
+    filename: str  # ключ об'єкта
+    size: int
+    archived: bool = False  # об'єкт у холодному рівні
+
+
+class _ChunkWriter:
+    """Write-only file object whose written bytes are taken out with take()"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _unique(name: str, used: set) -> str:
+    stem, ext = posixpath.splitext(name)
+    candidate, n = name, 1
+    while candidate in used:
+        n += 1
+        candidate = f"{stem} ({n}){ext}"
+    used.add(candidate)
+    return candidate
+
+
+def _clean(name: str) -> str:
+    # Без "/" і ".." - запис не повинен розпаковуватися за межі своєї сцени
+    return name.replace("/", "_").replace("\\", "_").strip(". ") or "untitled"
+
+
+def gallery_entries(db: Session, gallery_id: int) -> List[ExportEntry]:
+    """Photos of the gallery as <scene name>/<original filename>, in display order"""
+    rows = db.query(Scene.name, Photo.original_filename, Photo.filename, Photo.file_size, Photo.archived).join(
+        Scene, Scene.id == Photo.scene_id
+    ).filter(Photo.gallery_id == gallery_id).order_by(Scene.order_index, Scene.id, Photo.order_index, Photo.id)
+
+    used = set()
+    return [
+        ExportEntry(
+            _unique(f"{_clean(row.name or '')}/{_clean(row.original_filename)}", used),
+            row.filename, row.file_size, row.archived
+        )
+        for row in rows
+    ]
+
+
+def _archive(entries: List[ExportEntry], out: _ChunkWriter) -> Iterator[bytes]:
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_STORED) as archive:
+        for entry in entries:
+            info = zipfile.ZipInfo(entry.arcname, time.localtime()[:6])
+            # Відомий наперед розмір дозволяє zipfile вирішити про ZIP64 до запису
+            info.file_size = entry.size
+            with archive.open(info, "w") as target:
+                for chunk in tier_storage(entry.archived).iter_file(entry.filename):
+                    target.write(chunk)
+                    yield out.take()
+            yield out.take()
+    yield out.take()
+
+
+def zip_stream(entries: List[ExportEntry]) -> Iterator[bytes]:
+    """The zip archive of entries, chunk by chunk"""
+    return (chunk for chunk in _archive(entries, _ChunkWriter()) if chunk)
@@ -0,0 +1,158 @@
+import base64
+import logging
+import math
+from datetime import datetime
+from io import BytesIO
+from typing import BinaryIO, NamedTuple, Optional, Tuple, Union
+from metrics import observe_image
+
+# Pillow імпортується при першому використанні: воркери, що лише віддають JSON,
+# його не завантажують, а старт процесу не платить за ініціалізацію плагінів
+
+logger = logging.getLogger(__name__)
+
+# Довша сторона LQIP-плейсхолдера, пікселі; WebP такого розміру займає ~150-250 байтів
+PLACEHOLDER_SIZE = 32
+PLACEHOLDER_QUALITY = 30
+# Кількість кольорів палітри, з якої береться домінантний
+DOMINANT_COLORS = 5
+
+# EXIF-теги: IFD0 і вкладений Exif IFD
+EXIF_IFD = 0x8769
+TAG_MAKE = 0x010F
+TAG_MODEL = 0x0110
+TAG_ORIENTATION = 0x0112
+TAG_DATETIME = 0x0132
+TAG_DATETIME_ORIGINAL = 0x9003
+TAG_SUBSEC_TIME_ORIGINAL = 0x9291
+TAG_FOCAL_LENGTH = 0x920A
+TAG_LENS_MODEL = 0xA434
+EXIF_DATETIME_FORMAT = "%Y:%m:%d %H:%M:%S"
+
+
+class ImageInfo(NamedTuple):
+    """Everything ingest stores about an image; field names match Photo columns"""
+    width: int
+    height: int
+    placeholder: Optional[str]  # data:image/webp;base64,...
+    dominant_color: Optional[str]  # #rrggbb
+    taken_at: Optional[datetime]  # локальний час камери, без часового поясу
+    camera: Optional[str]
+    lens: Optional[str]
+    focal_length: Optional[float]  # мм
+    orientation: int  # EXIF Orientation, 1 якщо тегу немає
+
+
+def open_image(source: Union[bytes, BinaryIO]):
+    """Open image bytes or a binary file with Pillow (lazily imported)"""
+    from PIL import Image
+    return Image.open(BytesIO(source) if isinstance(source, (bytes, bytearray)) else source)
+
+
+def image_size(data: bytes) -> Tuple[int, int]:
+    """Return (width, height); raises if data is not an image Pillow can read"""
+    with observe_image("header"):
+        return open_image(data).size
+
+
+def _placeholder(image) -> Tuple[str, str]:
+    from PIL import ImageOps
+
+    # JPEG декодується одразу в зменшеному масштабі (до 1/8) - повний розмір не потрібен
+    with observe_image("decode"):
+        image.draft("RGB", (PLACEHOLDER_SIZE * 4, PLACEHOLDER_SIZE * 4))
+        image = ImageOps.exif_transpose(image).convert("RGB")
+    with observe_image("resize"):
+        image.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+
+    buffer = BytesIO()
+    with observe_image("encode"):
+        image.save(buffer, "WEBP", quality=PLACEHOLDER_QUALITY)
+    placeholder = "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+    with observe_image("palette"):
+        palette_image = image.quantize(colors=DOMINANT_COLORS)
+        _, index = max(palette_image.getcolors())
+    red, green, blue = palette_image.getpalette()[index * 3:index * 3 + 3]
+    return placeholder, f"#{red:02x}{green:02x}{blue:02x}"
+
+
+def _text(value) -> Optional[str]:
+    if isinstance(value, bytes):
+        value = value.decode("utf-8", "replace")
+    if not isinstance(value, str):
+        return None
+    value = value.strip("\x00 ")
+    return value or None
+
+
+def _taken_at(value, subsec) -> Optional[datetime]:
+    value = _text(value)
+    if not value:
+        return None
+    try:
+        taken_at = datetime.strptime(value[:19], EXIF_DATETIME_FORMAT)
+    except ValueError:
+        # Напр. "0000:00:00 00:00:00" у камер без виставленого годинника
+        return None
+    subsec = _text(subsec)
+    if subsec and subsec.isdigit():
+        taken_at = taken_at.replace(microsecond=int(subsec[:6].ljust(6, "0")))
+    return taken_at
+
+
+def _exif_fields(image) -> dict:
+    """taken_at, camera, lens, focal_length and orientation from EXIF headers"""
+    exif = image.getexif()
+    details = exif.get_ifd(EXIF_IFD)
+
+    make = _text(exif.get(TAG_MAKE))
+    model = _text(exif.get(TAG_MODEL))
+    # Більшість виробників повторюють марку в моделі: "NIKON CORPORATION" + "NIKON Z 9"
+    if make and model and model.lower().startswith(make.split()[0].lower()):
+        camera = model
+    else:
+        camera = " ".join(part for part in (make, model) if part) or None
+
+    focal_length = details.get(TAG_FOCAL_LENGTH)
+    try:
+        focal_length = float(focal_length) if focal_length is not None else None
+    except (TypeError, ValueError, ZeroDivisionError):
+        focal_length = None
+    if focal_length is not None and (math.isnan(focal_length) or focal_length <= 0):
+        focal_length = None
+
+    orientation = exif.get(TAG_ORIENTATION)
+    return {
+        "taken_at": _taken_at(
+            details.get(TAG_DATETIME_ORIGINAL) or exif.get(TAG_DATETIME),
+            details.get(TAG_SUBSEC_TIME_ORIGINAL)
+        ),
+        "camera": camera,
+        "lens": _text(details.get(TAG_LENS_MODEL)),
+        "focal_length": focal_length,
+        "orientation": orientation if isinstance(orientation, int) and 1 <= orientation <= 8 else 1,
+    }
+
+
+def image_info(source: Union[bytes, BinaryIO]) -> ImageInfo:
+    """Size, EXIF details, LQIP placeholder and dominant color from a single (downscaled) decode.
+
+    Raises like image_size if the header cannot be read; a file whose pixel
+    data fails to decode still gets its size, without placeholder and color.
+    Each step is timed in image_processing_duration_seconds.
+    """
+    with observe_image("header"):
+        image = open_image(source)
+        width, height = image.size
+    try:
+        exif = _exif_fields(image)
+    except Exception as e:
+        logger.warning("Could not read EXIF of a %sx%s image: %s", width, height, e)
+        exif = {"taken_at": None, "camera": None, "lens": None, "focal_length": None, "orientation": 1}
+    try:
+        placeholder, dominant_color = _placeholder(image)
+    except Exception as e:
+        logger.warning("Could not build a placeholder for a %sx%s image: %s", width, height, e)
+        placeholder = dominant_color = None
+    return ImageInfo(width, height, placeholder, dominant_color, **exif)
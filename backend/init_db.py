@@ -1,14 +1,15 @@
 #!/usr/bin/env python3
 
-import asyncio
-from sqlalchemy import create_engine
-from models import Base
-from config import settings
+import os
+from alembic import command
+from alembic.config import Config
 
 def create_tables():
-    """Create all database tables"""
-    engine = create_engine(settings.DATABASE_URL)
-    Base.metadata.create_all(bind=engine)
+    """Create all database tables by applying the alembic migrations"""
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    config = Config(os.path.join(backend_dir, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(backend_dir, "alembic"))
+    command.upgrade(config, "head")
     print("Database tables created successfully!")
 
 if __name__ == "__main__":
@@ -0,0 +1,170 @@
+import heapq
+import logging
+import random
+import re
+import time
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+from sqlalchemy import event
+from config import settings
+
+logger = logging.getLogger(__name__)
+access_logger = logging.getLogger("access")
+
+# Скільки найповільніших запитів зберігати на один HTTP-запит
+SLOWEST_KEPT = 3
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAMETER = re.compile(r"%\(\w+\)s|%s|\?|:\w+|\$\d+")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_VALUE_ROWS = re.compile(r"(\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """Normalize SQL so statements differing only in values group together"""
+    sql = _STRING_LITERAL.sub("?", statement)
+    sql = _PARAMETER.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _VALUE_LIST.sub("(...)", sql)
+    sql = _VALUE_ROWS.sub(r"\1", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+class RequestStats:
+    """SQL statistics collected while one HTTP request is handled"""
+
+    __slots__ = ("scope", "statements", "db_time", "slowest")
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.statements = 0
+        self.db_time = 0.0
+        self.slowest: List[Tuple[float, str]] = []
+
+    @property
+    def route(self) -> str:
+        # FastAPI кладе route у scope після маршрутизації
+        route = self.scope.get("route")
+        path = getattr(route, "path", None) or self.scope.get("path", "")
+        return f"{self.scope.get('method', '')} {path}"
+
+    def record(self, statement: str, duration: float):
+        self.statements += 1
+        self.db_time += duration
+        if len(self.slowest) < SLOWEST_KEPT:
+            heapq.heappush(self.slowest, (duration, statement))
+        elif duration > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, (duration, statement))
+
+    def slowest_statements(self) -> List[dict]:
+        return [
+            {"duration_ms": round(duration * 1000, 2), "sql": fingerprint(statement)}
+            for duration, statement in sorted(self.slowest, reverse=True)
+        ]
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def install_query_hooks(engine):
+    """Time every statement on engine and attribute it to the current request"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - context._query_start
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.record(statement, duration)
+        if duration * 1000 >= settings.SLOW_QUERY_MS:
+            logger.warning(
+                "Slow query %.1f ms on %s: %s",
+                duration * 1000,
+                stats.route if stats is not None else "-",
+                fingerprint(statement),
+                extra={
+                    "route": stats.route if stats is not None else None,
+                    "duration_ms": round(duration * 1000, 2),
+                    "sql_fingerprint": fingerprint(statement),
+                }
+            )
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware adding per-request DB statistics.
+
+    Sets a Server-Timing header with the statement count and DB time and
+    writes a structured access log line. Only ACCESS_LOG_SAMPLE_RATE of the
+    ordinary requests are logged; server errors, requests slower than
+    ACCESS_LOG_SLOW_MS and requests issuing more than REQUEST_QUERY_WARN_COUNT
+    statements are always logged.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                total_ms = (time.perf_counter() - started) * 1000
+                server_timing = (
+                    f'db;dur={stats.db_time * 1000:.1f};desc="{stats.statements} queries", '
+                    f"app;dur={total_ms:.1f}"
+                )
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
+            self._log(stats, status_code, (time.perf_counter() - started) * 1000)
+
+    def _log(self, stats: RequestStats, status_code: int, duration_ms: float):
+        too_many_queries = stats.statements > settings.REQUEST_QUERY_WARN_COUNT
+        notable = status_code >= 500 or duration_ms >= settings.ACCESS_LOG_SLOW_MS or too_many_queries
+        if not notable and (
+            random.random() >= settings.ACCESS_LOG_SAMPLE_RATE
+            or not access_logger.isEnabledFor(logging.INFO)
+        ):
+            return
+
+        fields = {
+            "route": stats.route,
+            "status": status_code,
+            "duration_ms": round(duration_ms, 2),
+            "db_statements": stats.statements,
+            "db_time_ms": round(stats.db_time * 1000, 2),
+            "slowest_sql": stats.slowest_statements(),
+            "sampled": not notable,
+        }
+        access_logger.info(
+            "%s %s %.1fms db=%d/%.1fms",
+            stats.route, status_code, duration_ms, stats.statements, stats.db_time * 1000,
+            extra=fields
+        )
+        if too_many_queries:
+            logger.warning(
+                "%s issued %d SQL statements, slowest: %s",
+                stats.route, stats.statements,
+                fingerprint(max(stats.slowest)[1]),
+                extra=fields
+            )
@@ -0,0 +1,196 @@
+import logging
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from config import settings
+from metrics import record_cache
+from models import Photo, Scene, SceneLayout
+from ordering import photo_order_by
+
+logger = logging.getLogger(__name__)
+
+# Бажана висота ряду - частка ширини в'юпорта в цих межах, пікселі
+ROW_HEIGHT_RATIO = 0.25
+MIN_ROW_HEIGHT = 120
+MAX_ROW_HEIGHT = 320
+# Ряд з кількох фото не стискається нижче цієї частки бажаної висоти
+MIN_ROW_RATIO = 0.5
+ASPECT_DIGITS = 4
+HEIGHT_DIGITS = 2
+
+Rows = Tuple[List[int], List[float]]
+
+
+def target_row_height(viewport_width: int) -> float:
+    # float навіть на межах: інакше висота останнього ряду в JSON виходить цілим числом
+    return float(min(max(viewport_width * ROW_HEIGHT_RATIO, MIN_ROW_HEIGHT), MAX_ROW_HEIGHT))
+
+
+def display_aspect(width, height, orientation) -> float:
+    """Width / height as displayed: EXIF orientations 5-8 turn the image by 90 degrees"""
+    if not width or not height:
+        return 1.0
+    if orientation and orientation >= 5:
+        width, height = height, width
+    return round(width / height, ASPECT_DIGITS)
+
+
+def justify(aspects: Sequence[float], viewport_width: int, spacing: int, start: int = 0) -> Rows:
+    """Row breaks for aspects[start:]: (index of each row's first photo, row heights).
+
+    Every row but the last fills viewport_width exactly; its cost is the
+    squared deviation of its height from target_row_height, and the total
+    cost is minimized by dynamic programming over break points, like
+    Knuth-Plass does for lines of text. The last row may stay short at the
+    target height.
+    """
+    target = target_row_height(viewport_width)
+    min_height = target * MIN_ROW_RATIO
+    count = len(aspects)
+    cost = [float("inf")] * (count + 1)
+    best_start = [start] * (count + 1)
+    cost[start] = 0.0
+
+    for end in range(start + 1, count + 1):
+        total = 0.0
+        for begin in range(end - 1, start - 1, -1):
+            total += aspects[begin]
+            height = (viewport_width - spacing * (end - begin - 1)) / total
+            # Висота лише зменшується з кожним доданим фото
+            if height < min_height and begin < end - 1:
+                break
+            row_cost = 0.0 if end == count and height >= target else (height - target) ** 2
+            if cost[begin] + row_cost < cost[end]:
+                cost[end] = cost[begin] + row_cost
+                best_start[end] = begin
+
+    starts: List[int] = []
+    heights: List[float] = []
+    end = count
+    while end > start:
+        begin = best_start[end]
+        height = (viewport_width - spacing * (end - begin - 1)) / sum(aspects[begin:end])
+        if end == count:
+            height = min(height, target)
+        starts.append(begin)
+        heights.append(round(height, HEIGHT_DIGITS))
+        end = begin
+    starts.reverse()
+    heights.reverse()
+    return starts, heights
+
+
+def relayout(layout: SceneLayout, photo_ids: List[int], aspects: List[float], spacing: int) -> Rows:
+    """Rows for the current photos, keeping the cached rows before the first change"""
+    old_ids, old_aspects = layout.photo_ids, layout.aspects
+    changed = 0
+    limit = min(len(old_ids), len(photo_ids))
+    while changed < limit and old_ids[changed] == photo_ids[changed] and old_aspects[changed] == aspects[changed]:
+        changed += 1
+    if changed == len(old_ids) == len(photo_ids):
+        return layout.row_starts, layout.row_heights
+
+    # Ряд, у якому перша зміна, і все після нього рахуються заново
+    row = max(bisect_right(layout.row_starts, changed) - 1, 0)
+    start = layout.row_starts[row] if layout.row_starts else 0
+    starts, heights = justify(aspects, layout.viewport_width, spacing, start)
+    return layout.row_starts[:row] + starts, layout.row_heights[:row] + heights
+
+
+def scene_photo_aspects(db: Session, scene_id: int) -> Tuple[List[int], List[float]]:
+    """Photo ids of a scene in manual order and their displayed aspect ratios"""
+    rows = db.query(Photo.id, Photo.width, Photo.height, Photo.orientation).filter(
+        Photo.scene_id == scene_id
+    ).order_by(*photo_order_by("manual")).all()
+    return [row.id for row in rows], [display_aspect(row.width, row.height, row.orientation) for row in rows]
+
+
+def invalidate_layouts(db: Session, scene_ids: Iterable[int]):
+    """Mark cached layouts of scenes as outdated; call in the transaction that changes their photos"""
+    scene_ids = list(set(scene_ids))
+    if scene_ids:
+        db.query(Scene).filter(Scene.id.in_(scene_ids)).update(
+            {Scene.layout_version: Scene.layout_version + 1}, synchronize_session=False
+        )
+
+
+def scene_layouts(db: Session, scene: Scene, viewport_widths: Sequence[int]) -> Tuple[List[int], Dict[int, Rows]]:
+    """Photo ids and rows per viewport width of a scene, from the cache when it is current.
+
+    Outdated layouts are recomputed from the first changed row and stored
+    together with the layout_version they were computed for.
+    """
+    spacing = settings.LAYOUT_SPACING
+    # Версія читається до фото: зміна, що закомітиться між ними, позначить кеш застарілим ще раз
+    version = scene.layout_version
+    cached = {
+        layout.viewport_width: layout
+        for layout in db.query(SceneLayout).filter(
+            SceneLayout.scene_id == scene.id,
+            SceneLayout.viewport_width.in_(viewport_widths)
+        )
+    }
+    current = {width for width, layout in cached.items() if layout.scene_version == version}
+    for width in viewport_widths:
+        record_cache("scene_layout", width in current)
+    if current.issuperset(viewport_widths):
+        return cached[viewport_widths[0]].photo_ids, {
+            width: (cached[width].row_starts, cached[width].row_heights) for width in viewport_widths
+        }
+
+    photo_ids, aspects = scene_photo_aspects(db, scene.id)
+    result = {}
+    for width in viewport_widths:
+        layout = cached.get(width)
+        if layout is None:
+            rows = justify(aspects, width, spacing)
+            db.add(SceneLayout(
+                scene_id=scene.id, viewport_width=width, photo_ids=photo_ids, aspects=aspects,
+                row_starts=rows[0], row_heights=rows[1], scene_version=version
+            ))
+        elif layout.scene_version != version:
+            rows = relayout(layout, photo_ids, aspects, spacing)
+            layout.photo_ids, layout.aspects = photo_ids, aspects
+            layout.row_starts, layout.row_heights = rows
+            layout.scene_version = version
+        else:
+            rows = (layout.row_starts, layout.row_heights)
+        result[width] = rows
+
+    try:
+        db.commit()
+    except IntegrityError:
+        # Паралельний запит уже зберіг розкладку для цієї ширини
+        db.rollback()
+        logger.debug("Layout of scene %s was stored concurrently", scene.id)
+    return photo_ids, result
+
+
+def requested_widths(widths: Optional[Sequence[int]]) -> List[int]:
+    """Viewport widths without duplicates, all configured ones by default; ValueError for others"""
+    widths = list(dict.fromkeys(widths or settings.LAYOUT_VIEWPORT_WIDTHS))
+    if not set(widths) <= set(settings.LAYOUT_VIEWPORT_WIDTHS):
+        raise ValueError(f"Layouts are available for widths {settings.LAYOUT_VIEWPORT_WIDTHS}")
+    return widths
+
+
+def layout_content(db: Session, scene, widths: List[int]) -> dict:
+    """schemas.SceneLayout payload of a scene (a Scene or a row with id and layout_version)"""
+    # scene_layouts може закомітити, і тоді ORM-об'єкт сцени буде прострочено
+    scene_id = scene.id
+    photo_ids, rows = scene_layouts(db, scene, widths)
+    return {
+        "scene_id": scene_id,
+        "photo_ids": photo_ids,
+        "layouts": [
+            {
+                "viewport_width": width,
+                "spacing": settings.LAYOUT_SPACING,
+                "row_starts": rows[width][0],
+                # Розкладки, збережені до виправлення target_row_height, можуть мати цілі висоти
+                "row_heights": [float(height) for height in rows[width][1]]
+            }
+            for width in widths
+        ]
+    }
@@ -1,25 +1,136 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 import os
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+from logging_config import setup_logging
+from config import settings
+from database import engine, SessionLocal
+from routers import auth, galleries, scenes, photos, users, contact, health, uploads, search
+from storage import storage_service
+from instrumentation import QueryStatsMiddleware, install_query_hooks
+from metrics import MetricsMiddleware, render_metrics
+from visitors import cleanup_expired_sessions
+from uploads import expire_upload_sessions
+from usage import reconcile_usage
+from archive import archive_galleries, restore_galleries, has_archived
+
 logger = logging.getLogger(__name__)
 
-from database import engine, Base
-from routers import auth, galleries, scenes, photos, users, contact
+# Пауза між спробами підготувати бакет, поки MinIO недоступний
+BUCKET_RETRY_SECONDS = 5
+
+async def ensure_bucket_in_background():
+    while True:
+        try:
+            if await run_in_threadpool(storage_service.ensure_bucket):
+                logger.info("Storage bucket %s is ready", storage_service.bucket_name)
+                return
+        except Exception as e:
+            logger.warning("Storage not reachable yet: %s", e)
+        await asyncio.sleep(BUCKET_RETRY_SECONDS)
+
+def _cleanup_expired_sessions():
+    db = SessionLocal()
+    try:
+        cleanup_expired_sessions(db)
+        expire_upload_sessions(db)
+    finally:
+        db.close()
+
+async def cleanup_sessions_periodically():
+    while True:
+        try:
+            await run_in_threadpool(_cleanup_expired_sessions)
+        except Exception as e:
+            logger.warning("Session cleanup failed: %s", e)
+        await asyncio.sleep(settings.VISITOR_SESSION_CLEANUP_INTERVAL)
+
+def _reconcile_usage():
+    db = SessionLocal()
+    try:
+        reconcile_usage(db)
+    finally:
+        db.close()
+
+async def reconcile_usage_periodically():
+    while True:
+        await asyncio.sleep(settings.USAGE_RECONCILE_INTERVAL)
+        try:
+            await run_in_threadpool(_reconcile_usage)
+        except Exception as e:
+            logger.warning("Storage usage reconciliation failed: %s", e)
+
+def _archive_galleries():
+    db = SessionLocal()
+    try:
+        archive_galleries(db, settings.ARCHIVE_AFTER_DAYS)
+    finally:
+        db.close()
 
-# Create tables only if they don't exist
-try:
-    Base.metadata.create_all(bind=engine)
-    logger.info("Database tables created successfully")
-except Exception as e:
-    logger.error(f"Error creating database tables: {e}")
+async def archive_galleries_periodically():
+    while True:
+        await asyncio.sleep(settings.ARCHIVE_INTERVAL)
+        try:
+            await run_in_threadpool(_archive_galleries)
+        except Exception as e:
+            logger.warning("Gallery archival failed: %s", e)
 
-app = FastAPI(title="YouGallery API", version="1.0.0")
+def _restore_galleries() -> bool:
+    """Work the restore queue; False once archival is off and nothing is left in the archive"""
+    db = SessionLocal()
+    try:
+        restore_galleries(db)
+        return settings.ARCHIVE_AFTER_DAYS > 0 or has_archived(db)
+    finally:
+        db.close()
+
+async def restore_galleries_periodically():
+    while True:
+        await asyncio.sleep(settings.RESTORE_INTERVAL)
+        try:
+            if not await run_in_threadpool(_restore_galleries):
+                logger.info("Archive is empty, restore queue stopped")
+                return
+        except Exception as e:
+            logger.warning("Gallery restore failed: %s", e)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Worker startup/shutdown.
+
+    Importing this module has no side effects: the schema is created by
+    `alembic upgrade head`, clients and heavy libraries load on first use.
+    """
+    setup_logging()
+    os.makedirs("uploads", exist_ok=True)
+    # Не блокуємо старт воркера на повільному MinIO - readiness покаже, коли він готовий
+    tasks = [asyncio.create_task(ensure_bucket_in_background())]
+    if settings.VISITOR_SESSION_CLEANUP_INTERVAL > 0:
+        tasks.append(asyncio.create_task(cleanup_sessions_periodically()))
+    if settings.USAGE_RECONCILE_INTERVAL > 0:
+        tasks.append(asyncio.create_task(reconcile_usage_periodically()))
+    if settings.ARCHIVE_AFTER_DAYS > 0 and settings.ARCHIVE_INTERVAL > 0:
+        tasks.append(asyncio.create_task(archive_galleries_periodically()))
+    # З вимкненою архівацією черга працює, лише поки в архіві лишаються галереї
+    if settings.RESTORE_INTERVAL > 0:
+        tasks.append(asyncio.create_task(restore_galleries_periodically()))
+    yield
+    for task in tasks:
+        task.cancel()
+    engine.dispose()
+
+app = FastAPI(title="YouGallery API", version="1.0.0", lifespan=lifespan)
+
+# Per-request SQL statement count, DB time and slow query warnings
+install_query_hooks(engine)
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(MetricsMiddleware, engine=engine)
 
 # CORS middleware
 app.add_middleware(
@@ -28,26 +139,32 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        "X-Next-Cursor", "X-Next-Offset", "Server-Timing", "Location", "X-Photo-Id",
+        "Tus-Resumable", "Tus-Version", "Tus-Extension", "Tus-Max-Size",
+        "Upload-Offset", "Upload-Length", "Upload-Expires",
+    ],
 )
 
-# Health check endpoint
-@app.get("/api/health")
-async def health_check():
-    return {"status": "healthy", "message": "YouGallery API is running"}
+# Prometheus metrics endpoint
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint():
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
 
 # Include routers with /api prefix
+app.include_router(health.router, prefix="/api", tags=["health"])
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(galleries.router, prefix="/api/galleries", tags=["galleries"])
 app.include_router(scenes.router, prefix="/api/galleries", tags=["scenes"])
 app.include_router(photos.router, prefix="/api/photos", tags=["photos"])
+app.include_router(uploads.router, prefix="/api/uploads", tags=["uploads"])
+app.include_router(search.router, prefix="/api/search", tags=["search"])
 app.include_router(users.router, prefix="/api/users", tags=["users"])
 app.include_router(contact.router, prefix="/api/contact", tags=["contact"])
 
-# Create uploads directory if it doesn't exist
-os.makedirs("uploads", exist_ok=True)
-
-# Mount static files
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+# Mount static files (the directory is created in lifespan)
+app.mount("/uploads", StaticFiles(directory="uploads", check_dir=False), name="uploads")
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,153 @@
+import os
+import time
+from contextlib import contextmanager
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Межі гістограм у секундах: від швидких запитів до великих завантажень
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "SQLAlchemy pool connections currently checked out",
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow_connections",
+    "SQLAlchemy pool connections opened beyond pool_size",
+    multiprocess_mode="livesum",
+)
+DB_POOL_SIZE = Gauge(
+    "db_pool_size_connections",
+    "SQLAlchemy pool_size per worker",
+    multiprocess_mode="livemax",
+)
+
+STORAGE_DURATION = Histogram(
+    "storage_operation_duration_seconds",
+    "Object storage call latency by operation",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+STORAGE_BYTES = Counter(
+    "storage_bytes_total",
+    "Bytes transferred to and from object storage by operation",
+    ["operation"],
+)
+STORAGE_ERRORS = Counter(
+    "storage_errors_total",
+    "Failed object storage calls by operation",
+    ["operation"],
+)
+
+IMAGE_PROCESSING_DURATION = Histogram(
+    "image_processing_duration_seconds",
+    "Pillow processing time by operation (header, decode, resize, encode, palette)",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by cache name and result (hit/miss)",
+    ["cache", "result"],
+)
+
+
+@contextmanager
+def observe_storage(operation: str):
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STORAGE_ERRORS.labels(operation).inc()
+        raise
+    finally:
+        STORAGE_DURATION.labels(operation).observe(time.perf_counter() - started)
+
+
+def record_storage_bytes(operation: str, size: int):
+    STORAGE_BYTES.labels(operation).inc(size)
+
+
+@contextmanager
+def observe_image(operation: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        IMAGE_PROCESSING_DURATION.labels(operation).observe(time.perf_counter() - started)
+
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def update_pool_gauges(engine):
+    pool = engine.pool
+    # SQLite/NullPool не мають лічильників QueuePool
+    if hasattr(pool, "checkedout"):
+        DB_POOL_CHECKED_OUT.set(pool.checkedout())
+        DB_POOL_OVERFLOW.set(max(pool.overflow(), 0))
+        DB_POOL_SIZE.set(pool.size())
+
+
+def render_metrics():
+    """Return (body, content type) for the /metrics endpoint.
+
+    With PROMETHEUS_MULTIPROC_DIR set (several uvicorn workers) the values of
+    all workers are merged; otherwise the in-process registry is used.
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency per route template"""
+
+    def __init__(self, app, engine):
+        self.app = app
+        self.engine = engine
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Шаблон маршруту замість шляху, щоб не роздувати кардинальність
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            HTTP_REQUEST_DURATION.labels(scope["method"], route, str(status_code)).observe(
+                time.perf_counter() - started
+            )
+            update_pool_gauges(self.engine)
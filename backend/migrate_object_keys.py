@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+
+import argparse
+from database import SessionLocal
+from object_keys import migrate_keys, legacy_photos, MIGRATE_BATCH
+
+def migrate_object_keys(batch=MIGRATE_BATCH, rate=0, limit=None, dry_run=False):
+    """Move photo objects from flat keys to <owner>/<gallery>/ keys with server-side copies"""
+    db = SessionLocal()
+    try:
+        if dry_run:
+            print(f"{legacy_photos(db).count()} photos have flat object keys")
+            return
+        stats = migrate_keys(db, batch, rate, limit)
+    finally:
+        db.close()
+    print(
+        f"Migrated {stats['migrated']} of {stats['photos']} photos ({stats['failed']} failed), "
+        f"deleted {stats['deleted_objects']} old objects"
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=migrate_object_keys.__doc__)
+    parser.add_argument("--batch", type=int, default=MIGRATE_BATCH)
+    parser.add_argument("--rate", type=float, default=0, help="max copied objects per second, 0 - unlimited")
+    parser.add_argument("--limit", type=int, help="migrate at most this many photos")
+    parser.add_argument("--dry-run", action="store_true", help="only count photos with flat keys")
+    args = parser.parse_args()
+    migrate_object_keys(args.batch, args.rate, args.limit, args.dry_run)
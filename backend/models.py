@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Float
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Boolean, Text, ForeignKey, Float, Index, UniqueConstraint, JSON, DDL, event, false
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -13,6 +13,10 @@ class User(Base):
     phone = Column(String, nullable=True)
     hashed_password = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
+    # Лічильники використання сховища, оновлюються разом зі зміною фото (usage.py)
+    storage_bytes = Column(BigInteger, nullable=False, default=0, server_default="0")
+    photo_count = Column(Integer, nullable=False, default=0, server_default="0")
+    storage_quota = Column(BigInteger, nullable=True)  # NULL - settings.STORAGE_QUOTA_BYTES
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -29,12 +33,23 @@ class Gallery(Base):
     password_hash = Column(String, nullable=True)
     cover_photo_id = Column(Integer, nullable=True)
     view_count = Column(Integer, default=0)
+    storage_bytes = Column(BigInteger, nullable=False, default=0, server_default="0")
+    photo_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Де лежать оригінали фото (archive.py): hot, cold або restoring - в черзі на відновлення
+    storage_tier = Column(String(16), nullable=False, default="hot", server_default="hot")
+    last_viewed_at = Column(DateTime(timezone=True), nullable=True)  # останній публічний перегляд
+    restore_requested_at = Column(DateTime(timezone=True), nullable=True)  # порядок у черзі відновлення
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
-    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     owner = relationship("User", back_populates="galleries")
     scenes = relationship("Scene", back_populates="gallery", cascade="all, delete-orphan")
+    visitor_sessions = relationship("VisitorSession", back_populates="gallery", cascade="all, delete-orphan", passive_deletes=True)
+    
+    __table_args__ = (
+        Index("ix_galleries_storage_tier_restore_requested_at", "storage_tier", "restore_requested_at"),
+    )
 
 class Scene(Base):
     __tablename__ = "scenes"
@@ -42,41 +57,136 @@ class Scene(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     order_index = Column(Integer, default=0)
+    # Збільшується при кожній зміні фото сцени, що впливає на розкладку
+    layout_version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     gallery_id = Column(Integer, ForeignKey("galleries.id"), nullable=False)
     gallery = relationship("Gallery", back_populates="scenes")
     photos = relationship("Photo", back_populates="scene", cascade="all, delete-orphan")
+    layouts = relationship("SceneLayout", back_populates="scene", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        Index("ix_scenes_gallery_id_order_index", "gallery_id", "order_index"),
+    )
 
 class Photo(Base):
     __tablename__ = "photos"
     
     id = Column(Integer, primary_key=True, index=True)
-    filename = Column(String, nullable=False)
+    filename = Column(String, nullable=False, index=True)
     original_filename = Column(String, nullable=False)
     file_path = Column(String, nullable=False)
     file_size = Column(Integer, nullable=False)
     mime_type = Column(String, nullable=False)
     width = Column(Integer, nullable=True)
     height = Column(Integer, nullable=True)
+    # Рахуються один раз при завантаженні і віддаються разом зі списками фото
+    placeholder = Column(String, nullable=True)  # LQIP: data URI крихітного WebP
+    dominant_color = Column(String(7), nullable=True)  # #rrggbb
+    # EXIF; taken_at - локальний час камери, тому без часового поясу
+    taken_at = Column(DateTime, nullable=True)
+    camera = Column(String, nullable=True)
+    lens = Column(String, nullable=True)
+    focal_length = Column(Float, nullable=True)
+    orientation = Column(Integer, nullable=True)  # NULL - EXIF ще не зчитувався
+    # Об'єкт лежить в archive_storage, а не в storage_service; плейсхолдер і розміри - тут, у базі
+    archived = Column(Boolean, nullable=False, default=False, server_default=false())
     order_index = Column(Integer, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     scene_id = Column(Integer, ForeignKey("scenes.id"), nullable=False)
+    # Денормалізовано зі scenes/galleries - галерейні запити та перевірка власника без join
+    gallery_id = Column(Integer, ForeignKey("galleries.id"), nullable=False)
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     scene = relationship("Scene", back_populates="photos")
     favorites = relationship("UserFavorite", back_populates="photo", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        Index("ix_photos_scene_id_order_index", "scene_id", "order_index"),
+        Index("ix_photos_gallery_id_order_index", "gallery_id", "order_index"),
+        Index("ix_photos_scene_id_taken_at", "scene_id", "taken_at"),
+        Index("ix_photos_gallery_id_taken_at", "gallery_id", "taken_at"),
+    )
+
+class VisitorSession(Base):
+    """Anonymous visitor of one gallery; favorites hang off it and expire with it"""
+    __tablename__ = "visitor_sessions"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    token = Column(String, nullable=False)  # session_id, згенерований клієнтом
+    gallery_id = Column(Integer, ForeignKey("galleries.id", ondelete="CASCADE"), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_seen_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    
+    gallery = relationship("Gallery", back_populates="visitor_sessions")
+    favorites = relationship("UserFavorite", back_populates="visitor_session", passive_deletes=True)
+    
+    __table_args__ = (
+        UniqueConstraint("token", "gallery_id", name="uq_visitor_sessions_token_gallery_id"),
+    )
 
 class UserFavorite(Base):
     __tablename__ = "user_favorites"
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # Nullable for anonymous users
-    session_id = Column(String, nullable=True)  # For anonymous users
-    photo_id = Column(Integer, ForeignKey("photos.id"), nullable=False)
+    visitor_session_id = Column(Integer, ForeignKey("visitor_sessions.id", ondelete="CASCADE"), nullable=True)  # For anonymous users
+    photo_id = Column(Integer, ForeignKey("photos.id"), nullable=False, index=True)
+    # Денормалізовано з photos - вибірки обмежені галереєю, що переглядається
+    gallery_id = Column(Integer, ForeignKey("galleries.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     photo = relationship("Photo", back_populates="favorites")
+    visitor_session = relationship("VisitorSession", back_populates="favorites")
+    
+    __table_args__ = (
+        Index("ix_user_favorites_user_id_photo_id", "user_id", "photo_id"),
+        Index("ix_user_favorites_visitor_session_id_photo_id", "visitor_session_id", "photo_id"),
+        Index("ix_user_favorites_gallery_id_user_id", "gallery_id", "user_id"),
+    )
+
+class UploadSession(Base):
+    """Resumable (tus) upload; received bytes go straight into a MinIO multipart upload"""
+    __tablename__ = "upload_sessions"
+    
+    id = Column(String, primary_key=True)  # випадковий токен з URL завантаження
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    scene_id = Column(Integer, ForeignKey("scenes.id", ondelete="CASCADE"), nullable=False)
+    filename = Column(String, nullable=False)  # ім'я об'єкта в бакеті
+    original_filename = Column(String, nullable=False)
+    mime_type = Column(String, nullable=False)
+    multipart_upload_id = Column(String, nullable=False)
+    upload_length = Column(BigInteger, nullable=False)
+    # Байти, вже збережені в MinIO; завжди кратне part_size, поки завантаження не завершене
+    upload_offset = Column(BigInteger, nullable=False, default=0)
+    part_size = Column(Integer, nullable=False)
+    photo_id = Column(Integer, ForeignKey("photos.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+
+class SceneLayout(Base):
+    """Justified rows of a scene (manual order) precomputed for one viewport width"""
+    __tablename__ = "scene_layouts"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    scene_id = Column(Integer, ForeignKey("scenes.id", ondelete="CASCADE"), nullable=False)
+    viewport_width = Column(Integer, nullable=False)
+    # Для чого порахована розкладка: id фото в порядку сцени і їх видимі співвідношення сторін
+    photo_ids = Column(JSON, nullable=False)
+    aspects = Column(JSON, nullable=False)
+    row_starts = Column(JSON, nullable=False)  # індекс першого фото кожного ряду
+    row_heights = Column(JSON, nullable=False)
+    # Scene.layout_version, для якої порахована; інша версія - розкладка звіряється і дораховується
+    scene_version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    scene = relationship("Scene", back_populates="layouts")
+    
+    __table_args__ = (
+        UniqueConstraint("scene_id", "viewport_width", name="uq_scene_layouts_scene_id_viewport_width"),
+    )
 
 class ContactMessage(Base):
     __tablename__ = "contact_messages"
@@ -87,3 +197,36 @@ class ContactMessage(Base):
     message = Column(Text, nullable=False)
     is_read = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+# Колонки повнотекстового пошуку. У PostgreSQL їх покривають GIN-індекси міграції 0009,
+# у SQLite (локальний запуск, бенчмарки) - FTS5-таблиці <table>_fts, синхронізовані тригерами
+SEARCH_COLUMNS = {
+    "galleries": ["name"],
+    "scenes": ["name"],
+    "photos": ["original_filename", "camera", "lens"],
+}
+
+def sqlite_fts_ddl(table: str, columns: list) -> list:
+    """FTS5 trigram index over table columns (external content) and its sync triggers"""
+    fts = f"{table}_fts"
+    names = ", ".join(columns)
+    new = ", ".join(f"new.{column}" for column in columns)
+    old = ", ".join(f"old.{column}" for column in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({names}, content='{table}', content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {names} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new}); END",
+    ]
+
+for _table, _columns in SEARCH_COLUMNS.items():
+    for _statement in sqlite_fts_ddl(_table, _columns):
+        event.listen(Base.metadata.tables[_table], "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+    event.listen(
+        Base.metadata.tables[_table], "before_drop",
+        DDL(f"DROP TABLE IF EXISTS {_table}_fts").execute_if(dialect="sqlite")
+    )
@@ -0,0 +1,82 @@
+"""Migration of flat object keys to the <owner>/<gallery>/ layout.
+
+Photos stored before the layout have keys without "/". Each batch locks
+its photo rows, copies the objects server-side to gallery_key() (the same
+base name under the gallery prefix, so a rerun overwrites rather than
+duplicates), points Photo.filename at the copies and commits. Old objects
+are deleted only after the commit, and only once no photo refers to them.
+A copy that fails leaves its photo on the old key for the next run.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from sqlalchemy.orm import Session
+from models import Photo
+from ordering import bulk_update
+from orphans import RateLimiter
+from storage import storage_service, gallery_key, COPY_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+# Фото за одну транзакцію; їхні рядки заблоковані, поки йде копіювання пачки
+MIGRATE_BATCH = 200
+
+
+def legacy_photos(db: Session):
+    """Hot photos whose object still has a flat key; archived ones move after their restore"""
+    return db.query(Photo).filter(~Photo.filename.contains("/"), Photo.archived.is_(False))
+
+
+def _copy(sources, targets):
+    """Copy each object; returns the list of targets that were copied (None for failures)"""
+    def copy(source, target):
+        try:
+            return storage_service.copy_file(source, target)
+        except Exception as e:
+            logger.error("Error copying %s to %s: %s", source, target, e)
+            return None
+
+    with ThreadPoolExecutor(max_workers=COPY_CONCURRENCY) as executor:
+        return list(executor.map(copy, sources, targets))
+
+
+def migrate_keys(db: Session, batch: int = MIGRATE_BATCH, rate: float = 0, limit: Optional[int] = None) -> dict:
+    """Move up to limit photos (all by default) to hierarchical keys; returns the statistics.
+
+    rate limits copied objects per second.
+    """
+    stats = {"photos": 0, "migrated": 0, "failed": 0, "deleted_objects": 0}
+    limiter = RateLimiter(rate)
+    last_id = 0
+    while limit is None or stats["photos"] < limit:
+        size = batch if limit is None else min(batch, limit - stats["photos"])
+        photos = legacy_photos(db).filter(Photo.id > last_id).order_by(Photo.id).limit(size).with_for_update().all()
+        if not photos:
+            db.commit()
+            break
+        last_id = photos[-1].id
+        stats["photos"] += len(photos)
+
+        targets = [gallery_key(photo.owner_id, photo.gallery_id, photo.filename) for photo in photos]
+        copied = _copy([photo.filename for photo in photos], targets)
+        moved = [(photo, target) for photo, target in zip(photos, copied) if target]
+        stats["failed"] += len(photos) - len(moved)
+        old_filenames = [photo.filename for photo, _ in moved]
+        bulk_update(db, Photo, [
+            {"id": photo.id, "filename": target, "file_path": f"/uploads/{target}"}
+            for photo, target in moved
+        ])
+        db.commit()
+        stats["migrated"] += len(moved)
+
+        # Той самий старий ключ міг мати ще й фото, яке наступна пачка ще не перенесла
+        referenced = {
+            filename for (filename,) in db.query(Photo.filename).filter(Photo.filename.in_(old_filenames))
+        }
+        unreferenced = sorted(set(old_filenames) - referenced)
+        failed = storage_service.delete_files(unreferenced)
+        stats["deleted_objects"] += len(unreferenced) - len(failed)
+        db.rollback()
+        limiter.wait(len(photos))
+        logger.info("Migrated object keys of %d photos (last id %d)", stats["migrated"], last_id)
+    return stats
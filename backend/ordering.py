@@ -0,0 +1,167 @@
+from bisect import bisect_left
+from typing import Dict, List, Literal, Optional, Sequence
+from sqlalchemy import Integer, case, column, func, select, update, values
+from sqlalchemy.orm import Session
+from models import Photo
+
+# Крок між сусідніми order_index, щоб більшість переміщень змінювала один рядок
+ORDER_GAP = 1024
+
+# manual - порядок, заданий власником (order_index)
+PhotoSort = Literal["manual", "taken_at", "taken_at_desc", "uploaded"]
+AutoOrderSort = Literal["taken_at", "taken_at_desc", "uploaded"]
+
+
+def _longest_increasing(keys: Sequence[int]) -> set:
+    """Return positions of one longest strictly increasing subsequence of keys"""
+    tails: List[int] = []
+    tail_pos: List[int] = []
+    prev: List[Optional[int]] = [None] * len(keys)
+
+    for pos, key in enumerate(keys):
+        i = bisect_left(tails, key)
+        if i == len(tails):
+            tails.append(key)
+            tail_pos.append(pos)
+        else:
+            tails[i] = key
+            tail_pos[i] = pos
+        prev[pos] = tail_pos[i - 1] if i > 0 else None
+
+    kept = set()
+    pos = tail_pos[-1] if tail_pos else None
+    while pos is not None:
+        kept.add(pos)
+        pos = prev[pos]
+    return kept
+
+
+def plan_order(current: Dict[int, int], ordered_ids: Sequence[int]) -> Dict[int, int]:
+    """Compute new sparse order keys for ordered_ids.
+
+    Items that are already in relative order keep their keys; the rest get
+    keys inside the gaps around them. Only changed ids are returned. If some
+    gap is too narrow the whole list is renumbered with ORDER_GAP spacing.
+    Ids without a current key (new items) always get a new one.
+    """
+    keys = [current[item_id] if current.get(item_id) is not None else 0 for item_id in ordered_ids]
+    known = [pos for pos, item_id in enumerate(ordered_ids) if current.get(item_id) is not None]
+    kept = {known[i] for i in _longest_increasing([keys[pos] for pos in known])}
+
+    assigned: List[Optional[int]] = [keys[pos] if pos in kept else None for pos in range(len(keys))]
+    pos = 0
+    fits = True
+    while pos < len(keys) and fits:
+        if assigned[pos] is not None:
+            pos += 1
+            continue
+        run_end = pos
+        while run_end < len(keys) and assigned[run_end] is None:
+            run_end += 1
+        run = run_end - pos
+        low = assigned[pos - 1] if pos > 0 else None
+        high = assigned[run_end] if run_end < len(keys) else None
+        if low is None and high is None:
+            low, high = 0, ORDER_GAP * (run + 1)
+        elif low is None:
+            low = high - ORDER_GAP * (run + 1)
+        elif high is None:
+            high = low + ORDER_GAP * (run + 1)
+
+        if high - low - 1 < run:
+            fits = False
+            break
+        for offset in range(run):
+            assigned[pos + offset] = low + (high - low) * (offset + 1) // (run + 1)
+        pos = run_end
+
+    if not fits:
+        assigned = [(pos + 1) * ORDER_GAP for pos in range(len(keys))]
+
+    return {
+        item_id: assigned[pos]
+        for pos, item_id in enumerate(ordered_ids)
+        if assigned[pos] != current.get(item_id)
+    }
+
+
+def apply_moves(ordered_ids: List[int], moves) -> List[int]:
+    """Apply move operations (id + before_id/after_id) to an ordered id list"""
+    result = list(ordered_ids)
+    for move in moves:
+        if move.id not in result:
+            raise ValueError(f"Unknown id {move.id}")
+        result.remove(move.id)
+        if move.before_id is not None:
+            if move.before_id not in result:
+                raise ValueError(f"Unknown id {move.before_id}")
+            result.insert(result.index(move.before_id), move.id)
+        elif move.after_id is not None:
+            if move.after_id not in result:
+                raise ValueError(f"Unknown id {move.after_id}")
+            result.insert(result.index(move.after_id) + 1, move.id)
+        else:
+            # Без сусіда - переміщуємо в кінець
+            result.append(move.id)
+    return result
+
+
+def bulk_update(db: Session, model, rows: List[dict]) -> int:
+    """Update many rows of model by id in a single statement.
+
+    rows are dicts with "id" plus the same set of column names. On PostgreSQL
+    this is UPDATE ... FROM (VALUES ...); other dialects get an equivalent
+    UPDATE ... SET col = CASE id ... END.
+    """
+    if not rows:
+        return 0
+
+    names = [name for name in rows[0] if name != "id"]
+    table_columns = model.__table__.c
+
+    if db.get_bind().dialect.name == "postgresql":
+        data = values(
+            column("id", Integer),
+            *[column(name, table_columns[name].type) for name in names],
+            name="v"
+        ).data([tuple(row[key] for key in ["id", *names]) for row in rows])
+        stmt = update(model).where(model.id == data.c.id).values(
+            {name: data.c[name] for name in names}
+        )
+    else:
+        stmt = update(model).where(model.id.in_([row["id"] for row in rows])).values(
+            {name: case({row["id"]: row[name] for row in rows}, value=model.id) for name in names}
+        )
+
+    result = db.execute(stmt.execution_options(synchronize_session=False))
+    return result.rowcount
+
+
+def photo_order_by(sort: str) -> tuple:
+    """ORDER BY clauses for a photo sort mode.
+
+    Photos without a capture time go last; ties keep the manual order.
+    """
+    manual = (Photo.order_index, Photo.id)
+    if sort == "taken_at":
+        return (Photo.taken_at.asc().nulls_last(), *manual)
+    if sort == "taken_at_desc":
+        return (Photo.taken_at.desc().nulls_last(), *manual)
+    if sort == "uploaded":
+        return (Photo.created_at, Photo.id)
+    return manual
+
+
+def auto_order(db: Session, scene_id: int, sort: str) -> int:
+    """Rewrite order_index of every photo in a scene by sort, in one UPDATE.
+
+    New positions are row_number() over the sort, spaced by ORDER_GAP.
+    Does not commit; returns the number of rows updated.
+    """
+    ranked = select(
+        Photo.id.label("id"),
+        ((func.row_number().over(order_by=photo_order_by(sort)) - 1) * ORDER_GAP).label("order_index")
+    ).where(Photo.scene_id == scene_id).subquery()
+    stmt = update(Photo).where(Photo.id == ranked.c.id).values(order_index=ranked.c.order_index)
+    result = db.execute(stmt.execution_options(synchronize_session=False))
+    return result.rowcount
@@ -0,0 +1,222 @@
+"""Reconciliation of bucket objects against photo rows.
+
+The bucket listing and Photo.filename are both streamed in key order and
+merge-joined, so neither side is held in memory. S3 lists keys by UTF-8
+bytes; photos are read with COLLATE "C" in PostgreSQL (index from migration
+0011) and BINARY in SQLite, which is the same order as Python str comparison.
+
+Objects without a photo or an unfinished upload are orphans; photos whose
+object is missing are dangling. Both are left alone while younger than the
+grace period: an upload stores the object a moment before its Photo commits.
+Archived photos (archive.py) are left out; their objects are in the cold tier.
+"""
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Optional, TextIO
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+from models import Gallery, Photo, UploadSession
+from storage import storage_service
+from layout import invalidate_layouts
+from usage import remove_photos
+
+logger = logging.getLogger(__name__)
+
+# Фото за один запит до бази і видалень за одну пачку; після кожної пачки пишеться checkpoint
+SWEEP_BATCH = 1000
+GRACE_HOURS = 24
+
+STAT_KEYS = (
+    "objects", "photos", "orphan_objects", "orphan_bytes", "deleted_objects",
+    "dangling_photos", "deleted_photos", "skipped_recent",
+)
+
+
+class OrderError(Exception):
+    """The bucket listing or the photo query is not in key order; merging would misreport"""
+
+
+class RateLimiter:
+    """Paces work to at most rate items per second; 0 - unlimited"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.started = time.monotonic()
+        self.count = 0
+
+    def wait(self, count: int = 1):
+        if self.rate <= 0:
+            return
+        self.count += count
+        delay = self.count / self.rate - (time.monotonic() - self.started)
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _ordered(items: Iterator, key, source: str) -> Iterator:
+    last = None
+    for item in items:
+        current = key(item)
+        if last is not None and current < last:
+            raise OrderError(f"{source} is not sorted: {current!r} after {last!r}")
+        last = current
+        yield item
+
+
+def _aware(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite повертає naive datetime в UTC
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def photo_filenames(db: Session, after: Optional[str] = None, batch: int = SWEEP_BATCH) -> Iterator:
+    """(id, filename, created_at) of the photos kept in the hot tier, in S3 key order, keyset-paginated"""
+    key = Photo.filename.collate("C") if db.get_bind().dialect.name == "postgresql" else Photo.filename
+    condition = key > after if after else None
+    while True:
+        # Архівовані фото лежать в archive_storage, а не в бакеті, що перевіряється
+        query = db.query(Photo.id, Photo.filename, Photo.created_at).filter(Photo.archived.is_(False))
+        if condition is not None:
+            query = query.filter(condition)
+        rows = query.order_by(key, Photo.id).limit(batch).all()
+        if not rows:
+            return
+        yield from rows
+        last = rows[-1]
+        condition = tuple_(key, Photo.id) > tuple_(last.filename, last.id)
+
+
+def load_checkpoint(path: Optional[str]) -> dict:
+    if path and os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {"after": None, "stats": dict.fromkeys(STAT_KEYS, 0)}
+
+
+def save_checkpoint(path: Optional[str], after: Optional[str], stats: dict):
+    if not path:
+        return
+    # Через тимчасовий файл - обірваний запис не зіпсує попередній checkpoint
+    with open(path + ".tmp", "w") as f:
+        json.dump({"after": after, "stats": stats}, f)
+    os.replace(path + ".tmp", path)
+
+
+def delete_orphan_objects(db: Session, filenames: List[str]) -> int:
+    """Delete objects that still have no photo; returns the number deleted"""
+    # Повторна перевірка перед видаленням: рядок міг з'явитися після того, як курсор його минув
+    referenced = {
+        filename for (filename,) in db.query(Photo.filename).filter(Photo.filename.in_(filenames))
+    }
+    filenames = [filename for filename in filenames if filename not in referenced]
+    failed = storage_service.delete_files(filenames)
+    return len(filenames) - len(failed)
+
+
+def delete_dangling_photos(db: Session, photo_ids: List[int]) -> int:
+    """Delete photo rows whose object is gone, keeping usage, layouts and covers consistent"""
+    # Фото, яке тим часом пішло в архів, вже не висяче: його об'єкт в archive_storage
+    photos = db.query(Photo).filter(Photo.id.in_(photo_ids), Photo.archived.is_(False)).all()
+    remove_photos(db, photos)
+    invalidate_layouts(db, [photo.scene_id for photo in photos])
+    db.query(Gallery).filter(Gallery.cover_photo_id.in_([photo.id for photo in photos])).update(
+        {Gallery.cover_photo_id: None}, synchronize_session=False
+    )
+    for photo in photos:
+        db.delete(photo)
+    db.commit()
+    return len(photos)
+
+
+def sweep(db: Session, delete_orphans: bool = False, delete_dangling: bool = False,
+          grace_hours: float = GRACE_HOURS, rate: float = 0, batch: int = SWEEP_BATCH,
+          checkpoint: Optional[str] = None, report: Optional[TextIO] = None) -> dict:
+    """Merge the bucket listing with the photos and report (or delete) the mismatches.
+
+    Resumes after the key stored in the checkpoint file and removes the file
+    once the whole bucket is processed. rate limits listed objects per
+    second. Each mismatch is written to report as a tab separated line.
+    Returns the statistics of the run, including resumed parts.
+    """
+    state = load_checkpoint(checkpoint)
+    after, stats = state["after"], state["stats"]
+    if after:
+        logger.info("Resuming storage sweep after %s", after)
+
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=grace_hours)
+    # Об'єкти незавершених tus-завантажень уже можуть існувати без Photo; їх небагато
+    uploading = {
+        filename for (filename,) in db.query(UploadSession.filename).filter(UploadSession.photo_id.is_(None))
+    }
+    limiter = RateLimiter(rate)
+    objects = _ordered(storage_service.list_files(after), lambda obj: obj.object_name, "Bucket listing")
+    photos = _ordered(photo_filenames(db, after, batch), lambda photo: photo.filename, "Photo query")
+
+    orphan_names: List[str] = []
+    dangling_ids: List[int] = []
+    processed = 0
+
+    def flush(position):
+        if orphan_names:
+            stats["deleted_objects"] += delete_orphan_objects(db, orphan_names)
+            orphan_names.clear()
+        if dangling_ids:
+            stats["deleted_photos"] += delete_dangling_photos(db, dangling_ids)
+            dangling_ids.clear()
+        db.rollback()  # не тримаємо транзакцію (і знімок) між пачками
+        save_checkpoint(checkpoint, position, stats)
+
+    obj = next(objects, None)
+    photo = next(photos, None)
+    while obj is not None or photo is not None:
+        if photo is None or (obj is not None and obj.object_name < photo.filename):
+            # Об'єкт без фото
+            position = obj.object_name
+            stats["objects"] += 1
+            if _aware(obj.last_modified) > cutoff:
+                stats["skipped_recent"] += 1
+            elif position not in uploading:
+                stats["orphan_objects"] += 1
+                stats["orphan_bytes"] += obj.size or 0
+                if report:
+                    report.write(f"orphan_object\t{position}\t{obj.size}\n")
+                if delete_orphans:
+                    orphan_names.append(position)
+            obj = next(objects, None)
+            limiter.wait()
+        elif obj is None or photo.filename < obj.object_name:
+            # Фото без об'єкта; рядки з однаковим filename обробляються разом
+            position = photo.filename
+            while photo is not None and photo.filename == position:
+                stats["photos"] += 1
+                if _aware(photo.created_at) > cutoff:
+                    stats["skipped_recent"] += 1
+                else:
+                    stats["dangling_photos"] += 1
+                    if report:
+                        report.write(f"dangling_photo\t{photo.id}\t{position}\n")
+                    if delete_dangling:
+                        dangling_ids.append(photo.id)
+                photo = next(photos, None)
+        else:
+            position = obj.object_name
+            stats["objects"] += 1
+            while photo is not None and photo.filename == position:
+                stats["photos"] += 1
+                photo = next(photos, None)
+            obj = next(objects, None)
+            limiter.wait()
+
+        processed += 1
+        if processed % batch == 0:
+            flush(position)
+
+    flush(None)
+    if checkpoint and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    logger.info("Storage sweep finished: %s", stats)
+    return stats
@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+
+import argparse
+from database import SessionLocal
+from usage import reconcile_usage, RECONCILE_BATCH
+
+def reconcile(batch=RECONCILE_BATCH):
+    """Recompute storage usage counters of users and galleries from their photos"""
+    db = SessionLocal()
+    try:
+        users, galleries = reconcile_usage(db, batch)
+    finally:
+        db.close()
+    print(f"Fixed storage usage of {users} users and {galleries} galleries")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=reconcile.__doc__)
+    parser.add_argument("--batch", type=int, default=RECONCILE_BATCH)
+    args = parser.parse_args()
+    reconcile(args.batch)
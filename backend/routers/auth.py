@@ -1,3 +1,4 @@
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
@@ -8,8 +9,10 @@ from database import get_db
 from models import User
 from schemas import UserCreate, UserResponse, Token
 from auth import verify_password, get_password_hash, create_access_token, get_current_user
+from visitors import merge_session_favorites
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
@@ -62,14 +65,14 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Registration error: {e}")
+        logger.exception("Registration error: %s", e)
         raise HTTPException(
             status_code=500,
             detail="Internal server error during registration"
         )
 
 @router.post("/login", response_model=Token)
-async def login(user_credentials: dict, db: Session = Depends(get_db)):
+def login(user_credentials: dict, db: Session = Depends(get_db)):
     try:
         email = user_credentials.get("email")
         password = user_credentials.get("password")
@@ -89,6 +92,13 @@ async def login(user_credentials: dict, db: Session = Depends(get_db)):
                 detail="Incorrect email or password"
             )
         
+        # Обрані анонімного відвідувача переходять до акаунта
+        session_id = user_credentials.get("session_id")
+        if session_id:
+            merged = merge_session_favorites(db, session_id, user.id)
+            db.commit()
+            logger.debug("Merged %d session favorites into user %s", merged, user.id)
+        
         # Create access token
         access_token_expires = timedelta(minutes=30)
         access_token = create_access_token(
@@ -102,7 +112,7 @@ async def login(user_credentials: dict, db: Session = Depends(get_db)):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Login error: {e}")
+        logger.exception("Login error: %s", e)
         raise HTTPException(
             status_code=500,
             detail="Internal server error during login"
@@ -1,8 +1,13 @@
+import base64
+import json
 import logging
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
+from datetime import datetime
+from typing import List, Optional, Literal
+from urllib.parse import quote
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Body, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
+from sqlalchemy import func, select, tuple_
 from database import get_db
 from models import Gallery, Scene, Photo, User, UserFavorite
 from schemas import (
@@ -10,16 +15,101 @@ from schemas import (
     GalleryCreate, 
     GalleryUpdate, 
     GalleryWithScenes,
-    SceneWithPhotos,
-    PhotoWithUrl
+    GallerySummary,
+    PhotoWithUrl,
+    ArchiveStatus
+)
+from auth import get_current_active_user, get_optional_current_user, get_password_hash, verify_password
+from storage import storage_service, archive_storage, gallery_prefix
+from visitors import favorite_photo_ids, touch_session
+from usage import remove_photos
+from export import gallery_entries, zip_stream
+from archive import TIER_COLD, request_restore, restore_status, touch_gallery
+from ordering import PhotoSort, photo_order_by
+from layout import layout_content, requested_widths
+from serializers import (
+    ORJSONResponse,
+    PHOTO_COLUMNS,
+    SCENE_COLUMNS,
+    photo_content,
+    photos_content,
+    scene_content,
+    gallery_content
 )
-from auth import get_current_active_user, get_optional_current_user
-from storage import storage_service
-from passlib.context import CryptContext
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Колонки, за якими можна сортувати список галерей
+GALLERY_SORT_COLUMNS = {
+    "created_at": Gallery.created_at,
+    "shooting_date": Gallery.shooting_date,
+    "name": Gallery.name,
+    "view_count": func.coalesce(Gallery.view_count, 0),
+}
+
+def _encode_cursor(value, gallery_id: int) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([value, gallery_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def _layout_widths(widths: Optional[List[int]]) -> Optional[List[int]]:
+    """Validated layout_widths parameter; None when layouts were not asked for"""
+    if not widths:
+        return None
+    try:
+        return requested_widths(widths)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+def _gallery_with_scenes(db: Session, gallery: Gallery, user_id: Optional[int],
+                         session_token: Optional[str] = None, sort: str = "manual",
+                         layout_widths: Optional[List[int]] = None) -> dict:
+    """Build the GalleryWithScenes payload with three queries regardless of size.
+
+    With layout_widths every scene also carries its justified rows (manual
+    order, see layout.py) - one or two more queries per scene.
+    """
+    scenes = db.query(*SCENE_COLUMNS).filter(
+        Scene.gallery_id == gallery.id
+    ).order_by(Scene.order_index).all()
+    
+    photo_rows = db.query(*PHOTO_COLUMNS).filter(
+        Photo.gallery_id == gallery.id
+    ).order_by(*photo_order_by(sort)).all()
+    
+    favorite_ids = favorite_photo_ids(db, gallery.id, user_id, session_token)
+    
+    photos_by_scene = {}
+    for row in photo_rows:
+        photos_by_scene.setdefault(row.scene_id, []).append(
+            photo_content(row, row.id in favorite_ids)
+        )
+    
+    layouts = {
+        scene.id: layout_content(db, scene, layout_widths) for scene in scenes
+    } if layout_widths else {}
+    
+    return gallery_content(gallery, [
+        scene_content(scene, photos_by_scene.get(scene.id, []), layouts.get(scene.id))
+        for scene in scenes
+    ])
+
+def _decode_cursor(cursor: str, sort: str):
+    try:
+        value, gallery_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if sort in ("created_at", "shooting_date"):
+            value = datetime.fromisoformat(value)
+        return value, int(gallery_id)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
 
 @router.post("/", response_model=GallerySchema)
 def create_gallery(
@@ -27,10 +117,10 @@ def create_gallery(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    logger.info(f"User {current_user.email} creating gallery: {gallery.name}")
+    logger.info("User %s creating gallery: %s", current_user.email, gallery.name)
     password_hash = None
     if gallery.password:
-        password_hash = pwd_context.hash(gallery.password)
+        password_hash = get_password_hash(gallery.password)
     
     db_gallery = Gallery(
         name=gallery.name,
@@ -52,29 +142,87 @@ def create_gallery(
     )
     db.add(default_scene)
     db.commit()
-    logger.info(f"Gallery {db_gallery.id} created successfully with default scene.")
+    logger.info("Gallery %s created successfully with default scene.", db_gallery.id)
     return db_gallery
 
-@router.get("/", response_model=List[GallerySchema])
+@router.get("/", response_model=List[GallerySummary])
 def get_galleries(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    sort: Literal["created_at", "shooting_date", "name", "view_count"] = "created_at",
+    order: Literal["asc", "desc"] = "desc",
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=200),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    galleries = db.query(Gallery).filter(
-        Gallery.owner_id == current_user.id
-    ).offset(skip).limit(limit).all()
+    """List the user's galleries with aggregates, paginated by keyset cursor.
+
+    The cursor for the next page is returned in the X-Next-Cursor header.
+    """
+    sort_column = GALLERY_SORT_COLUMNS[sort]
+    
+    # Агрегати рахуються корельованими підзапитами лише для рядків сторінки
+    scene_count = select(func.count(Scene.id)).where(
+        Scene.gallery_id == Gallery.id
+    ).scalar_subquery()
+    favorites_count = select(func.count(UserFavorite.id)).where(
+        UserFavorite.gallery_id == Gallery.id
+    ).scalar_subquery()
+    cover_filename = func.coalesce(
+        select(Photo.filename).where(Photo.id == Gallery.cover_photo_id).scalar_subquery(),
+        select(Photo.filename).join(Scene).where(
+            Scene.gallery_id == Gallery.id
+        ).order_by(Scene.order_index, Photo.order_index, Photo.id).limit(1).scalar_subquery()
+    )
     
-    return galleries
+    query = db.query(
+        Gallery,
+        scene_count,
+        favorites_count,
+        cover_filename,
+        sort_column
+    ).filter(Gallery.owner_id == current_user.id)
+    
+    if cursor:
+        value, last_id = _decode_cursor(cursor, sort)
+        if order == "desc":
+            query = query.filter(tuple_(sort_column, Gallery.id) < tuple_(value, last_id))
+        else:
+            query = query.filter(tuple_(sort_column, Gallery.id) > tuple_(value, last_id))
+    
+    if order == "desc":
+        query = query.order_by(sort_column.desc(), Gallery.id.desc())
+    else:
+        query = query.order_by(sort_column.asc(), Gallery.id.asc())
+    
+    rows = query.limit(limit + 1).all()
+    
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_row = rows[-1]
+        response.headers["X-Next-Cursor"] = _encode_cursor(last_row[4], last_row[0].id)
+    
+    # Кількість фото та обсяг - з лічильників галереї (usage.py), без агрегації фото
+    return [
+        GallerySummary(
+            **gallery.__dict__,
+            scene_count=scenes,
+            total_bytes=gallery.storage_bytes,
+            favorites_count=favorites,
+            cover_url=storage_service.get_file_url(cover) if cover else None
+        )
+        for gallery, scenes, favorites, cover, _ in rows
+    ]
 
 @router.get("/{gallery_id}", response_model=GalleryWithScenes)
 def get_gallery(
     gallery_id: int,
+    sort: PhotoSort = "manual",
+    layout_widths: Optional[List[int]] = Query(None),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    logger.info(f"Getting gallery {gallery_id} for user {current_user.email}")
+    logger.debug("Getting gallery %s for user %s", gallery_id, current_user.email)
     
     # Get gallery with scenes and photos
     gallery = db.query(Gallery).filter(
@@ -83,73 +231,34 @@ def get_gallery(
     ).first()
     
     if not gallery:
-        logger.error(f"Gallery {gallery_id} not found for user {current_user.email}")
+        logger.error("Gallery %s not found for user %s", gallery_id, current_user.email)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Gallery not found"
         )
     
-    # Get scenes for this gallery
-    scenes = db.query(Scene).filter(
-        Scene.gallery_id == gallery_id
-    ).order_by(Scene.order_index).all()
-    
-    # Get photos for each scene
-    scenes_with_photos = []
-    for scene in scenes:
-        photos = db.query(Photo).filter(
-            Photo.scene_id == scene.id
-        ).order_by(Photo.order_index).all()
-        
-        # Add URLs to photos
-        photos_with_urls = []
-        for photo in photos:
-            photo_dict = photo.__dict__.copy()
-            photo_dict["url"] = storage_service.get_file_url(photo.filename)
-            
-            # Check if photo is favorited
-            is_favorite = db.query(UserFavorite).filter(
-                UserFavorite.user_id == current_user.id,
-                UserFavorite.photo_id == photo.id
-            ).first() is not None
-            
-            photo_dict["is_favorite"] = is_favorite
-            photos_with_urls.append(PhotoWithUrl(**photo_dict))
-        
-        scene_dict = scene.__dict__.copy()
-        scene_dict["photos"] = photos_with_urls
-        scenes_with_photos.append(SceneWithPhotos(**scene_dict))
-    
-    # Create response
-    gallery_response = GalleryWithScenes(
-        id=gallery.id,
-        name=gallery.name,
-        shooting_date=gallery.shooting_date,
-        is_public=gallery.is_public,
-        is_password_protected=gallery.is_password_protected,
-        view_count=gallery.view_count,
-        created_at=gallery.created_at,
-        updated_at=gallery.updated_at,
-        owner_id=gallery.owner_id,
-        scenes=scenes_with_photos
-    )
-
-    logger.info(f"Found gallery {gallery_id} with {len(scenes_with_photos)} scenes")
-    return gallery_response
+    content = _gallery_with_scenes(db, gallery, current_user.id, sort=sort,
+                                   layout_widths=_layout_widths(layout_widths))
+    logger.debug("Found gallery %s with %s scenes", gallery_id, len(content['scenes']))
+    return ORJSONResponse(content)
 
 @router.get("/{gallery_id}/public", response_model=GalleryWithScenes)
 def get_public_gallery(
     gallery_id: int,
+    session_id: Optional[str] = None,
+    sort: PhotoSort = "manual",
+    layout_widths: Optional[List[int]] = Query(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_optional_current_user)
 ):
-    logger.info(f"Getting public gallery {gallery_id}")
+    logger.debug("Getting public gallery %s", gallery_id)
+    layout_widths = _layout_widths(layout_widths)
     
     # Get gallery - всі галереї тепер публічні
     gallery = db.query(Gallery).filter(Gallery.id == gallery_id).first()
     
     if not gallery:
-        logger.error(f"Gallery {gallery_id} does not exist")
+        logger.error("Gallery %s does not exist", gallery_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Gallery not found"
@@ -157,57 +266,19 @@ def get_public_gallery(
     
     # Increment view count
     gallery.view_count += 1
+    touch_gallery(db, gallery_id)
+    # Перегляд холодної галереї ставить її в чергу на відновлення з архіву
+    if gallery.storage_tier == TIER_COLD:
+        request_restore(db, gallery_id)
+    if session_id and not current_user:
+        touch_session(db, session_id, gallery_id)
     db.commit()
     
-    # Get scenes for this gallery
-    scenes = db.query(Scene).filter(
-        Scene.gallery_id == gallery_id
-    ).order_by(Scene.order_index).all()
-    
-    # Get photos for each scene
-    scenes_with_photos = []
-    for scene in scenes:
-        photos = db.query(Photo).filter(
-            Photo.scene_id == scene.id
-        ).order_by(Photo.order_index).all()
-        
-        # Add URLs to photos
-        photos_with_urls = []
-        for photo in photos:
-            photo_dict = photo.__dict__.copy()
-            photo_dict["url"] = storage_service.get_file_url(photo.filename)
-            
-            # Check if photo is favorited by current user
-            is_favorite = False
-            if current_user:
-                is_favorite = db.query(UserFavorite).filter(
-                    UserFavorite.user_id == current_user.id,
-                    UserFavorite.photo_id == photo.id
-                ).first() is not None
-            
-            photo_dict["is_favorite"] = is_favorite
-            photos_with_urls.append(PhotoWithUrl(**photo_dict))
-        
-        scene_dict = scene.__dict__.copy()
-        scene_dict["photos"] = photos_with_urls
-        scenes_with_photos.append(SceneWithPhotos(**scene_dict))
-    
-    # Create response
-    gallery_response = GalleryWithScenes(
-        id=gallery.id,
-        name=gallery.name,
-        shooting_date=gallery.shooting_date,
-        is_public=gallery.is_public,
-        is_password_protected=gallery.is_password_protected,
-        view_count=gallery.view_count,
-        created_at=gallery.created_at,
-        updated_at=gallery.updated_at,
-        owner_id=gallery.owner_id,
-        scenes=scenes_with_photos
+    content = _gallery_with_scenes(
+        db, gallery, current_user.id if current_user else None, session_id, sort, layout_widths
     )
-
-    logger.info(f"Found public gallery {gallery_id} with {len(scenes_with_photos)} scenes")
-    return gallery_response
+    logger.debug("Found public gallery %s with %s scenes", gallery_id, len(content['scenes']))
+    return ORJSONResponse(content)
 
 @router.put("/{gallery_id}", response_model=GallerySchema)
 def update_gallery(
@@ -216,14 +287,14 @@ def update_gallery(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    logger.info(f"User {current_user.email} updating gallery {gallery_id}")
+    logger.info("User %s updating gallery %s", current_user.email, gallery_id)
     gallery = db.query(Gallery).filter(
         Gallery.id == gallery_id,
         Gallery.owner_id == current_user.id
     ).first()
     
     if not gallery:
-        logger.warning(f"Gallery {gallery_id} not found for update by user {current_user.email}")
+        logger.warning("Gallery %s not found for update by user %s", gallery_id, current_user.email)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Gallery not found"
@@ -235,7 +306,7 @@ def update_gallery(
     if "password" in update_data:
         password = update_data.pop('password')
         if password:
-            update_data['password_hash'] = pwd_context.hash(password)
+            update_data['password_hash'] = get_password_hash(password)
             update_data['is_password_protected'] = True
         else:
             update_data['password_hash'] = None
@@ -250,7 +321,7 @@ def update_gallery(
             
     db.commit()
     db.refresh(gallery)
-    logger.info(f"Gallery {gallery_id} updated successfully.")
+    logger.info("Gallery %s updated successfully.", gallery_id)
     return gallery
 
 @router.delete("/{gallery_id}")
@@ -259,7 +330,7 @@ def delete_gallery(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    logger.info(f"User {current_user.email} attempting to delete gallery {gallery_id}")
+    logger.info("User %s attempting to delete gallery %s", current_user.email, gallery_id)
     
     db_gallery = db.query(Gallery).filter(
         Gallery.id == gallery_id,
@@ -267,7 +338,7 @@ def delete_gallery(
     ).first()
     
     if not db_gallery:
-        logger.warning(f"Gallery {gallery_id} not found for user {current_user.email}")
+        logger.warning("Gallery %s not found for user %s", gallery_id, current_user.email)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Gallery not found"
@@ -275,25 +346,36 @@ def delete_gallery(
     
     try:
         # Get all photos in the gallery to delete from storage
-        photos = db.query(Photo).join(Scene).filter(Scene.gallery_id == gallery_id).all()
-        
-        # Delete photos from storage
-        for photo in photos:
-            try:
-                storage_service.delete_file(photo.filename)
-                logger.info(f"Deleted photo file: {photo.filename}")
-            except Exception as e:
-                logger.warning(f"Failed to delete photo file {photo.filename}: {e}")
+        photos = db.query(Photo.filename, Photo.file_size, Photo.owner_id, Photo.gallery_id, Photo.archived).filter(
+            Photo.gallery_id == gallery_id
+        ).all()
         
         # Delete gallery (cascade will handle scenes and photos)
+        remove_photos(db, photos)
         db.delete(db_gallery)
         db.commit()
         
-        logger.info(f"Successfully deleted gallery {gallery_id}")
+        # Файли - після commit: усі об'єкти галереї лежать під її префіксом, плюс ключі
+        # старої плоскої схеми, ще не перенесені migrate_object_keys.py
+        prefix = gallery_prefix(current_user.id, gallery_id)
+        try:
+            failed = []
+            for archived, storage in ((False, storage_service), (True, archive_storage)):
+                failed += storage.delete_prefix(prefix)
+                failed += storage.delete_files([
+                    photo.filename for photo in photos
+                    if photo.archived == archived and not photo.filename.startswith(prefix)
+                ])
+            if failed:
+                logger.warning("Failed to delete %d files of gallery %s", len(failed), gallery_id)
+        except Exception as e:
+            logger.warning("Failed to delete files of gallery %s: %s", gallery_id, e)
+        
+        logger.info("Successfully deleted gallery %s", gallery_id)
         return {"message": "Gallery deleted successfully"}
         
     except Exception as e:
-        logger.error(f"Error deleting gallery {gallery_id}: {e}")
+        logger.error("Error deleting gallery %s: %s", gallery_id, e)
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -319,7 +401,7 @@ def check_gallery_password(
     
     password = password_data.get("password", "")
     
-    if not gallery.password_hash or not pwd_context.verify(password, gallery.password_hash):
+    if not gallery.password_hash or not verify_password(password, gallery.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect password"
@@ -333,7 +415,7 @@ def get_gallery_favorites(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    logger.info(f"Getting ALL client favorites for gallery {gallery_id} by owner {current_user.email}")
+    logger.debug("Getting ALL client favorites for gallery %s by owner %s", gallery_id, current_user.email)
     
     # Check if gallery exists and belongs to user
     gallery = db.query(Gallery).filter(
@@ -342,7 +424,7 @@ def get_gallery_favorites(
     ).first()
     
     if not gallery:
-        logger.error(f"Gallery {gallery_id} not found for user {current_user.email}")
+        logger.error("Gallery %s not found for user %s", gallery_id, current_user.email)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Gallery not found or you don't have permission"
@@ -350,27 +432,90 @@ def get_gallery_favorites(
     
     # Get ALL photos in this gallery that are favorited by ANY user (including anonymous)
     # This includes both registered users and anonymous session-based favorites
-    favorites = db.query(UserFavorite).join(Photo).join(Scene).filter(
-        Scene.gallery_id == gallery_id
-    ).all()
-    
-    logger.info(f"Found {len(favorites)} total client favorites for gallery {gallery_id}")
-    
-    photos_with_urls = []
-    seen_photo_ids = set()  # To avoid duplicates if same photo is liked by multiple users
-    
-    for favorite in favorites:
-        if favorite.photo_id not in seen_photo_ids:
-            photo = db.query(Photo).filter(Photo.id == favorite.photo_id).first()
-            if photo:
-                photo_dict = photo.__dict__.copy()
-                photo_dict["url"] = storage_service.get_file_url(photo.filename)
-                photo_dict["is_favorite"] = True
-                photos_with_urls.append(PhotoWithUrl(**photo_dict))
-                seen_photo_ids.add(favorite.photo_id)
-    
-    logger.info(f"Returning {len(photos_with_urls)} unique favorite photos for gallery {gallery_id}")
-    return photos_with_urls
+    # Порядок - за першим додаванням в обране, кожне фото лише один раз
+    first_favorites = db.query(
+        UserFavorite.photo_id.label("photo_id"),
+        func.min(UserFavorite.id).label("first_id")
+    ).filter(
+        UserFavorite.gallery_id == gallery_id
+    ).group_by(UserFavorite.photo_id).subquery()
+    
+    photo_rows = db.query(*PHOTO_COLUMNS).join(
+        first_favorites, first_favorites.c.photo_id == Photo.id
+    ).order_by(first_favorites.c.first_id).all()
+    
+    logger.debug("Returning %s unique favorite photos for gallery %s", len(photo_rows), gallery_id)
+    return ORJSONResponse(photos_content(photo_rows, {row.id for row in photo_rows}))
+
+@router.get("/{gallery_id}/export")
+def export_gallery(
+    gallery_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """All photos of the gallery as a zip archive, one folder per scene"""
+    gallery = db.query(Gallery.id, Gallery.name).filter(
+        Gallery.id == gallery_id,
+        Gallery.owner_id == current_user.id
+    ).first()
+    
+    if not gallery:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Gallery not found"
+        )
+    
+    # Список фото береться до відповіді; архів пишеться вже під час передачі
+    entries = gallery_entries(db, gallery_id)
+    logger.info("Exporting %s photos of gallery %s", len(entries), gallery_id)
+    return StreamingResponse(
+        zip_stream(entries),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{quote(gallery.name or 'gallery')}.zip"}
+    )
+
+@router.get("/{gallery_id}/archive", response_model=ArchiveStatus)
+def get_archive_status(
+    gallery_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Storage tier of the gallery and how far its restore from the archive has got"""
+    gallery = db.query(Gallery).filter(
+        Gallery.id == gallery_id,
+        Gallery.owner_id == current_user.id
+    ).first()
+    
+    if not gallery:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Gallery not found"
+        )
+    
+    return restore_status(db, gallery)
+
+@router.post("/{gallery_id}/restore", response_model=ArchiveStatus, status_code=status.HTTP_202_ACCEPTED)
+def restore_gallery(
+    gallery_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Queue a cold gallery for restore; progress is reported by GET /{gallery_id}/archive"""
+    gallery = db.query(Gallery).filter(
+        Gallery.id == gallery_id,
+        Gallery.owner_id == current_user.id
+    ).first()
+    
+    if not gallery:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Gallery not found"
+        )
+    
+    request_restore(db, gallery_id)
+    db.commit()
+    db.refresh(gallery)
+    return restore_status(db, gallery)
 
 # OPTIONS handlers для CORS
 @router.options("/")
@@ -389,6 +534,18 @@ async def public_gallery_options():
 async def check_password_options():
     return {"message": "OK"}
 
+@router.options("/{gallery_id}/archive")
+async def archive_status_options():
+    return {"message": "OK"}
+
+@router.options("/{gallery_id}/restore")
+async def restore_gallery_options():
+    return {"message": "OK"}
+
+@router.options("/{gallery_id}/export")
+async def export_gallery_options():
+    return {"message": "OK"}
+
 @router.options("/{gallery_id}/favorites")
 async def gallery_favorites_options():
     return {"message": "OK"}
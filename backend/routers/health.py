@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Optional
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from config import settings
+from database import engine
+from metrics import record_cache
+from storage import storage_service
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+class CachedProbe:
+    """Dependency check whose result is reused for HEALTH_CHECK_CACHE_SECONDS.
+
+    The blocking check runs in the default executor. A check that outlives
+    HEALTH_CHECK_TIMEOUT counts as failed, and no second check is started
+    while it is still running, so a hung dependency cannot pile up threads.
+    """
+
+    def __init__(self, name: str, check: Callable[[], bool]):
+        self.name = name
+        self.check = check
+        self._result: Optional[dict] = None
+        self._checked_at = 0.0
+        self._pending: Optional[asyncio.Future] = None
+        self._latency_ms = 0.0
+
+    def _run(self) -> bool:
+        started = time.perf_counter()
+        ok = bool(self.check())
+        self._latency_ms = round((time.perf_counter() - started) * 1000, 2)
+        return ok
+
+    async def result(self) -> dict:
+        now = time.monotonic()
+        if self._result is not None and now - self._checked_at < settings.HEALTH_CHECK_CACHE_SECONDS:
+            record_cache(f"health_{self.name}", True)
+            return {**self._result, "cached": True}
+        record_cache(f"health_{self.name}", False)
+
+        if self._pending is None or self._pending.done():
+            self._pending = asyncio.get_running_loop().run_in_executor(None, self._run)
+            # Результат перевірки, що перевищила таймаут, нікому не потрібен
+            self._pending.add_done_callback(lambda future: future.cancelled() or future.exception())
+        try:
+            ok = await asyncio.wait_for(asyncio.shield(self._pending), settings.HEALTH_CHECK_TIMEOUT)
+            result = {"ok": ok, "latency_ms": self._latency_ms}
+        except asyncio.TimeoutError:
+            result = {"ok": False, "error": f"timed out after {settings.HEALTH_CHECK_TIMEOUT}s"}
+        except Exception as e:
+            result = {"ok": False, "error": str(e)}
+
+        if not result["ok"]:
+            logger.warning("Readiness check %s failed: %s", self.name, result.get("error", "not ready"))
+        self._result = result
+        self._checked_at = time.monotonic()
+        return {**result, "cached": False}
+
+
+def _check_database() -> bool:
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    return True
+
+
+def _check_storage() -> bool:
+    # Бакет створюється у lifespan; тут лише добиваємо, якщо MinIO піднявся пізніше
+    return storage_service.ensure_bucket() and storage_service.is_reachable()
+
+
+probes = [
+    CachedProbe("database", _check_database),
+    CachedProbe("storage", _check_storage),
+]
+
+
+# Liveness: процес живий і обробляє запити, залежності не перевіряються
+@router.get("/health")
+@router.get("/health/live")
+async def liveness():
+    return {"status": "healthy", "message": "YouGallery API is running"}
+
+
+@router.get("/health/ready")
+async def readiness():
+    results = await asyncio.gather(*[probe.result() for probe in probes])
+    checks = {probe.name: result for probe, result in zip(probes, results)}
+    ready = all(result["ok"] for result in results)
+    return JSONResponse(
+        {"status": "ready" if ready else "unavailable", "checks": checks},
+        status_code=200 if ready else 503
+    )
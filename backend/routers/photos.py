@@ -1,104 +1,165 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Path
-from fastapi.responses import StreamingResponse
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Path, Header
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
+from sqlalchemy import func
 from database import get_db
-from models import Photo, Scene, Gallery, User, UserFavorite
-from schemas import Photo as PhotoSchema, PhotoWithUrl, FavoriteCreate
+from models import Photo, Scene, Gallery, User, UserFavorite, VisitorSession
+from schemas import Photo as PhotoSchema, PhotoWithUrl, FavoriteCreate, PhotoTransfer
 from auth import get_current_active_user, get_optional_current_user
-from storage import storage_service
+from storage import storage_service, gallery_key, gallery_prefix, tier_storage
+from ordering import ORDER_GAP, bulk_update
+from serializers import ORJSONResponse, PHOTO_COLUMNS, photos_content
+from visitors import get_or_create_session_id, reassign_favorites, touch_session
+from layout import invalidate_layouts
+from usage import QuotaExceeded, check_quota, add_photos, remove_photos, move_photos
+from archive import request_restore
 import logging
-import io
+import os
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Тип за розширенням, коли сховище його не зберігає
+CONTENT_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.gif': 'image/gif',
+    '.webp': 'image/webp'
+}
+
+def _byte_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """(start, end) inclusive of a single `bytes=` range.
+
+    None for a header that is not a valid single byte range - it is ignored
+    and the whole file is sent (RFC 9110, 14.2); ValueError for a valid range
+    that cannot be satisfied.
+    """
+    unit, _, spec = header.partition("=")
+    first, dash, last = spec.strip().partition("-")
+    # Кілька діапазонів не підтримуються - як і неправильний заголовок, ігноруються
+    if (unit.strip().lower() != "bytes" or not dash or not (first or last)
+            or not all(part.isascii() and part.isdigit() for part in (first, last) if part)):
+        return None
+    if first:
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        if start >= size:
+            raise ValueError(header)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # bytes=-N - останні N байтів
+        if not int(last) or not size:
+            raise ValueError(header)
+        start = max(size - int(last), 0)
+        end = size - 1
+    return start, end
+
+def _file_response(filename: str, archived: bool, media_type: Optional[str], headers: dict,
+                   range_header: Optional[str]):
+    """The stored file as a response, or the requested part of it (206).
+
+    A file the backend keeps on local disk goes out as FileResponse; anything
+    else, and every range, is streamed in chunks from the offset. Archived
+    files are served from the cold tier.
+    """
+    storage = tier_storage(archived)
+    stored = storage.stat_file(filename)
+    if stored is None:
+        # Фото могло саме перейти між рівнями після читання рядка
+        storage = tier_storage(not archived)
+        stored = storage.stat_file(filename)
+    if stored is None:
+        logger.error("Photo file %s not found in storage", filename)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Photo file not found in storage"
+        )
+    media_type = (
+        media_type or stored.content_type
+        or CONTENT_TYPES.get(os.path.splitext(filename)[1].lower(), "image/jpeg")
+    )
+    headers = {**headers, "Accept-Ranges": "bytes"}
+    if stored.etag:
+        headers["ETag"] = f'"{stored.etag}"'
+
+    try:
+        byte_range = _byte_range(range_header, stored.size) if range_header else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{stored.size}"}
+        )
+    if byte_range:
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{stored.size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(
+            storage.iter_file(filename, start, end - start + 1),
+            status_code=status.HTTP_206_PARTIAL_CONTENT,
+            media_type=media_type,
+            headers=headers
+        )
+
+    path = storage.local_path(filename)
+    if path:
+        return FileResponse(path, media_type=media_type, headers=headers, stat_result=os.stat(path))
+    headers["Content-Length"] = str(stored.size)
+    return StreamingResponse(storage.iter_file(filename), media_type=media_type, headers=headers)
+
+# Не async: stat і відкриття файлу блокують, тож ендпоінти працюють у пулі потоків
 @router.get("/{photo_id}/view")
-async def view_photo(
+def view_photo(
     photo_id: int,
+    range_header: Optional[str] = Header(None, alias="Range"),
     db: Session = Depends(get_db)
 ):
     """Endpoint для перегляду фото за ID"""
-    logger.info(f"Viewing photo by ID {photo_id}")
+    logger.debug("Viewing photo by ID %s", photo_id)
     
     # Знайти фото в базі даних
-    photo = db.query(Photo).filter(Photo.id == photo_id).first()
+    photo = db.query(
+        Photo.filename, Photo.mime_type, Photo.original_filename, Photo.archived, Photo.gallery_id
+    ).filter(Photo.id == photo_id).first()
     
     if not photo:
-        logger.error(f"Photo {photo_id} not found in database")
+        logger.error("Photo %s not found in database", photo_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Photo not found"
         )
     
-    try:
-        # Отримати файл з сховища
-        logger.info(f"Getting file {photo.filename} from storage")
-        file_data = storage_service.get_file(photo.filename)
-        
-        if not file_data:
-            logger.error(f"Photo file {photo.filename} not found in storage")
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Photo file not found in storage"
-            )
-        
-        logger.info(f"Successfully retrieved file {photo.filename}, size: {len(file_data)} bytes")
-        
-        # Повернути файл як StreamingResponse
-        return StreamingResponse(
-            io.BytesIO(file_data),
-            media_type=photo.mime_type or "image/jpeg",
-            headers={
-                "Content-Disposition": f"inline; filename={photo.original_filename}",
-                "Cache-Control": "public, max-age=3600"
-            }
-        )
-        
-    except Exception as e:
-        logger.error(f"Error serving photo {photo_id}: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error serving photo: {str(e)}"
-        )
+    if photo.archived:
+        request_restore(db, photo.gallery_id)
+        db.commit()
+    
+    return _file_response(photo.filename, photo.archived, photo.mime_type or "image/jpeg", {
+        "Content-Disposition": f"inline; filename={photo.original_filename}",
+        "Cache-Control": "public, max-age=3600"
+    }, range_header)
 
-@router.get("/view/{filename}")
-async def view_photo_by_filename(
+@router.get("/view/{filename:path}")
+def view_photo_by_filename(
     filename: str = Path(..., description="Filename of the photo"),
+    range_header: Optional[str] = Header(None, alias="Range"),
     db: Session = Depends(get_db)
 ):
     """Endpoint для перегляду фото за filename"""
-    logger.info(f"Viewing photo by filename {filename}")
+    logger.debug("Viewing photo by filename %s", filename)
     
-    try:
-        # Отримати файл з сховища напряму за filename
-        file_data, content_type = storage_service.get_file_data(filename)
-        
-        if not file_data:
-            logger.error(f"Photo file {filename} not found in storage")
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Photo file not found in storage"
-            )
-        
-        logger.info(f"Successfully retrieved file {filename}, size: {len(file_data)} bytes, type: {content_type}")
-        
-        # Повернути файл як StreamingResponse
-        return StreamingResponse(
-            io.BytesIO(file_data),
-            media_type=content_type,
-            headers={
-                "Content-Disposition": f"inline; filename={filename}",
-                "Cache-Control": "public, max-age=3600"
-            }
-        )
-        
-    except Exception as e:
-        logger.error(f"Error serving photo {filename}: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error serving photo: {str(e)}"
-        )
+    photo = db.query(Photo.archived, Photo.gallery_id).filter(Photo.filename == filename).first()
+    archived = bool(photo and photo.archived)
+    if archived:
+        request_restore(db, photo.gallery_id)
+        db.commit()
+    
+    return _file_response(filename, archived, None, {
+        "Content-Disposition": f"inline; filename={os.path.basename(filename)}",
+        "Cache-Control": "public, max-age=3600"
+    }, range_header)
 
 @router.delete("/{photo_id}")
 def delete_photo(
@@ -106,9 +167,9 @@ def delete_photo(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    photo = db.query(Photo).join(Scene).join(Gallery).filter(
+    photo = db.query(Photo).filter(
         Photo.id == photo_id,
-        Gallery.owner_id == current_user.id
+        Photo.owner_id == current_user.id
     ).first()
     
     if not photo:
@@ -118,9 +179,11 @@ def delete_photo(
         )
     
     # Delete from storage
-    storage_service.delete_file(photo.filename)
+    tier_storage(photo.archived).delete_file(photo.filename)
     
     # Delete from database
+    invalidate_layouts(db, [photo.scene_id])
+    remove_photos(db, [photo])
     db.delete(photo)
     db.commit()
     
@@ -133,29 +196,215 @@ def set_as_gallery_cover(
     db: Session = Depends(get_db)
 ):
     # Find the photo and verify ownership
-    photo = db.query(Photo).join(Scene).join(Gallery).filter(
+    gallery_id = db.query(Photo.gallery_id).filter(
         Photo.id == photo_id,
-        Gallery.owner_id == current_user.id
-    ).first()
+        Photo.owner_id == current_user.id
+    ).scalar()
     
-    if not photo:
+    if gallery_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Photo not found"
         )
     
     # Update gallery cover
-    gallery = db.query(Gallery).join(Scene).filter(
-        Scene.id == photo.scene_id,
+    db.query(Gallery).filter(Gallery.id == gallery_id).update(
+        {Gallery.cover_photo_id: photo_id}, synchronize_session=False
+    )
+    db.commit()
+    
+    return {"message": "Photo set as gallery cover successfully"}
+
+@router.post("/transfer", response_model=List[PhotoWithUrl])
+def transfer_photos(
+    transfer: PhotoTransfer,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Move or copy photos into another scene of the user's galleries"""
+    photo_ids = list(dict.fromkeys(transfer.photo_ids))
+    if not photo_ids:
+        return []
+    
+    # Check target scene ownership and lock it against concurrent appends
+    target_scene = db.query(Scene).join(Gallery).filter(
+        Scene.id == transfer.target_scene_id,
         Gallery.owner_id == current_user.id
-    ).first()
+    ).with_for_update(of=Scene).first()
+    
+    if not target_scene:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Target scene not found"
+        )
+    
+    photos = db.query(Photo).filter(
+        Photo.id.in_(photo_ids),
+        Photo.owner_id == current_user.id
+    ).all()
+    
+    if len(photos) != len(photo_ids):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Photo not found"
+        )
     
-    if gallery:
-        gallery.cover_photo_id = photo_id
+    # Оригінали архівованих фото спершу мають повернутися з холодного рівня
+    archived_galleries = {photo.gallery_id for photo in photos if photo.archived}
+    if archived_galleries:
+        for gallery_id in archived_galleries:
+            request_restore(db, gallery_id)
         db.commit()
-        db.refresh(gallery)
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Some photos are archived; their galleries are queued for restore, retry when it finishes"
+        )
     
-    return {"message": "Photo set as gallery cover successfully"}
+    # Зберігаємо порядок, у якому фото передані в запиті
+    photos_by_id = {photo.id: photo for photo in photos}
+    photos = [photos_by_id[photo_id] for photo_id in photo_ids]
+    
+    max_order = db.query(func.max(Photo.order_index)).filter(
+        Photo.scene_id == target_scene.id
+    ).scalar()
+    start_index = (max_order + ORDER_GAP) if max_order is not None else 0
+    
+    if transfer.mode == "move":
+        # Об'єкти фото з інших галерей переходять під префікс цільової (server-side копія),
+        # щоб операції над галереєю за префіксом бачили рівно її фото
+        renamed = {
+            photo.id: gallery_key(current_user.id, target_scene.gallery_id, photo.filename)
+            for photo in photos
+            if photo.gallery_id != target_scene.gallery_id
+        }
+        old_filenames = [photo.filename for photo in photos if photo.id in renamed]
+        try:
+            storage_service.copy_files(old_filenames, list(renamed.values()))
+        except Exception as e:
+            logger.error("Error moving photo files to scene %s: %s", target_scene.id, e)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error moving photos: {str(e)}"
+            )
+        
+        # До bulk_update: photos ще містять галереї, з яких фото йдуть
+        move_photos(db, photos, target_scene.gallery_id)
+        bulk_update(db, Photo, [
+            {
+                "id": photo.id,
+                "scene_id": target_scene.id,
+                "gallery_id": target_scene.gallery_id,
+                "order_index": start_index + i * ORDER_GAP,
+                "filename": renamed.get(photo.id, photo.filename),
+                "file_path": f"/uploads/{renamed.get(photo.id, photo.filename)}"
+            }
+            for i, photo in enumerate(photos)
+        ])
+        # Cover photos that leave their gallery are no longer valid covers
+        db.query(Gallery).filter(
+            Gallery.cover_photo_id.in_(photo_ids),
+            Gallery.id != target_scene.gallery_id
+        ).update({Gallery.cover_photo_id: None}, synchronize_session=False)
+        # Обрані йдуть за фото в нову галерею
+        reassign_favorites(db, photo_ids, target_scene.gallery_id)
+        invalidate_layouts(db, [target_scene.id, *(photo.scene_id for photo in photos)])
+        try:
+            db.commit()
+        except Exception:
+            db.rollback()
+            storage_service.delete_files(list(renamed.values()))
+            raise
+        # Старі об'єкти - лише після commit; якщо видалення не вдасться, їх прибере sweep_orphans.py
+        storage_service.delete_files(old_filenames)
+        
+        photos_by_id = {photo.id: photo for photo in db.query(Photo).filter(Photo.id.in_(photo_ids)).all()}
+        result_photos = [photos_by_id[photo_id] for photo_id in photo_ids]
+    else:
+        try:
+            check_quota(db, current_user.id, sum(photo.file_size for photo in photos))
+        except QuotaExceeded as e:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=str(e)
+            )
+        
+        try:
+            new_filenames = storage_service.copy_files(
+                [photo.filename for photo in photos],
+                [
+                    storage_service.unique_filename(photo.filename, gallery_prefix(current_user.id, target_scene.gallery_id))
+                    for photo in photos
+                ]
+            )
+        except Exception as e:
+            logger.error("Error copying photos to scene %s: %s", target_scene.id, e)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error copying photos: {str(e)}"
+            )
+        
+        # Метадані копіюються з оригіналу - зображення повторно не декодується
+        result_photos = [
+            Photo(
+                filename=filename,
+                original_filename=photo.original_filename,
+                file_path=f"/uploads/{filename}",
+                mime_type=photo.mime_type,
+                file_size=photo.file_size,
+                width=photo.width,
+                height=photo.height,
+                placeholder=photo.placeholder,
+                dominant_color=photo.dominant_color,
+                taken_at=photo.taken_at,
+                camera=photo.camera,
+                lens=photo.lens,
+                focal_length=photo.focal_length,
+                orientation=photo.orientation,
+                scene_id=target_scene.id,
+                gallery_id=target_scene.gallery_id,
+                owner_id=current_user.id,
+                order_index=start_index + i * ORDER_GAP
+            )
+            for i, (photo, filename) in enumerate(zip(photos, new_filenames))
+        ]
+        
+        try:
+            db.add_all(result_photos)
+            db.flush()
+            invalidate_layouts(db, [target_scene.id])
+            add_photos(db, result_photos, enforce=True)
+            copied_ids = [photo.id for photo in result_photos]
+            db.commit()
+        except QuotaExceeded as e:
+            db.rollback()
+            for filename in new_filenames:
+                storage_service.delete_file(filename)
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=str(e)
+            )
+        except Exception as e:
+            db.rollback()
+            for filename in new_filenames:
+                storage_service.delete_file(filename)
+            logger.error("Error saving copied photos: %s", e)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error copying photos: {str(e)}"
+            )
+        
+        photos_by_id = {photo.id: photo for photo in db.query(Photo).filter(Photo.id.in_(copied_ids)).all()}
+        result_photos = [photos_by_id[photo_id] for photo_id in copied_ids]
+    
+    logger.info("Transferred (%s) %s photos to scene %s", transfer.mode, len(result_photos), target_scene.id)
+    return [
+        PhotoWithUrl(
+            **photo.__dict__,
+            url=storage_service.get_file_url(photo.filename),
+            is_favorite=False
+        )
+        for photo in result_photos
+    ]
 
 @router.post("/favorites", response_model=dict)
 def toggle_favorite(
@@ -163,43 +412,50 @@ def toggle_favorite(
     current_user: User = Depends(get_optional_current_user),
     db: Session = Depends(get_db)
 ):
-    logger.info(f"Toggle favorite for photo {favorite.photo_id}, user: {current_user.id if current_user else 'anonymous'}, session: {favorite.session_id}")
+    logger.debug("Toggle favorite for photo %s, user: %s, session: %s", favorite.photo_id, current_user.id if current_user else 'anonymous', favorite.session_id)
     
     # Check if photo exists
-    photo = db.query(Photo).filter(Photo.id == favorite.photo_id).first()
+    photo = db.query(Photo.id, Photo.gallery_id).filter(Photo.id == favorite.photo_id).first()
     if not photo:
-        logger.error(f"Photo {favorite.photo_id} not found")
+        logger.error("Photo %s not found", favorite.photo_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Photo not found"
         )
     
     # Find existing favorite
-    existing_favorite = None
     if current_user:
+        owner = {"user_id": current_user.id}
         existing_favorite = db.query(UserFavorite).filter(
             UserFavorite.user_id == current_user.id,
             UserFavorite.photo_id == favorite.photo_id
         ).first()
     elif favorite.session_id:
+        visitor_session_id = get_or_create_session_id(db, favorite.session_id, photo.gallery_id)
+        owner = {"visitor_session_id": visitor_session_id}
         existing_favorite = db.query(UserFavorite).filter(
-            UserFavorite.session_id == favorite.session_id,
+            UserFavorite.visitor_session_id == visitor_session_id,
             UserFavorite.photo_id == favorite.photo_id
         ).first()
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="session_id is required for anonymous favorites"
+        )
     
     if existing_favorite:
         # Remove favorite
-        logger.info(f"Removing favorite for photo {favorite.photo_id}")
+        logger.debug("Removing favorite for photo %s", favorite.photo_id)
         db.delete(existing_favorite)
         db.commit()
         return {"is_favorite": False}
     else:
         # Add favorite
-        logger.info(f"Adding favorite for photo {favorite.photo_id}")
+        logger.debug("Adding favorite for photo %s", favorite.photo_id)
         new_favorite = UserFavorite(
-            user_id=current_user.id if current_user else None,
-            session_id=favorite.session_id if not current_user else None,
-            photo_id=favorite.photo_id
+            **owner,
+            photo_id=favorite.photo_id,
+            gallery_id=photo.gallery_id
         )
         db.add(new_favorite)
         db.commit()
@@ -208,40 +464,35 @@ def toggle_favorite(
 @router.get("/favorites", response_model=List[PhotoWithUrl])
 def get_user_favorites(
     session_id: str = None,
+    gallery_id: Optional[int] = None,
     current_user: User = Depends(get_optional_current_user),
     db: Session = Depends(get_db)
 ):
-    logger.info(f"Getting favorites for user: {current_user.id if current_user else 'anonymous'}, session: {session_id}")
+    logger.debug("Getting favorites for user: %s, session: %s", current_user.id if current_user else 'anonymous', session_id)
+    
+    query = db.query(*PHOTO_COLUMNS).join(UserFavorite, UserFavorite.photo_id == Photo.id)
     
     if current_user:
-        favorites = db.query(UserFavorite).filter(
-            UserFavorite.user_id == current_user.id
-        ).all()
-        logger.info(f"Found {len(favorites)} favorites for user {current_user.id}")
+        query = query.filter(UserFavorite.user_id == current_user.id)
+        if gallery_id is not None:
+            query = query.filter(UserFavorite.gallery_id == gallery_id)
     elif session_id:
-        favorites = db.query(UserFavorite).filter(
-            UserFavorite.session_id == session_id
-        ).all()
-        logger.info(f"Found {len(favorites)} favorites for session {session_id}")
+        query = query.join(VisitorSession, VisitorSession.id == UserFavorite.visitor_session_id).filter(
+            VisitorSession.token == session_id
+        )
+        if gallery_id is not None:
+            query = query.filter(VisitorSession.gallery_id == gallery_id)
     else:
         logger.info("No user or session ID provided, returning empty list")
         return []
     
-    photos_with_urls = []
-    for favorite in favorites:
-        photo = db.query(Photo).filter(Photo.id == favorite.photo_id).first()
-        if photo:
-            photo_with_url = PhotoWithUrl(
-                **photo.__dict__,
-                url=storage_service.get_file_url(photo.filename),
-                is_favorite=True
-            )
-            photos_with_urls.append(photo_with_url)
-        else:
-            logger.warning(f"Favorite references non-existent photo ID {favorite.photo_id}")
+    photos = query.order_by(UserFavorite.id).all()
+    if session_id and not current_user:
+        touch_session(db, session_id, gallery_id)
+        db.commit()
     
-    logger.info(f"Returning {len(photos_with_urls)} favorite photos")
-    return photos_with_urls
+    logger.debug("Returning %s favorite photos", len(photos))
+    return ORJSONResponse(photos_content(photos, {photo.id for photo in photos}))
 
 # OPTIONS handlers для CORS
 @router.options("/{photo_id}")
@@ -252,7 +503,7 @@ async def delete_photo_options():
 async def view_photo_options():
     return {"message": "OK"}
 
-@router.options("/view/{filename}")
+@router.options("/view/{filename:path}")
 async def view_photo_by_filename_options():
     return {"message": "OK"}
 
@@ -260,6 +511,10 @@ async def view_photo_by_filename_options():
 async def set_cover_options():
     return {"message": "OK"}
 
+@router.options("/transfer")
+async def transfer_photos_options():
+    return {"message": "OK"}
+
 @router.options("/favorites")
 async def favorites_options():
     return {"message": "OK"}
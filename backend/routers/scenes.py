@@ -1,19 +1,103 @@
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Form, Query, Header, Request
+from starlette.datastructures import UploadFile
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
 from typing import List, Optional
 from database import get_db
-from models import Scene, Photo, Gallery, User, UserFavorite
-from schemas import SceneCreate, SceneUpdate, Scene as SceneSchema, SceneWithPhotos, PhotoWithUrl
+from models import Scene, Photo, Gallery, User
+from schemas import SceneCreate, SceneUpdate, Scene as SceneSchema, SceneWithPhotos, PhotoWithUrl, ReorderRequest, ReorderResult, SceneSplitRequest, SceneSplitCluster, SceneSplitResult, SceneLayout as SceneLayoutSchema
 from auth import get_current_active_user, get_optional_current_user
-from storage import storage_service
+from storage import storage_service, gallery_prefix, tier_storage
+from ordering import ORDER_GAP, PhotoSort, AutoOrderSort, plan_order, apply_moves, bulk_update, photo_order_by, auto_order
+from serializers import ORJSONResponse, PHOTO_COLUMNS, photos_content, scene_content
+from imaging import image_info
+from visitors import favorite_photo_ids, touch_session
+from clustering import scene_clusters, cluster_name, split_scene
+from layout import layout_content, requested_widths, invalidate_layouts
+from usage import QuotaExceeded, check_quota, add_photos, remove_photos
 import logging
-import io
-from PIL import Image
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+def _apply_reorder(db: Session, model, current_rows, reorder: ReorderRequest) -> int:
+    """Apply a full ordering or move operations to rows sorted by order_index"""
+    current = {row.id: row.order_index for row in current_rows}
+    ordered_ids = [row.id for row in current_rows]
+
+    if reorder.ids is not None:
+        if len(reorder.ids) != len(ordered_ids) or set(reorder.ids) != set(ordered_ids):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="ids must list every item exactly once"
+            )
+        target_ids = reorder.ids
+    elif reorder.moves:
+        try:
+            target_ids = apply_moves(ordered_ids, reorder.moves)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Either ids or moves is required"
+        )
+
+    changes = plan_order(current, target_ids)
+    updated = bulk_update(db, model, [
+        {"id": item_id, "order_index": order_index}
+        for item_id, order_index in changes.items()
+    ])
+    db.commit()
+    return updated
+
+def _layout_widths(widths: Optional[List[int]]) -> List[int]:
+    try:
+        return requested_widths(widths)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+def _scenes_with_stats(db: Session, gallery_id: int) -> List[SceneSchema]:
+    """Scenes of a gallery with photo count, total bytes and first photo URL"""
+    photo_stats = db.query(
+        Photo.scene_id.label("scene_id"),
+        func.count(Photo.id).label("photo_count"),
+        func.coalesce(func.sum(Photo.file_size), 0).label("total_bytes")
+    ).filter(
+        Photo.gallery_id == gallery_id
+    ).group_by(Photo.scene_id).subquery()
+    
+    first_filename = select(Photo.filename).where(
+        Photo.scene_id == Scene.id
+    ).order_by(Photo.order_index, Photo.id).limit(1).scalar_subquery()
+    
+    rows = db.query(
+        Scene,
+        photo_stats.c.photo_count,
+        photo_stats.c.total_bytes,
+        first_filename
+    ).outerjoin(
+        photo_stats, photo_stats.c.scene_id == Scene.id
+    ).filter(
+        Scene.gallery_id == gallery_id
+    ).order_by(Scene.order_index).all()
+    
+    return [
+        SceneSchema(
+            **scene.__dict__,
+            photo_count=photo_count or 0,
+            total_bytes=total_bytes or 0,
+            cover_url=storage_service.get_file_url(filename) if filename else None
+        )
+        for scene, photo_count, total_bytes, filename in rows
+    ]
+
 # Get scenes for a gallery
 @router.get("/{gallery_id}/scenes", response_model=List[SceneSchema])
 def get_scenes(
@@ -34,8 +118,8 @@ def get_scenes(
             detail="Gallery not found"
         )
     
-    scenes = db.query(Scene).filter(Scene.gallery_id == gallery_id).order_by(Scene.order_index).all()
-    logger.info(f"Found {len(scenes)} scenes for gallery {gallery_id}")
+    scenes = _scenes_with_stats(db, gallery_id)
+    logger.debug("Found %s scenes for gallery %s", len(scenes), gallery_id)
     return scenes
 
 # Create a new scene
@@ -61,7 +145,7 @@ def create_scene(
     
     # Get max order_index
     max_order = db.query(Scene).filter(Scene.gallery_id == gallery_id).order_by(Scene.order_index.desc()).first()
-    order_index = (max_order.order_index + 1) if max_order else 0
+    order_index = (max_order.order_index + ORDER_GAP) if max_order else 0
     
     # Create scene
     db_scene = Scene(
@@ -76,6 +160,35 @@ def create_scene(
     
     return db_scene
 
+# Reorder scenes in a gallery
+@router.put("/{gallery_id}/scenes/reorder", response_model=ReorderResult)
+def reorder_scenes(
+    gallery_id: int,
+    reorder: ReorderRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Reorder scenes with a full id list or move operations"""
+    # Блокуємо галерею, щоб паралельні переупорядкування не перетиналися
+    gallery = db.query(Gallery).filter(
+        Gallery.id == gallery_id,
+        Gallery.owner_id == current_user.id
+    ).with_for_update().first()
+    
+    if not gallery:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Gallery not found"
+        )
+    
+    scenes = db.query(Scene.id, Scene.order_index).filter(
+        Scene.gallery_id == gallery_id
+    ).order_by(Scene.order_index, Scene.id).all()
+    
+    updated = _apply_reorder(db, Scene, scenes, reorder)
+    logger.info("Reordered scenes in gallery %s, %s rows updated", gallery_id, updated)
+    return {"updated": updated}
+
 # Get scenes for public gallery viewing
 @router.get("/{gallery_id}/scenes/public", response_model=List[SceneSchema])
 def get_public_scenes(
@@ -95,60 +208,36 @@ def get_public_scenes(
             detail="Gallery not found or not public"
         )
     
-    scenes = db.query(Scene).filter(Scene.gallery_id == gallery_id).order_by(Scene.order_index).all()
-    return scenes
+    return _scenes_with_stats(db, gallery_id)
 
 # Scene management endpoints
 @router.get("/scenes/{scene_id}", response_model=SceneWithPhotos)
-async def get_scene(
+def get_scene(
     scene_id: int,
+    layout_widths: Optional[List[int]] = Query(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    logger.info(f"Getting scene {scene_id} by user {current_user.email}")
+    logger.debug("Getting scene %s by user %s", scene_id, current_user.email)
     
     scene = db.query(Scene).filter(Scene.id == scene_id).first()
     if not scene:
-        logger.warning(f"Scene {scene_id} not found")
+        logger.warning("Scene %s not found", scene_id)
         raise HTTPException(status_code=404, detail="Scene not found")
     
     # Check if user has access to the gallery
     gallery = db.query(Gallery).filter(Gallery.id == scene.gallery_id).first()
     if gallery.owner_id != current_user.id:
-        logger.warning(f"User {current_user.email} doesn't own gallery for scene {scene_id}")
+        logger.warning("User %s doesn't own gallery for scene %s", current_user.email, scene_id)
         raise HTTPException(status_code=403, detail="Not authorized to access this scene")
     
+    # Розкладка вбудовується лише на запит, щоб не платити за неї у звичайній відповіді
+    layout = layout_content(db, scene, _layout_widths(layout_widths)) if layout_widths else None
+    
     # Get photos for this scene
-    photos = db.query(Photo).filter(Photo.scene_id == scene_id).order_by(Photo.order_index).all()
+    photos = db.query(*PHOTO_COLUMNS).filter(Photo.scene_id == scene_id).order_by(*photo_order_by("manual")).all()
     
-    photos_data = []
-    for photo in photos:
-        photo_data = {
-            "id": photo.id,
-            "filename": photo.filename,
-            "original_filename": photo.original_filename,
-            "file_size": photo.file_size,
-            "mime_type": photo.mime_type,
-            "width": photo.width,
-            "height": photo.height,
-            "order_index": photo.order_index,
-            "scene_id": photo.scene_id,
-            "created_at": photo.created_at,
-            "url": f"/api/photos/{photo.id}/view",
-            "is_favorite": False
-        }
-        photos_data.append(photo_data)
-    
-    return {
-        "id": scene.id,
-        "name": scene.name,
-        "order_index": scene.order_index,
-        "gallery_id": scene.gallery_id,
-        "created_at": scene.created_at,
-        "updated_at": scene.updated_at,
-        "photo_count": len(photos_data),
-        "photos": photos_data
-    }
+    return ORJSONResponse(scene_content(scene, photos_content(photos), layout))
 
 @router.put("/scenes/{scene_id}", response_model=SceneSchema)
 def update_scene(
@@ -205,9 +294,10 @@ def delete_scene(
     photos = db.query(Photo).filter(Photo.scene_id == scene_id).all()
     for photo in photos:
         # Delete from storage
-        storage_service.delete_file(photo.filename)
+        tier_storage(photo.archived).delete_file(photo.filename)
         # Delete from database
         db.delete(photo)
+    remove_photos(db, photos)
     
     # Delete scene
     db.delete(db_scene)
@@ -218,6 +308,7 @@ def delete_scene(
 @router.get("/scenes/{scene_id}/photos", response_model=List[PhotoWithUrl])
 def get_photos(
     scene_id: int,
+    sort: PhotoSort = "manual",
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -234,28 +325,123 @@ def get_photos(
             detail="Scene not found"
         )
     
-    logger.info(f"Getting photos for scene {scene_id} by user {current_user.email}")
+    logger.debug("Getting photos for scene %s by user %s", scene_id, current_user.email)
     
     # Get photos
-    photos = db.query(Photo).filter(Photo.scene_id == scene_id).order_by(Photo.order_index).all()
+    photos = db.query(*PHOTO_COLUMNS).filter(Photo.scene_id == scene_id).order_by(*photo_order_by(sort)).all()
     
-    # Add URLs to photos
-    photos_with_urls = []
-    for photo in photos:
-        photo_with_url = PhotoWithUrl(
-            **photo.__dict__,
-            url=storage_service.get_file_url(photo.filename),
-            is_favorite=False  # Default value
+    logger.debug("Found %s photos for scene %s", len(photos), scene_id)
+    return ORJSONResponse(photos_content(photos))
+
+@router.put("/scenes/{scene_id}/photos/reorder", response_model=ReorderResult)
+def reorder_photos(
+    scene_id: int,
+    reorder: ReorderRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Reorder photos in a scene with a full id list or move operations"""
+    # Check if scene exists and belongs to user
+    db_scene = db.query(Scene).join(Gallery).filter(
+        Scene.id == scene_id,
+        Gallery.owner_id == current_user.id
+    ).with_for_update(of=Scene).first()
+    
+    if not db_scene:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Scene not found"
         )
-        photos_with_urls.append(photo_with_url)
     
-    logger.info(f"Found {len(photos)} photos for scene {scene_id}")
-    return photos_with_urls
+    photos = db.query(Photo.id, Photo.order_index).filter(
+        Photo.scene_id == scene_id
+    ).order_by(Photo.order_index, Photo.id).all()
+    
+    invalidate_layouts(db, [scene_id])
+    updated = _apply_reorder(db, Photo, photos, reorder)
+    logger.info("Reordered photos in scene %s, %s rows updated", scene_id, updated)
+    return {"updated": updated}
+
+@router.put("/scenes/{scene_id}/photos/auto-order", response_model=ReorderResult)
+def auto_order_photos(
+    scene_id: int,
+    sort: AutoOrderSort = "taken_at",
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Store a sort mode (e.g. capture time) as the scene's manual order"""
+    # Check if scene exists and belongs to user
+    db_scene = db.query(Scene).join(Gallery).filter(
+        Scene.id == scene_id,
+        Gallery.owner_id == current_user.id
+    ).with_for_update(of=Scene).first()
+    
+    if not db_scene:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Scene not found"
+        )
+    
+    updated = auto_order(db, scene_id, sort)
+    invalidate_layouts(db, [scene_id])
+    db.commit()
+    logger.info("Auto-ordered photos in scene %s by %s, %s rows updated", scene_id, sort, updated)
+    return {"updated": updated}
+
+@router.post("/scenes/{scene_id}/split", response_model=SceneSplitResult)
+def split_scene_by_time(
+    scene_id: int,
+    split: SceneSplitRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Propose (or with apply=true create) scenes from pauses in capture time"""
+    # Check if scene exists and belongs to user
+    query = db.query(Scene).join(Gallery).filter(
+        Scene.id == scene_id,
+        Gallery.owner_id == current_user.id
+    )
+    db_scene = (query.with_for_update(of=[Scene, Gallery]) if split.apply else query).first()
+
+    if not db_scene:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Scene not found"
+        )
+
+    clusters, undated_count = scene_clusters(
+        db, scene_id, split.gap_minutes * 60, split.use_color, split.color_threshold, split.min_photos
+    )
+    scene_ids = [None] * len(clusters)
+    names = [cluster_name(cluster) for cluster in clusters]
+    if clusters:
+        scene_ids[0] = db_scene.id
+        names[0] = db_scene.name
+    if split.apply and len(clusters) > 1:
+        new_scenes = split_scene(db, db_scene, clusters)
+        db.commit()
+        scene_ids[1:] = [new_scene.id for new_scene in new_scenes]
+
+    return SceneSplitResult(
+        applied=split.apply and len(clusters) > 1,
+        clusters=[
+            SceneSplitCluster(
+                scene_id=cluster_scene_id,
+                name=name,
+                start=cluster.start,
+                end=cluster.end,
+                photo_count=cluster.photo_count
+            )
+            for cluster, cluster_scene_id, name in zip(clusters, scene_ids, names)
+        ],
+        undated_count=undated_count
+    )
 
 @router.get("/scenes/{scene_id}/photos/public", response_model=List[PhotoWithUrl])
 def get_public_photos(
     scene_id: int,
     session_id: Optional[str] = None,
+    sort: PhotoSort = "manual",
     current_user: User = Depends(get_optional_current_user),
     db: Session = Depends(get_db)
 ):
@@ -273,37 +459,82 @@ def get_public_photos(
         )
     
     # Get photos
-    photos = db.query(Photo).filter(Photo.scene_id == scene_id).order_by(Photo.order_index).all()
-    
-    # Get user favorites
-    user_favorites = set()
-    if current_user:
-        favorites = db.query(UserFavorite).filter(
-            UserFavorite.user_id == current_user.id
-        ).all()
-        user_favorites = {fav.photo_id for fav in favorites}
-    elif session_id:
-        favorites = db.query(UserFavorite).filter(
-            UserFavorite.session_id == session_id
-        ).all()
-        user_favorites = {fav.photo_id for fav in favorites}
-    
-    # Add URLs to photos
-    photos_with_urls = []
-    for photo in photos:
-        photo_with_url = PhotoWithUrl(
-            **photo.__dict__,
-            url=storage_service.get_file_url(photo.filename),
-            is_favorite=photo.id in user_favorites
+    photos = db.query(*PHOTO_COLUMNS).filter(Photo.scene_id == scene_id).order_by(*photo_order_by(sort)).all()
+    
+    # Get user favorites - лише в межах галереї цієї сцени
+    user_favorites = favorite_photo_ids(
+        db, db_scene.gallery_id, current_user.id if current_user else None, session_id
+    )
+    if session_id and not current_user:
+        touch_session(db, session_id, db_scene.gallery_id)
+        db.commit()
+    
+    return ORJSONResponse(photos_content(photos, user_favorites))
+
+@router.get("/scenes/{scene_id}/layout", response_model=SceneLayoutSchema)
+def get_scene_layout(
+    scene_id: int,
+    widths: Optional[List[int]] = Query(None),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Justified rows of the scene's photos (manual order) for viewport widths"""
+    # Check if scene exists and belongs to user
+    db_scene = db.query(Scene).join(Gallery).filter(
+        Scene.id == scene_id,
+        Gallery.owner_id == current_user.id
+    ).first()
+    
+    if not db_scene:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Scene not found"
         )
-        photos_with_urls.append(photo_with_url)
     
-    return photos_with_urls
+    return ORJSONResponse(layout_content(db, db_scene, _layout_widths(widths)))
 
-@router.post("/scenes/{scene_id}/photos/upload")
+@router.get("/scenes/{scene_id}/layout/public", response_model=SceneLayoutSchema)
+def get_public_scene_layout(
+    scene_id: int,
+    widths: Optional[List[int]] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """Justified rows of a public scene's photos for viewport widths"""
+    # Check if scene exists and belongs to a public gallery
+    db_scene = db.query(Scene).join(Gallery).filter(
+        Scene.id == scene_id,
+        Gallery.is_public == True
+    ).first()
+    
+    if not db_scene:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Scene not found or not public"
+        )
+    
+    return ORJSONResponse(layout_content(db, db_scene, _layout_widths(widths)))
+
+# Тіло читається вручну після перевірки квоти, тож схему форми для OpenAPI описуємо явно
+UPLOAD_FORM_SCHEMA = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["files"],
+                    "properties": {"files": {"type": "array", "items": {"type": "string", "format": "binary"}}}
+                }
+            }
+        }
+    }
+}
+
+@router.post("/scenes/{scene_id}/photos/upload", openapi_extra=UPLOAD_FORM_SCHEMA)
 async def upload_photos(
     scene_id: int,
-    files: List[UploadFile] = File(...),
+    request: Request,
+    content_length: Optional[int] = Header(None),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -320,11 +551,30 @@ async def upload_photos(
             detail="Scene not found"
         )
     
-    logger.info(f"Uploading {len(files)} photos to scene {scene_id} by user {current_user.email}")
+    # Відмова ще до читання тіла. Content-Length включає розмітку multipart, тож на межі
+    # квоти оцінка трохи завищена; точна перевірка - при збереженні кожного фото
+    if content_length is not None:
+        try:
+            check_quota(db, current_user.id, content_length)
+        except QuotaExceeded as e:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=str(e)
+            )
+    
+    form = await request.form()
+    files = [file for file in form.getlist("files") if isinstance(file, UploadFile)]
+    if not files:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="No files uploaded"
+        )
+    
+    logger.debug("Uploading %s photos to scene %s by user %s", len(files), scene_id, current_user.email)
     
     # Get max order_index
     max_order = db.query(Photo).filter(Photo.scene_id == scene_id).order_by(Photo.order_index.desc()).first()
-    order_index = (max_order.order_index + 1) if max_order else 0
+    order_index = (max_order.order_index + ORDER_GAP) if max_order else 0
     
     uploaded_photos = []
     
@@ -335,10 +585,9 @@ async def upload_photos(
             
             # Check if file is an image
             try:
-                img = Image.open(io.BytesIO(file_content))
-                width, height = img.size
+                info = image_info(file_content)
             except Exception as e:
-                logger.error(f"File {file.filename} is not a valid image: {str(e)}")
+                logger.error("File %s is not a valid image: %s", file.filename, e)
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"File {file.filename} is not a valid image"
@@ -348,7 +597,8 @@ async def upload_photos(
             filename = storage_service.upload_file(
                 file_content,
                 file.filename,
-                file.content_type or "image/jpeg"
+                file.content_type or "image/jpeg",
+                prefix=gallery_prefix(current_user.id, db_scene.gallery_id)
             )
             
             # Create photo in database - ВИПРАВЛЕНО: додано file_path
@@ -358,13 +608,16 @@ async def upload_photos(
                 file_path=f"/uploads/{filename}",  # ДОДАНО це поле
                 mime_type=file.content_type or "image/jpeg",
                 file_size=len(file_content),
-                width=width,
-                height=height,
+                **info._asdict(),
                 scene_id=scene_id,
-                order_index=order_index + i
+                gallery_id=db_scene.gallery_id,
+                owner_id=current_user.id,
+                order_index=order_index + i * ORDER_GAP
             )
             
             db.add(db_photo)
+            invalidate_layouts(db, [scene_id])
+            add_photos(db, [db_photo], enforce=True)
             db.commit()
             db.refresh(db_photo)
             
@@ -376,18 +629,25 @@ async def upload_photos(
             )
             
             uploaded_photos.append(photo_with_url)
-            logger.info(f"Uploaded photo {db_photo.id} to scene {scene_id}")
+            logger.debug("Uploaded photo %s to scene %s", db_photo.id, scene_id)
             
+        except QuotaExceeded as e:
+            db.rollback()
+            storage_service.delete_file(filename)
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=str(e)
+            )
         except Exception as e:
             # Rollback transaction on error
             db.rollback()
-            logger.error(f"Error uploading photo: {str(e)}")
+            logger.error("Error uploading photo: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Error uploading photo: {str(e)}"
             )
     
-    logger.info(f"Successfully uploaded {len(uploaded_photos)} photos to scene {scene_id}")
+    logger.info("Successfully uploaded %s photos to scene %s", len(uploaded_photos), scene_id)
     return uploaded_photos
 
 # OPTIONS handlers для CORS
@@ -395,6 +655,10 @@ async def upload_photos(
 async def get_scenes_options():
     return {"message": "OK"}
 
+@router.options("/{gallery_id}/scenes/reorder")
+async def reorder_scenes_options():
+    return {"message": "OK"}
+
 @router.options("/{gallery_id}/scenes/public")
 async def get_public_scenes_options():
     return {"message": "OK"}
@@ -407,10 +671,30 @@ async def update_scene_options():
 async def get_photos_options():
     return {"message": "OK"}
 
+@router.options("/scenes/{scene_id}/photos/reorder")
+async def reorder_photos_options():
+    return {"message": "OK"}
+
+@router.options("/scenes/{scene_id}/photos/auto-order")
+async def auto_order_photos_options():
+    return {"message": "OK"}
+
+@router.options("/scenes/{scene_id}/split")
+async def split_scene_options():
+    return {"message": "OK"}
+
 @router.options("/scenes/{scene_id}/photos/public")
 async def get_public_photos_options():
     return {"message": "OK"}
 
+@router.options("/scenes/{scene_id}/layout")
+async def get_scene_layout_options():
+    return {"message": "OK"}
+
+@router.options("/scenes/{scene_id}/layout/public")
+async def get_public_scene_layout_options():
+    return {"message": "OK"}
+
 @router.options("/scenes/{scene_id}/photos/upload")
 async def upload_photos_options():
     return {"message": "OK"}
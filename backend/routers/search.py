@@ -0,0 +1,57 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from database import get_db
+from models import User
+from schemas import SearchHit
+from auth import get_current_active_user
+from storage import storage_service
+from search import SEARCH_MAX_OFFSET, SEARCH_TYPES, SearchType, search
+from serializers import ORJSONResponse
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+@router.get("/", response_model=List[SearchHit])
+def search_content(
+    q: str = Query(..., min_length=2, max_length=200),
+    type: Optional[List[SearchType]] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0, le=SEARCH_MAX_OFFSET),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Search the user's gallery names, scene names, photo filenames and camera/lens.
+
+    Hits of all requested types come in one list, best match first. The
+    offset of the next page is returned in the X-Next-Offset header;
+    offset can go up to SEARCH_MAX_OFFSET (10000), deeper pages return 422.
+    """
+    types = [kind for kind in SEARCH_TYPES if kind in type] if type else SEARCH_TYPES
+    rows = search(db, current_user.id, q, types, limit, offset)
+    
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Offset"] = str(offset + limit)
+    
+    logger.debug("Search %r by user %s: %s hits", q, current_user.email, len(rows))
+    return ORJSONResponse([
+        {
+            "type": row.type,
+            "id": row.id,
+            "title": row.title,
+            "subtitle": row.subtitle,
+            "gallery_id": row.gallery_id,
+            "scene_id": row.scene_id,
+            "url": storage_service.get_file_url(row.filename) if row.filename else None,
+            "placeholder": row.placeholder,
+            "rank": float(row.rank),
+        }
+        for row in rows
+    ], headers=headers)
+
+@router.options("/")
+async def search_options():
+    return {"message": "OK"}
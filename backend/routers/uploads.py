@@ -0,0 +1,284 @@
+"""Resumable uploads (tus 1.0.0: core, creation, termination, expiration).
+
+A client creates an upload with POST (Upload-Length plus Upload-Metadata
+with `filename`, `filetype` and `scene_id`), sends the bytes with PATCH
+requests starting at the current Upload-Offset and, after an interruption,
+asks for that offset with HEAD and continues from it.
+
+Bytes are written straight into a MinIO multipart upload, one part of
+UPLOAD_PART_SIZE at a time, so a request holds at most one part in memory.
+A PATCH that ends with an incomplete part (other than the final one) keeps
+only the whole parts: the returned Upload-Offset tells the client where to
+resume. Chunk sizes that are multiples of UPLOAD_PART_SIZE avoid resending.
+The request that stores the last byte creates the Photo and returns its id
+in X-Photo-Id.
+"""
+import logging
+import uuid
+from email.utils import format_datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from starlette.requests import ClientDisconnect
+from config import settings
+from database import get_db
+from models import Scene, Gallery, User, UploadSession
+from auth import get_current_active_user
+from storage import storage_service, gallery_prefix
+from uploads import OffsetConflict, parse_metadata, expires_at, store_part, complete_upload
+from usage import QuotaExceeded, check_quota
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+TUS_VERSION = "1.0.0"
+TUS_EXTENSIONS = "creation,termination,expiration"
+
+
+def _tus_headers(**headers) -> dict:
+    return {"Tus-Resumable": TUS_VERSION, **{key.replace("_", "-"): str(value) for key, value in headers.items()}}
+
+
+def _check_version(tus_resumable: Optional[str]):
+    if tus_resumable is not None and tus_resumable != TUS_VERSION:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Unsupported tus version",
+            headers={"Tus-Version": TUS_VERSION}
+        )
+
+
+def _get_upload(db: Session, upload_id: str, user: User) -> UploadSession:
+    upload = db.query(UploadSession).filter(
+        UploadSession.id == upload_id,
+        UploadSession.owner_id == user.id
+    ).first()
+    if not upload:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found"
+        )
+    return upload
+
+
+def _progress_headers(upload: UploadSession) -> dict:
+    headers = _tus_headers(
+        Upload_Offset=upload.upload_offset,
+        Upload_Length=upload.upload_length,
+        Upload_Expires=format_datetime(expires_at(upload), usegmt=True),
+        Cache_Control="no-store"
+    )
+    if upload.photo_id is not None:
+        headers["X-Photo-Id"] = str(upload.photo_id)
+    return headers
+
+
+@router.options("/")
+@router.options("/{upload_id}")
+async def upload_options():
+    return Response(
+        status_code=status.HTTP_204_NO_CONTENT,
+        headers=_tus_headers(
+            Tus_Version=TUS_VERSION,
+            Tus_Extension=TUS_EXTENSIONS,
+            Tus_Max_Size=settings.UPLOAD_MAX_SIZE
+        )
+    )
+
+
+@router.post("/", status_code=status.HTTP_201_CREATED)
+def create_upload(
+    upload_length: int = Header(..., alias="Upload-Length"),
+    upload_metadata: Optional[str] = Header(None, alias="Upload-Metadata"),
+    tus_resumable: Optional[str] = Header(None, alias="Tus-Resumable"),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Start a resumable upload of one photo into a scene"""
+    _check_version(tus_resumable)
+    try:
+        metadata = parse_metadata(upload_metadata)
+        scene_id = int(metadata["scene_id"])
+    except (KeyError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Upload-Metadata must contain a numeric scene_id"
+        )
+
+    if upload_length <= 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Upload-Length must be positive"
+        )
+    if upload_length > settings.UPLOAD_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File exceeds the maximum upload size of {settings.UPLOAD_MAX_SIZE} bytes"
+        )
+
+    # Check if scene exists and belongs to user
+    db_scene = db.query(Scene.id, Scene.gallery_id).join(Gallery).filter(
+        Scene.id == scene_id,
+        Gallery.owner_id == current_user.id
+    ).first()
+    if not db_scene:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Scene not found"
+        )
+
+    # Upload-Length резервує місце в квоті, доки завантаження не завершене або не скасоване
+    try:
+        check_quota(db, current_user.id, upload_length)
+    except QuotaExceeded as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+
+    original_filename = metadata.get("filename") or "upload.jpg"
+    mime_type = metadata.get("filetype") or "image/jpeg"
+    filename = storage_service.unique_filename(
+        original_filename, gallery_prefix(current_user.id, db_scene.gallery_id)
+    )
+    try:
+        multipart_upload_id = storage_service.create_multipart_upload(filename, mime_type)
+    except Exception as e:
+        logger.error("Error starting upload of %s: %s", original_filename, e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error starting upload: {str(e)}"
+        )
+
+    upload = UploadSession(
+        id=uuid.uuid4().hex,
+        owner_id=current_user.id,
+        scene_id=scene_id,
+        filename=filename,
+        original_filename=original_filename,
+        mime_type=mime_type,
+        multipart_upload_id=multipart_upload_id,
+        upload_length=upload_length,
+        upload_offset=0,
+        part_size=settings.UPLOAD_PART_SIZE
+    )
+    db.add(upload)
+    db.commit()
+    db.refresh(upload)
+
+    logger.debug("Created upload %s (%s bytes) for scene %s", upload.id, upload_length, scene_id)
+    return Response(
+        status_code=status.HTTP_201_CREATED,
+        headers={
+            **_progress_headers(upload),
+            "Location": f"{settings.API_BASE_URL}/api/uploads/{upload.id}"
+        }
+    )
+
+
+@router.head("/{upload_id}")
+def upload_progress(
+    upload_id: str,
+    tus_resumable: Optional[str] = Header(None, alias="Tus-Resumable"),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Offset to resume from"""
+    _check_version(tus_resumable)
+    upload = _get_upload(db, upload_id, current_user)
+    return Response(status_code=status.HTTP_200_OK, headers=_progress_headers(upload))
+
+
+@router.patch("/{upload_id}")
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., alias="Upload-Offset"),
+    content_type: Optional[str] = Header(None),
+    tus_resumable: Optional[str] = Header(None, alias="Tus-Resumable"),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Append bytes at Upload-Offset, streaming whole parts into MinIO"""
+    _check_version(tus_resumable)
+    if content_type != "application/offset+octet-stream":
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Content-Type must be application/offset+octet-stream"
+        )
+
+    upload = await run_in_threadpool(_get_upload, db, upload_id, current_user)
+    if upload_offset != upload.upload_offset:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Upload-Offset does not match the current offset {upload.upload_offset}"
+        )
+
+    # Знімок полів - ORM-об'єкт expire-ться після кожного commit
+    length = upload.upload_length
+    part_size = upload.part_size
+    offset = upload.upload_offset
+    part_args = (db, upload.id, upload.filename, upload.multipart_upload_id, part_size)
+
+    buffer = bytearray()
+    try:
+        async for chunk in request.stream():
+            if offset + len(buffer) + len(chunk) > length:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail="Request body exceeds Upload-Length"
+                )
+            buffer += chunk
+            if len(buffer) >= part_size:
+                offset = await run_in_threadpool(store_part, *part_args, offset, bytes(buffer[:part_size]))
+                del buffer[:part_size]
+        # Остання частина може бути меншою за part_size
+        if buffer and offset + len(buffer) == length:
+            offset = await run_in_threadpool(store_part, *part_args, offset, bytes(buffer))
+    except ClientDisconnect:
+        logger.debug("Client disconnected from upload %s at offset %s", upload_id, offset)
+    except OffsetConflict:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Upload was advanced by another request"
+        )
+
+    if offset == length:
+        try:
+            await run_in_threadpool(complete_upload, db, upload_id)
+        except LookupError:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Scene not found"
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        except QuotaExceeded as e:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=str(e)
+            )
+
+    upload = await run_in_threadpool(_get_upload, db, upload_id, current_user)
+    return Response(status_code=status.HTTP_204_NO_CONTENT, headers=_progress_headers(upload))
+
+
+@router.delete("/{upload_id}")
+def terminate_upload(
+    upload_id: str,
+    tus_resumable: Optional[str] = Header(None, alias="Tus-Resumable"),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Cancel an unfinished upload and drop the parts stored so far"""
+    _check_version(tus_resumable)
+    upload = _get_upload(db, upload_id, current_user)
+    if upload.photo_id is None:
+        storage_service.abort_multipart_upload(upload.filename, upload.multipart_upload_id)
+    db.delete(upload)
+    db.commit()
+    return Response(status_code=status.HTTP_204_NO_CONTENT, headers=_tus_headers())
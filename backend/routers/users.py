@@ -4,27 +4,42 @@ from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import select
 from database import get_db
 from models import User, Gallery, Scene, Photo
-from schemas import UserUpdate, UserPasswordUpdate, User as UserSchema
+from schemas import UserUpdate, UserPasswordUpdate, User as UserSchema, UserProfile, StorageUsage
 from auth import (
   get_current_active_user,
   verify_password,
   get_password_hash
 )
-from storage import storage_service
+from storage import storage_service, archive_storage, owner_prefix
+from usage import effective_quota, reserved_bytes
 
 router = APIRouter()
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@router.get("/profile", response_model=UserProfile)
+def get_profile(
+  current_user: User = Depends(get_current_active_user),
+  db: Session = Depends(get_db)
+):
+    """Profile with storage usage read from the maintained counters"""
+    return UserProfile(
+        **current_user.__dict__,
+        usage=StorageUsage(
+            storage_bytes=current_user.storage_bytes,
+            photo_count=current_user.photo_count,
+            quota_bytes=effective_quota(current_user.storage_quota),
+            reserved_bytes=reserved_bytes(db, current_user.id)
+        )
+    )
+
 @router.put("/profile", response_model=UserSchema)
 def update_profile(
   user_update: UserUpdate,
   current_user: User = Depends(get_current_active_user),
   db: Session = Depends(get_db)
 ):
-    logger.info(f"User {current_user.email} updating their profile.")
+    logger.info("User %s updating their profile.", current_user.email)
     if user_update.name is not None:
         current_user.name = user_update.name
     if user_update.phone is not None:
@@ -33,7 +48,7 @@ def update_profile(
     
     db.commit()
     db.refresh(current_user)
-    logger.info(f"Profile for user {current_user.email} updated successfully.")
+    logger.info("Profile for user %s updated successfully.", current_user.email)
     return current_user
 
 @router.put("/password")
@@ -42,9 +57,9 @@ def update_password(
   current_user: User = Depends(get_current_active_user),
   db: Session = Depends(get_db)
 ):
-    logger.info(f"User {current_user.email} attempting to update password.")
+    logger.info("User %s attempting to update password.", current_user.email)
     if not verify_password(password_update.current_password, current_user.hashed_password):
-        logger.warning(f"Incorrect current password attempt for user {current_user.email}.")
+        logger.warning("Incorrect current password attempt for user %s.", current_user.email)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect current password"
@@ -52,7 +67,7 @@ def update_password(
     
     current_user.hashed_password = get_password_hash(password_update.new_password)
     db.commit()
-    logger.info(f"Password for user {current_user.email} updated successfully.")
+    logger.info("Password for user %s updated successfully.", current_user.email)
     return {"message": "Password updated successfully"}
 
 @router.delete("/account")
@@ -62,7 +77,7 @@ def delete_account(
 ):
     user_id_to_delete = current_user.id
     user_email_to_delete = current_user.email
-    logger.info(f"User {user_email_to_delete} (ID: {user_id_to_delete}) attempting to delete their account.")
+    logger.info("User %s (ID: %s) attempting to delete their account.", user_email_to_delete, user_id_to_delete)
 
     # Fetch user with all related galleries, scenes, and photos
     user_to_delete = db.query(User).filter(User.id == user_id_to_delete)\
@@ -74,41 +89,46 @@ def delete_account(
 
     if not user_to_delete:
         # This case should ideally not be reached if get_current_active_user is working
-        logger.error(f"User {user_email_to_delete} (ID: {user_id_to_delete}) not found for deletion, though authenticated.")
+        logger.error("User %s (ID: %s) not found for deletion, though authenticated.", user_email_to_delete, user_id_to_delete)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Authenticated user not found for deletion.")
 
-    logger.info(f"Found user {user_email_to_delete} for account deletion. Proceeding to delete associated S3 photos.")
+    logger.info("Found user %s for account deletion. Proceeding to delete associated S3 photos.", user_email_to_delete)
     
     photos_to_delete_s3 = []
     for gallery_item in user_to_delete.galleries:
         for scene_item in gallery_item.scenes:
             for photo_item in scene_item.photos:
                 if photo_item.filename: # filename is the S3 key
-                    photos_to_delete_s3.append(photo_item.filename)
+                    photos_to_delete_s3.append((photo_item.filename, photo_item.archived))
     
-    if photos_to_delete_s3:
-        logger.info(f"Attempting to delete {len(photos_to_delete_s3)} photos from S3 for user {user_email_to_delete}: {photos_to_delete_s3}")
-        for photo_s3_key in photos_to_delete_s3:
-            try:
-                storage_service.delete_file(photo_s3_key)
-                logger.info(f"Successfully deleted photo {photo_s3_key} from S3 for user {user_email_to_delete}")
-            except Exception as e:
-                logger.error(f"Error deleting photo {photo_s3_key} from S3 for user {user_email_to_delete}: {e}. Continuing with DB deletion.")
-                # Decide if you want to collect these errors and report them
-    else:
-        logger.info(f"No S3 photos found to delete for user {user_email_to_delete}")
-
     try:
-        logger.info(f"Attempting to delete user account {user_email_to_delete} (ID: {user_id_to_delete}) from database.")
+        logger.info("Attempting to delete user account %s (ID: %s) from database.", user_email_to_delete, user_id_to_delete)
         db.delete(user_to_delete) # This should trigger cascades for galleries, scenes, photos in DB
         db.commit()
-        logger.info(f"User account {user_email_to_delete} (ID: {user_id_to_delete}) and all associated data successfully deleted from database.")
+        logger.info("User account %s (ID: %s) and all associated data successfully deleted from database.", user_email_to_delete, user_id_to_delete)
     except Exception as e:
         db.rollback()
-        logger.error(f"Error deleting user account {user_email_to_delete} (ID: {user_id_to_delete}) from database: {e}")
+        logger.error("Error deleting user account %s (ID: %s) from database: %s", user_email_to_delete, user_id_to_delete, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Could not delete user account from database."
         )
 
+    # Файли - після видалення з бази: об'єкти користувача лежать під його префіксом,
+    # ключі старої плоскої схеми видаляються поштучно
+    prefix = owner_prefix(user_id_to_delete)
+    logger.info("Deleting storage prefix %s of user %s", prefix, user_email_to_delete)
+    try:
+        failed = []
+        for archived, storage in ((False, storage_service), (True, archive_storage)):
+            failed += storage.delete_prefix(prefix)
+            failed += storage.delete_files([
+                key for key, key_archived in photos_to_delete_s3
+                if key_archived == archived and not key.startswith(prefix)
+            ])
+        if failed:
+            logger.error("Failed to delete %d photos from S3 for user %s", len(failed), user_email_to_delete)
+    except Exception as e:
+        logger.error("Error deleting photos from S3 for user %s: %s", user_email_to_delete, e)
+
     return {"message": "Account and all associated data processed for deletion successfully"}
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, field_validator
-from typing import Optional, List
+from typing import Optional, List, Literal
 from datetime import datetime
 
 # User schemas
@@ -19,6 +19,15 @@ class UserResponse(UserBase):
     class Config:
         from_attributes = True
 
+class StorageUsage(BaseModel):
+    storage_bytes: int
+    photo_count: int
+    quota_bytes: Optional[int] = None  # None - без обмеження
+    reserved_bytes: int = 0  # заявлено незавершеними завантаженнями
+
+class UserProfile(UserResponse):
+    usage: StorageUsage
+
 class UserUpdate(BaseModel):
     name: Optional[str] = None
     email: Optional[EmailStr] = None
@@ -95,12 +104,29 @@ class Gallery(GalleryBase):
     owner_id: int
     view_count: int = 0
     cover_photo_id: Optional[int] = None
+    storage_tier: Literal["hot", "cold", "restoring"] = "hot"
     created_at: datetime
     updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
 
+class ArchiveStatus(BaseModel):
+    """Cold tier state of a gallery and progress of its restore"""
+    storage_tier: Literal["hot", "cold", "restoring"]
+    photo_count: int
+    archived_photos: int  # оригінали, що ще лежать в архіві
+    last_viewed_at: Optional[datetime] = None
+    restore_requested_at: Optional[datetime] = None
+    queue_position: Optional[int] = None  # 1 - відновлюється зараз або наступною
+
+class GallerySummary(Gallery):
+    photo_count: int = 0
+    scene_count: int = 0
+    total_bytes: int = 0
+    favorites_count: int = 0
+    cover_url: Optional[str] = None
+
 # Scene schemas
 class SceneBase(BaseModel):
     name: str
@@ -119,6 +145,8 @@ class Scene(SceneBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
     photo_count: Optional[int] = 0
+    total_bytes: Optional[int] = 0
+    cover_url: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -131,6 +159,13 @@ class PhotoBase(BaseModel):
     mime_type: str
     width: Optional[int] = None
     height: Optional[int] = None
+    placeholder: Optional[str] = None
+    dominant_color: Optional[str] = None
+    taken_at: Optional[datetime] = None
+    camera: Optional[str] = None
+    lens: Optional[str] = None
+    focal_length: Optional[float] = None
+    orientation: Optional[int] = None
     order_index: int = 0
 
 class PhotoCreate(PhotoBase):
@@ -153,9 +188,79 @@ class Photo(PhotoBase):
 class PhotoWithUrl(Photo):
     url: str
 
+# Reorder schemas
+class ReorderMove(BaseModel):
+    id: int
+    before_id: Optional[int] = None
+    after_id: Optional[int] = None
+
+class ReorderRequest(BaseModel):
+    ids: Optional[List[int]] = None
+    moves: Optional[List[ReorderMove]] = None
+
+class ReorderResult(BaseModel):
+    updated: int
+
+# Justified layout schemas
+class ViewportLayout(BaseModel):
+    viewport_width: int
+    spacing: int
+    row_starts: List[int]  # індекс (у photo_ids) першого фото кожного ряду
+    row_heights: List[float]
+
+class SceneLayout(BaseModel):
+    scene_id: int
+    photo_ids: List[int]
+    layouts: List[ViewportLayout]
+
+# Scene split schemas
+class SceneSplitRequest(BaseModel):
+    gap_minutes: float = 30
+    use_color: bool = False
+    color_threshold: float = 60  # відстань між середніми RGB-кольорами, 0-441
+    min_photos: int = 1
+    apply: bool = False  # False - лише пропозиція, без змін
+
+    @field_validator('gap_minutes', 'color_threshold', 'min_photos')
+    def check_positive(cls, v):
+        if v <= 0:
+            raise ValueError("must be positive")
+        return v
+
+class SceneSplitCluster(BaseModel):
+    scene_id: Optional[int] = None  # None - сцена ще не створена
+    name: str
+    start: datetime
+    end: datetime
+    photo_count: int
+
+class SceneSplitResult(BaseModel):
+    applied: bool
+    clusters: List[SceneSplitCluster]
+    undated_count: int  # фото без taken_at лишаються у вихідній сцені
+
+# Search schemas
+class SearchHit(BaseModel):
+    type: Literal["gallery", "scene", "photo"]
+    id: int
+    title: str
+    subtitle: Optional[str] = None  # сцена - назва галереї, фото - камера
+    gallery_id: int
+    scene_id: Optional[int] = None
+    url: Optional[str] = None  # лише для фото
+    placeholder: Optional[str] = None
+    rank: float
+
+# Bulk move/copy schemas
+class PhotoTransfer(BaseModel):
+    photo_ids: List[int]
+    target_scene_id: int
+    mode: Literal["move", "copy"] = "move"
+
 # Scene with photos
 class SceneWithPhotos(Scene):
     photos: List[Photo] = []
+    layout: Optional[SceneLayout] = None  # лише на запит: ?layout_widths=...
 
     class Config:
         from_attributes = True
@@ -192,8 +297,9 @@ class FavoriteCreate(BaseModel):
 class Favorite(BaseModel):
     id: int
     photo_id: int
+    gallery_id: int
     user_id: Optional[int] = None
-    session_id: Optional[str] = None
+    visitor_session_id: Optional[int] = None
     created_at: datetime
 
     class Config:
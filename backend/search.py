@@ -0,0 +1,124 @@
+"""Ranked search over an owner's galleries, scenes and photos.
+
+PostgreSQL matches a prefix tsquery against to_tsvector('simple', ...) or a
+substring against the same text through pg_trgm, and ranks by ts_rank plus
+trigram similarity; both are answered from the expression GIN indexes of
+migration 0009, so the expressions below must stay identical to them. GIN
+cannot return rows in similarity order, so every match of the owner is
+ranked and each type keeps only its best offset + limit rows (a top-N
+sort) - deep pages cost more, hence the cap on offset in the router.
+SQLite matches the FTS5 trigram tables from models.SEARCH_COLUMNS and ranks
+by bm25.
+"""
+import re
+from typing import List, Literal, Sequence
+from sqlalchemy import String, column, func, literal, literal_column, null, or_, select, table, union_all
+from sqlalchemy.orm import Session
+from models import Gallery, Scene, Photo
+
+SearchType = Literal["gallery", "scene", "photo"]
+SEARCH_TYPES = ("gallery", "scene", "photo")
+
+# Найбільший offset сторінки результатів; у PostgreSQL кожен тип сортує offset + limit найкращих збігів
+SEARCH_MAX_OFFSET = 10000
+FTS_TABLES = {"gallery": "galleries_fts", "scene": "scenes_fts", "photo": "photos_fts"}
+# Коротші слова не дають жодної триграми - FTS5 шукає їх через LIKE
+MIN_TRIGRAM_TERM = 3
+
+
+def search_terms(query: str) -> List[str]:
+    return re.findall(r"\w+", query.lower())
+
+
+def _joined(*columns):
+    """lower(coalesce(a, '') || ' ' || coalesce(b, '') ...): the indexed search text"""
+    text = func.coalesce(columns[0], literal_column("''"))
+    for part in columns[1:]:
+        text = text.op("||")(literal_column("' '")).op("||")(func.coalesce(part, literal_column("''")))
+    return func.lower(text, type_=String)
+
+
+def _search_text(kind: str):
+    if kind == "gallery":
+        return func.lower(Gallery.name, type_=String)
+    if kind == "scene":
+        return func.lower(Scene.name, type_=String)
+    return _joined(Photo.original_filename, Photo.camera, Photo.lens)
+
+
+def _hits(kind: str, user_id: int):
+    """Uniform result columns and the owner filter for one result type"""
+    if kind == "gallery":
+        columns = [
+            Gallery.id.label("id"), Gallery.name.label("title"), null().label("subtitle"),
+            Gallery.id.label("gallery_id"), null().label("scene_id"),
+            null().label("filename"), null().label("placeholder"),
+        ]
+        return columns, Gallery.id, lambda stmt: stmt.where(Gallery.owner_id == user_id)
+    if kind == "scene":
+        columns = [
+            Scene.id.label("id"), Scene.name.label("title"), Gallery.name.label("subtitle"),
+            Scene.gallery_id.label("gallery_id"), Scene.id.label("scene_id"),
+            null().label("filename"), null().label("placeholder"),
+        ]
+        return columns, Scene.id, lambda stmt: stmt.join(Gallery, Gallery.id == Scene.gallery_id).where(
+            Gallery.owner_id == user_id
+        )
+    columns = [
+        Photo.id.label("id"), Photo.original_filename.label("title"), Photo.camera.label("subtitle"),
+        Photo.gallery_id.label("gallery_id"), Photo.scene_id.label("scene_id"),
+        Photo.filename.label("filename"), Photo.placeholder.label("placeholder"),
+    ]
+    return columns, Photo.id, lambda stmt: stmt.where(Photo.owner_id == user_id)
+
+
+def _postgres_select(kind: str, user_id: int, query: str, terms: List[str], top: int):
+    text = _search_text(kind)
+    vector = func.to_tsvector(literal_column("'simple'"), text)
+    tsquery = func.to_tsquery(literal_column("'simple'"), " & ".join(f"{term}:*" for term in terms))
+    columns, id_column, owned = _hits(kind, user_id)
+
+    # Збіги знаходять GIN-індекси; з них лишаються top найкращих - далі за них сторінка не сягне
+    rank = func.ts_rank(vector, tsquery) + func.similarity(text, query.lower())
+    stmt = owned(select(literal(kind).label("type"), *columns, rank.label("rank")).where(or_(
+        vector.op("@@")(tsquery),
+        text.contains(query.lower(), autoescape=True)
+    )))
+    return stmt.order_by(rank.desc(), id_column).limit(top)
+
+
+def _sqlite_select(kind: str, user_id: int, query: str, terms: List[str]):
+    fts_table = FTS_TABLES[kind]
+    columns, id_column, owned = _hits(kind, user_id)
+    trigram_terms = [term for term in terms if len(term) >= MIN_TRIGRAM_TERM]
+    if not trigram_terms:
+        stmt = select(literal(kind).label("type"), *columns, literal(0.0).label("rank")).where(
+            _search_text(kind).contains(query.lower(), autoescape=True)
+        )
+        return owned(stmt)
+
+    fts = table(fts_table, column("rowid"))
+    # Кожне слово - окрема фраза; фрази FTS5 поєднує через AND
+    match = " ".join('"' + term.replace('"', '""') + '"' for term in trigram_terms)
+    rank = -func.bm25(literal_column(fts_table))
+    stmt = select(literal(kind).label("type"), *columns, rank.label("rank")).join(
+        fts, fts.c.rowid == id_column
+    ).where(literal_column(fts_table).op("MATCH")(match))
+    return owned(stmt)
+
+
+def search(db: Session, user_id: int, query: str, types: Sequence[str] = SEARCH_TYPES,
+           limit: int = 50, offset: int = 0) -> list:
+    """Ranked hits (best first) of the user's content for query; limit + 1 rows tell about the next page"""
+    terms = search_terms(query)
+    if not terms:
+        return []
+
+    if db.get_bind().dialect.name == "postgresql":
+        selects = [_postgres_select(kind, user_id, query, terms, offset + limit + 1) for kind in types]
+    else:
+        selects = [_sqlite_select(kind, user_id, query, terms) for kind in types]
+    hits = union_all(*selects).subquery()
+    return db.execute(
+        select(hits).order_by(hits.c.rank.desc(), hits.c.type, hits.c.id).offset(offset).limit(limit + 1)
+    ).all()
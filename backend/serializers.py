@@ -0,0 +1,115 @@
+from typing import Iterable, List, Optional, Set
+import orjson
+from fastapi.responses import JSONResponse
+from models import Photo, Scene, Gallery
+from storage import storage_service
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson.
+
+    OPT_UTC_Z makes UTC datetimes end with "Z" the way Pydantic does, so the
+    output matches what FastAPI produces through response_model.
+    """
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+
+
+# Колонки у порядку полів schemas.PhotoWithUrl - запит повертає легкі кортежі
+PHOTO_COLUMNS = (
+    Photo.filename,
+    Photo.original_filename,
+    Photo.file_size,
+    Photo.mime_type,
+    Photo.width,
+    Photo.height,
+    Photo.placeholder,
+    Photo.dominant_color,
+    Photo.taken_at,
+    Photo.camera,
+    Photo.lens,
+    Photo.focal_length,
+    Photo.orientation,
+    Photo.order_index,
+    Photo.id,
+    Photo.scene_id,
+    Photo.file_path,
+    Photo.created_at,
+)
+
+SCENE_COLUMNS = (
+    Scene.name,
+    Scene.order_index,
+    Scene.id,
+    Scene.gallery_id,
+    Scene.created_at,
+    Scene.updated_at,
+    Scene.layout_version,  # для layout.scene_layouts, у відповідь не йде
+)
+
+
+def photo_content(row, is_favorite: bool = False) -> dict:
+    """Build the schemas.PhotoWithUrl payload for a PHOTO_COLUMNS row"""
+    return {
+        "filename": row.filename,
+        "original_filename": row.original_filename,
+        "file_size": row.file_size,
+        "mime_type": row.mime_type,
+        "width": row.width,
+        "height": row.height,
+        "placeholder": row.placeholder,
+        "dominant_color": row.dominant_color,
+        "taken_at": row.taken_at,
+        "camera": row.camera,
+        "lens": row.lens,
+        "focal_length": row.focal_length,
+        "orientation": row.orientation,
+        "order_index": row.order_index,
+        "id": row.id,
+        "scene_id": row.scene_id,
+        "file_path": row.file_path,
+        "created_at": row.created_at,
+        "url": storage_service.get_file_url(row.filename),
+        "is_favorite": is_favorite,
+    }
+
+
+def photos_content(rows: Iterable, favorite_ids: Optional[Set[int]] = None) -> List[dict]:
+    favorite_ids = favorite_ids or set()
+    return [photo_content(row, row.id in favorite_ids) for row in rows]
+
+
+def scene_content(scene, photos: List[dict], layout: Optional[dict] = None) -> dict:
+    """Build the schemas.SceneWithPhotos payload for a SCENE_COLUMNS row"""
+    return {
+        "name": scene.name,
+        "order_index": scene.order_index,
+        "id": scene.id,
+        "gallery_id": scene.gallery_id,
+        "created_at": scene.created_at,
+        "updated_at": scene.updated_at,
+        "photo_count": len(photos),
+        "total_bytes": sum(photo["file_size"] for photo in photos),
+        "cover_url": photos[0]["url"] if photos else None,
+        "photos": photos,
+        "layout": layout,
+    }
+
+
+def gallery_content(gallery: Gallery, scenes: List[dict]) -> dict:
+    """Build the schemas.GalleryWithScenes payload"""
+    return {
+        "name": gallery.name,
+        "shooting_date": gallery.shooting_date,
+        "is_public": gallery.is_public,
+        "is_password_protected": gallery.is_password_protected,
+        "id": gallery.id,
+        "owner_id": gallery.owner_id,
+        "view_count": gallery.view_count,
+        "cover_photo_id": gallery.cover_photo_id,
+        "storage_tier": gallery.storage_tier,
+        "created_at": gallery.created_at,
+        "updated_at": gallery.updated_at,
+        "scenes": scenes,
+    }
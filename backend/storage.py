@@ -1,148 +1,736 @@
 import os
 import logging
+import posixpath
+import shutil
+import tempfile
 import uuid
-from typing import Optional, Tuple
-from minio import Minio
-from minio.error import S3Error
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, List, NamedTuple, Optional
 from config import settings
 from io import BytesIO
+from metrics import observe_storage, record_storage_bytes
+from imaging import image_size
 
 logger = logging.getLogger(__name__)
 
-class MinIOStorageService:
-    def __init__(self):
-        self.client = Minio(
-            settings.MINIO_ENDPOINT,
-            access_key=settings.MINIO_ROOT_USER,
-            secret_key=settings.MINIO_ROOT_PASSWORD,
-            secure=settings.MINIO_SECURE
-        )
-        self.bucket_name = settings.MINIO_BUCKET_NAME
-        self._ensure_bucket_exists()
+# Кількість одночасних server-side копіювань
+COPY_CONCURRENCY = 8
+# Розмір шматка при потоковому читанні об'єкта
+DOWNLOAD_CHUNK = 1024 * 1024
+# Найбільше ключів в одному запиті DeleteObjects (обмеження S3)
+DELETE_BATCH = 1000
+
+def _s3_error():
+    # Клас винятку береться лише під час обробки помилки, щоб не імпортувати minio заздалегідь
+    from minio.error import S3Error
+    return S3Error
+
+def owner_prefix(owner_id: int) -> str:
+    """Key prefix of all objects of a user"""
+    return f"{owner_id}/"
+
+def gallery_prefix(owner_id: int, gallery_id: int) -> str:
+    """Key prefix of a gallery's objects: <owner>/<gallery>/"""
+    return f"{owner_id}/{gallery_id}/"
+
+def gallery_key(owner_id: int, gallery_id: int, filename: str) -> str:
+    """Key of an existing object (flat or under another gallery) once it belongs to the gallery"""
+    return gallery_prefix(owner_id, gallery_id) + posixpath.basename(filename)
+
+class StoredObject(NamedTuple):
+    """Listing / stat entry; MinIO list_objects items have the same attributes"""
+    object_name: str
+    size: int
+    last_modified: datetime
+    content_type: Optional[str] = None
+    etag: Optional[str] = None
+
+class StorageBackend(ABC):
+    """Where photo files live, addressed by object name (Photo.filename).
+
+    settings.STORAGE_BACKEND selects the implementation behind the module
+    level storage_service; a backend missing any abstract method fails when
+    it is constructed. Failed writes and reads raise Exception with a
+    readable message; lookups of missing objects return None or False.
+    """
+    bucket_name: str  # бакет або каталог - для логів
+
+    @abstractmethod
+    def ensure_bucket(self) -> bool:
+        ...
+
+    @abstractmethod
+    def is_reachable(self) -> bool:
+        ...
+
+    def unique_filename(self, filename: Optional[str], prefix: str = "") -> str:
+        """Object name for a new upload: random under prefix, keeping the original extension"""
+        file_extension = os.path.splitext(filename or "")[1] or ".jpg"
+        return f"{prefix}{uuid.uuid4().hex}{file_extension}"
+
+    @abstractmethod
+    def upload_file(self, file_data: bytes, filename: str, content_type: str = "application/octet-stream",
+                    prefix: str = "") -> str:
+        ...
+
+    @abstractmethod
+    def create_multipart_upload(self, filename: str, content_type: str) -> str:
+        ...
+
+    @abstractmethod
+    def upload_part(self, filename: str, upload_id: str, part_number: int, data: bytes) -> str:
+        ...
+
+    @abstractmethod
+    def complete_multipart_upload(self, filename: str, upload_id: str):
+        ...
+
+    @abstractmethod
+    def abort_multipart_upload(self, filename: str, upload_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def copy_file(self, source_path: str, target_path: Optional[str] = None) -> str:
+        """Copy an object to target_path (a new unique name by default) and return the target"""
+
+    def copy_files(self, source_paths: List[str], target_paths: Optional[List[str]] = None) -> List[str]:
+        """Copy objects concurrently, removing partial copies if any copy fails"""
+        target_paths = target_paths or [None] * len(source_paths)
+        with ThreadPoolExecutor(max_workers=COPY_CONCURRENCY) as executor:
+            futures = [
+                executor.submit(self.copy_file, source, target)
+                for source, target in zip(source_paths, target_paths)
+            ]
+        
+        copied = []
+        errors = []
+        for future in futures:
+            try:
+                copied.append(future.result())
+            except Exception as e:
+                errors.append(e)
+        
+        if errors:
+            for filename in copied:
+                self.delete_file(filename)
+            raise errors[0]
+        return copied
+
+    @abstractmethod
+    def copy_to(self, target: "StorageBackend", file_path: str):
+        """Copy an object into another instance of the same backend (the archive tier) under the same key"""
+
+    def get_file_url(self, file_path: str) -> str:
+        """Generate URL for accessing the file"""
+        try:
+            # Для публічного доступу через API endpoint
+            return f"{settings.API_BASE_URL}/api/photos/view/{file_path}"
+        except Exception as e:
+            logger.error("Error generating file URL for %s: %s", file_path, e)
+            return f"{settings.API_BASE_URL}/api/photos/view/{file_path}"
+
+    @abstractmethod
+    def get_file(self, file_path: str) -> bytes:
+        ...
+
+    @abstractmethod
+    def download_file(self, file_path: str, fileobj) -> int:
+        ...
+
+    @abstractmethod
+    def stat_file(self, file_path: str) -> Optional[StoredObject]:
+        """Size, modification time and (if known) content type; None when there is no such object"""
+
+    @abstractmethod
+    def iter_file(self, file_path: str, offset: int = 0, length: Optional[int] = None) -> Iterator[bytes]:
+        """Stream length bytes (to the end by default) starting at offset"""
+
+    def local_path(self, file_path: str) -> Optional[str]:
+        """Path on this machine to serve the file from directly, if there is one"""
+        return None
+
+    @abstractmethod
+    def delete_file(self, file_path: str) -> bool:
+        ...
+
+    def delete_files(self, file_paths: List[str]) -> List[str]:
+        """Delete objects; returns the ones that were not deleted"""
+        return [file_path for file_path in file_paths if not self.delete_file(file_path)]
+
+    @abstractmethod
+    def list_files(self, start_after: Optional[str] = None, prefix: Optional[str] = None) -> Iterator:
+        """Objects (StoredObject-like) in key order - UTF-8 bytes, like S3 - optionally after a key or under a prefix"""
+
+    def delete_prefix(self, prefix: str) -> List[str]:
+        """Delete every object under prefix (owner_prefix / gallery_prefix); returns the keys that were not deleted"""
+        if not prefix.endswith("/"):
+            raise ValueError(f"Prefix {prefix!r} must end with /")
+        failed = []
+        batch = []
+        for obj in self.list_files(prefix=prefix):
+            batch.append(obj.object_name)
+            if len(batch) == DELETE_BATCH:
+                failed.extend(self.delete_files(batch))
+                batch = []
+        failed.extend(self.delete_files(batch))
+        return failed
+
+    def file_exists(self, file_path: str) -> bool:
+        return self.stat_file(file_path) is not None
+
+    def get_image_dimensions(self, file_data: bytes) -> tuple:
+        """Get image dimensions from file data"""
+        try:
+            return image_size(file_data)  # (width, height)
+        except Exception as e:
+            logger.error("Error getting image dimensions: %s", e)
+            return None, None
+
+class MinIOStorageService(StorageBackend):
+    def __init__(self, bucket_name: Optional[str] = None):
+        # Клієнт створюється при першому зверненні - імпорт модуля не тягне minio
+        self._client = None
+        self.bucket_name = bucket_name or settings.MINIO_BUCKET_NAME
+        # Бакет перевіряється при першому записі, а не під час імпорту
+        self._bucket_checked = False
+
+    @property
+    def client(self):
+        if self._client is None:
+            from minio import Minio
+            self._client = Minio(
+                settings.MINIO_ENDPOINT,
+                access_key=settings.MINIO_ROOT_USER,
+                secret_key=settings.MINIO_ROOT_PASSWORD,
+                secure=settings.MINIO_SECURE
+            )
+        return self._client
+
+    @client.setter
+    def client(self, client):
+        self._client = client
 
     def _ensure_bucket_exists(self):
         """Ensure the bucket exists, create if it doesn't"""
+        if self._bucket_checked:
+            return
         try:
             if not self.client.bucket_exists(self.bucket_name):
                 self.client.make_bucket(self.bucket_name)
-                logger.info(f"Created bucket: {self.bucket_name}")
-        except S3Error as e:
-            logger.error(f"Error ensuring bucket exists: {e}")
-
-    def upload_file(self, file_data: bytes, filename: str, content_type: str = "application/octet-stream") -> str:
-        """Upload file to MinIO and return unique filename"""
-        try:
-            # Generate unique filename if not provided
-            if not filename or filename == "":
-                file_extension = ".jpg"  # default extension
-                unique_filename = f"{uuid.uuid4()}{file_extension}"
-            else:
-                # Keep original extension but generate unique name
-                file_extension = os.path.splitext(filename)[1] or ".jpg"
-                unique_filename = f"{uuid.uuid4().hex}{file_extension}"
+                logger.info("Created bucket: %s", self.bucket_name)
+            self._bucket_checked = True
+        except _s3_error() as e:
+            logger.error("Error ensuring bucket exists: %s", e)
+
+    def ensure_bucket(self) -> bool:
+        """Create the bucket if needed; True once it is known to exist"""
+        self._ensure_bucket_exists()
+        return self._bucket_checked
+
+    def is_reachable(self) -> bool:
+        """Cheap round trip to MinIO used by the readiness probe"""
+        with observe_storage("ping"):
+            return self.client.bucket_exists(self.bucket_name)
+
+    def upload_file(self, file_data: bytes, filename: str, content_type: str = "application/octet-stream",
+                    prefix: str = "") -> str:
+        """Upload file to MinIO under prefix and return unique filename"""
+        try:
+            unique_filename = self.unique_filename(filename, prefix)
+            
+            self._ensure_bucket_exists()
             
             # Upload file to MinIO
-            self.client.put_object(
-                self.bucket_name,
-                unique_filename,
-                BytesIO(file_data),
-                length=len(file_data),
-                content_type=content_type
-            )
+            with observe_storage("put"):
+                self.client.put_object(
+                    self.bucket_name,
+                    unique_filename,
+                    BytesIO(file_data),
+                    length=len(file_data),
+                    content_type=content_type
+                )
+            record_storage_bytes("put", len(file_data))
             
-            logger.info(f"Successfully uploaded file: {unique_filename}")
+            logger.debug("Successfully uploaded file: %s", unique_filename)
             return unique_filename
             
-        except S3Error as e:
-            logger.error(f"Error uploading file {filename}: {e}")
+        except _s3_error() as e:
+            logger.error("Error uploading file %s: %s", filename, e)
             raise Exception(f"Failed to upload file: {str(e)}")
 
-    def get_file_url(self, file_path: str) -> str:
-        """Generate URL for accessing the file"""
+    def create_multipart_upload(self, filename: str, content_type: str) -> str:
+        """Start a multipart upload for filename and return its upload id"""
         try:
-            # Для публічного доступу через API endpoint
-            return f"{settings.API_BASE_URL}/api/photos/view/{file_path}"
-        except Exception as e:
-            logger.error(f"Error generating file URL for {file_path}: {e}")
-            return f"{settings.API_BASE_URL}/api/photos/view/{file_path}"
+            self._ensure_bucket_exists()
+            with observe_storage("multipart_create"):
+                return self.client._create_multipart_upload(
+                    self.bucket_name, filename, {"Content-Type": content_type}
+                )
+        except _s3_error() as e:
+            logger.error("Error starting multipart upload %s: %s", filename, e)
+            raise Exception(f"Failed to start upload: {str(e)}")
+
+    def upload_part(self, filename: str, upload_id: str, part_number: int, data: bytes) -> str:
+        """Store one part of a multipart upload; re-sending a part number replaces it"""
+        try:
+            with observe_storage("upload_part"):
+                etag = self.client._upload_part(self.bucket_name, filename, data, None, upload_id, part_number)
+            record_storage_bytes("put", len(data))
+            return etag
+        except _s3_error() as e:
+            logger.error("Error uploading part %s of %s: %s", part_number, filename, e)
+            raise Exception(f"Failed to upload part: {str(e)}")
+
+    def complete_multipart_upload(self, filename: str, upload_id: str):
+        """Assemble the parts MinIO holds for upload_id into the object"""
+        try:
+            parts = []
+            marker = None
+            with observe_storage("multipart_complete"):
+                while True:
+                    result = self.client._list_parts(
+                        self.bucket_name, filename, upload_id, part_number_marker=marker
+                    )
+                    parts.extend(result.parts)
+                    if not result.is_truncated:
+                        break
+                    marker = result.next_part_number_marker
+                self.client._complete_multipart_upload(self.bucket_name, filename, upload_id, parts)
+        except _s3_error() as e:
+            logger.error("Error completing multipart upload %s: %s", filename, e)
+            raise Exception(f"Failed to complete upload: {str(e)}")
+
+    def abort_multipart_upload(self, filename: str, upload_id: str) -> bool:
+        """Drop an unfinished multipart upload together with its stored parts"""
+        try:
+            with observe_storage("multipart_abort"):
+                self.client._abort_multipart_upload(self.bucket_name, filename, upload_id)
+            return True
+        except _s3_error() as e:
+            logger.warning("Error aborting multipart upload %s: %s", filename, e)
+            return False
+
+    def copy_file(self, source_path: str, target_path: Optional[str] = None) -> str:
+        """Copy an object server-side under target_path or a new unique filename"""
+        try:
+            unique_filename = target_path or self.unique_filename(source_path)
+            
+            from minio.commonconfig import CopySource
+            
+            self._ensure_bucket_exists()
+            with observe_storage("copy"):
+                self.client.copy_object(
+                    self.bucket_name,
+                    unique_filename,
+                    CopySource(self.bucket_name, source_path)
+                )
+            
+            logger.debug("Successfully copied file %s to %s", source_path, unique_filename)
+            return unique_filename
+            
+        except _s3_error() as e:
+            logger.error("Error copying file %s: %s", source_path, e)
+            raise Exception(f"Failed to copy file: {str(e)}")
+
+    def copy_to(self, target: "MinIOStorageService", file_path: str):
+        """Server-side copy into target's bucket (same MinIO deployment) under the same key"""
+        from minio.commonconfig import CopySource
+
+        try:
+            target._ensure_bucket_exists()
+            with observe_storage("copy"):
+                self.client.copy_object(target.bucket_name, file_path, CopySource(self.bucket_name, file_path))
+        except _s3_error() as e:
+            logger.error("Error copying file %s to bucket %s: %s", file_path, target.bucket_name, e)
+            raise Exception(f"Failed to copy file: {str(e)}")
 
     def get_file(self, file_path: str) -> bytes:
         """Get file data from MinIO"""
         try:
-            response = self.client.get_object(self.bucket_name, file_path)
-            data = response.read()
-            response.close()
-            response.release_conn()
-            logger.info(f"Successfully retrieved file: {file_path}, size: {len(data)} bytes")
+            with observe_storage("get"):
+                response = self.client.get_object(self.bucket_name, file_path)
+                data = response.read()
+                response.close()
+                response.release_conn()
+            record_storage_bytes("get", len(data))
+            logger.debug("Successfully retrieved file: %s, size: %s bytes", file_path, len(data))
             return data
-        except S3Error as e:
-            logger.error(f"Error getting file {file_path}: {e}")
+        except _s3_error() as e:
+            logger.error("Error getting file %s: %s", file_path, e)
             raise Exception(f"Failed to get file: {str(e)}")
 
-    def get_file_data(self, filename: str) -> Tuple[bytes, str]:
-        """Get file data and content type"""
+    def download_file(self, file_path: str, fileobj) -> int:
+        """Stream an object into a binary file object; returns the number of bytes"""
         try:
-            logger.info(f"Getting file data for {filename}")
-            
-            # Get file data
-            response = self.client.get_object(self.bucket_name, filename)
-            data = response.read()
+            size = 0
+            with observe_storage("get"):
+                response = self.client.get_object(self.bucket_name, file_path)
+                try:
+                    for chunk in response.stream(DOWNLOAD_CHUNK):
+                        fileobj.write(chunk)
+                        size += len(chunk)
+                finally:
+                    response.close()
+                    response.release_conn()
+            record_storage_bytes("get", size)
+            return size
+        except _s3_error() as e:
+            logger.error("Error downloading file %s: %s", file_path, e)
+            raise Exception(f"Failed to get file: {str(e)}")
+
+    def stat_file(self, file_path: str) -> Optional[StoredObject]:
+        try:
+            with observe_storage("stat"):
+                stat = self.client.stat_object(self.bucket_name, file_path)
+        except _s3_error():
+            return None
+        return StoredObject(file_path, stat.size, stat.last_modified, stat.content_type, stat.etag)
+
+    def iter_file(self, file_path: str, offset: int = 0, length: Optional[int] = None) -> Iterator[bytes]:
+        # Діапазон читає сам MinIO - передаються лише потрібні байти
+        with observe_storage("get"):
+            response = self.client.get_object(self.bucket_name, file_path, offset=offset, length=length or 0)
+        try:
+            for chunk in response.stream(DOWNLOAD_CHUNK):
+                record_storage_bytes("get", len(chunk))
+                yield chunk
+        finally:
             response.close()
             response.release_conn()
-            
-            # Try to get content type from object metadata
-            try:
-                stat = self.client.stat_object(self.bucket_name, filename)
-                content_type = stat.content_type or "image/jpeg"
-            except:
-                # Guess content type from extension
-                ext = os.path.splitext(filename)[1].lower()
-                content_type_map = {
-                    '.jpg': 'image/jpeg',
-                    '.jpeg': 'image/jpeg',
-                    '.png': 'image/png',
-                    '.gif': 'image/gif',
-                    '.webp': 'image/webp'
-                }
-                content_type = content_type_map.get(ext, 'image/jpeg')
-            
-            logger.info(f"Retrieved file: {filename}, size: {len(data)} bytes, type: {content_type}")
-            return data, content_type
-            
-        except S3Error as e:
-            logger.error(f"Error getting file data for {filename}: {e}")
-            raise Exception(f"Failed to get file data: {str(e)}")
 
     def delete_file(self, file_path: str) -> bool:
         """Delete file from MinIO"""
         try:
-            self.client.remove_object(self.bucket_name, file_path)
-            logger.info(f"Successfully deleted file: {file_path}")
+            with observe_storage("delete"):
+                self.client.remove_object(self.bucket_name, file_path)
+            logger.debug("Successfully deleted file: %s", file_path)
             return True
-        except S3Error as e:
-            logger.error(f"Error deleting file {file_path}: {e}")
+        except _s3_error() as e:
+            logger.error("Error deleting file %s: %s", file_path, e)
             return False
 
+    def delete_files(self, file_paths: List[str]) -> List[str]:
+        """Delete objects in bulk, DELETE_BATCH keys per request; returns the keys that were not deleted"""
+        from minio.deleteobjects import DeleteObject
+
+        failed = []
+        for start in range(0, len(file_paths), DELETE_BATCH):
+            batch = file_paths[start:start + DELETE_BATCH]
+            try:
+                with observe_storage("delete_many"):
+                    # remove_objects лінивий - запит іде лише під час ітерації по помилках
+                    errors = list(self.client.remove_objects(
+                        self.bucket_name, [DeleteObject(path) for path in batch]
+                    ))
+            except _s3_error() as e:
+                logger.error("Error deleting %d files: %s", len(batch), e)
+                failed.extend(batch)
+                continue
+            for error in errors:
+                logger.error("Error deleting file %s: %s", error.name, error.message)
+            failed.extend(error.name for error in errors)
+        return failed
+
+    def list_files(self, start_after: Optional[str] = None, prefix: Optional[str] = None) -> Iterator:
+        """Objects of the bucket in key order (UTF-8 bytes), optionally after a key or under a prefix.
+
+        MinIO returns them page by page as the iterator advances.
+        """
+        return self.client.list_objects(self.bucket_name, prefix=prefix, recursive=True, start_after=start_after)
+
     def file_exists(self, file_path: str) -> bool:
         """Check if file exists in MinIO"""
         try:
-            self.client.stat_object(self.bucket_name, file_path)
+            with observe_storage("stat"):
+                self.client.stat_object(self.bucket_name, file_path)
             return True
-        except S3Error:
+        except _s3_error():
             return False
 
-    def get_image_dimensions(self, file_data: bytes) -> tuple:
-        """Get image dimensions from file data"""
+class LocalStorageService(StorageBackend):
+    """Files in a local directory, for single-node deployments and tests.
+
+    Object names map to paths under root. Every write goes to a temporary
+    file in root/.storage and is renamed into place, so readers never see a
+    partial file; multipart parts wait in root/.storage/multipart. Copies
+    are hard links - objects are never modified in place.
+    """
+    INTERNAL_DIR = ".storage"
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self.bucket_name = self.root
+        self._tmp_dir = os.path.join(self.root, self.INTERNAL_DIR, "tmp")
+        self._multipart_dir = os.path.join(self.root, self.INTERNAL_DIR, "multipart")
+
+    def _path(self, file_path: str) -> str:
+        path = os.path.normpath(os.path.join(self.root, file_path))
+        # Ім'я з URL не повинне виводити за межі каталогу або в службові файли
+        if not path.startswith(self.root + os.sep) or file_path.startswith(self.INTERNAL_DIR):
+            raise ValueError(f"Invalid file name {file_path!r}")
+        return path
+
+    def _write(self, path: str, chunks: Iterable[bytes]) -> int:
+        """Write chunks to path atomically (temp file + rename); returns the size"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.makedirs(self._tmp_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self._tmp_dir)
+        size = 0
         try:
-            from PIL import Image
-            image = Image.open(BytesIO(file_data))
-            return image.size  # (width, height)
-        except Exception as e:
-            logger.error(f"Error getting image dimensions: {e}")
-            return None, None
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    size += len(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return size
+
+    def _upload_dir(self, upload_id: str) -> str:
+        if not upload_id.isalnum():
+            raise ValueError(f"Invalid upload id {upload_id!r}")
+        return os.path.join(self._multipart_dir, upload_id)
+
+    def ensure_bucket(self) -> bool:
+        os.makedirs(self._tmp_dir, exist_ok=True)
+        os.makedirs(self._multipart_dir, exist_ok=True)
+        return True
+
+    def is_reachable(self) -> bool:
+        return os.access(self.root, os.W_OK)
+
+    def upload_file(self, file_data: bytes, filename: str, content_type: str = "application/octet-stream",
+                    prefix: str = "") -> str:
+        """Write file under a new unique name and return it"""
+        unique_filename = self.unique_filename(filename, prefix)
+        try:
+            with observe_storage("put"):
+                self._write(self._path(unique_filename), [file_data])
+        except OSError as e:
+            logger.error("Error uploading file %s: %s", filename, e)
+            raise Exception(f"Failed to upload file: {str(e)}")
+        record_storage_bytes("put", len(file_data))
+        return unique_filename
+
+    def create_multipart_upload(self, filename: str, content_type: str) -> str:
+        upload_id = uuid.uuid4().hex
+        os.makedirs(self._upload_dir(upload_id))
+        return upload_id
+
+    def upload_part(self, filename: str, upload_id: str, part_number: int, data: bytes) -> str:
+        """Store one part; re-sending a part number replaces it"""
+        upload_dir = self._upload_dir(upload_id)
+        if not os.path.isdir(upload_dir):
+            raise Exception(f"Failed to upload part: upload {upload_id} does not exist")
+        with observe_storage("upload_part"):
+            self._write(os.path.join(upload_dir, str(part_number)), [data])
+        record_storage_bytes("put", len(data))
+        return str(part_number)
+
+    def complete_multipart_upload(self, filename: str, upload_id: str):
+        """Concatenate the parts in part number order into the file"""
+        upload_dir = self._upload_dir(upload_id)
+        if not os.path.isdir(upload_dir):
+            raise Exception(f"Failed to complete upload: upload {upload_id} does not exist")
+
+        def chunks():
+            for part in sorted(os.listdir(upload_dir), key=int):
+                with open(os.path.join(upload_dir, part), "rb") as f:
+                    while True:
+                        chunk = f.read(DOWNLOAD_CHUNK)
+                        if not chunk:
+                            break
+                        yield chunk
+
+        with observe_storage("multipart_complete"):
+            self._write(self._path(filename), chunks())
+        shutil.rmtree(upload_dir, ignore_errors=True)
+
+    def abort_multipart_upload(self, filename: str, upload_id: str) -> bool:
+        upload_dir = self._upload_dir(upload_id)
+        if not os.path.isdir(upload_dir):
+            return False
+        shutil.rmtree(upload_dir, ignore_errors=True)
+        return True
+
+    def copy_file(self, source_path: str, target_path: Optional[str] = None) -> str:
+        """Hard link the file under target_path or a new unique name (a byte copy across file systems)"""
+        unique_filename = target_path or self.unique_filename(source_path)
+        self._link(source_path, self, unique_filename)
+        return unique_filename
+
+    def _link(self, source_path: str, target: "LocalStorageService", target_path: str):
+        source = self._path(source_path)
+        path = target._path(target_path)
+        try:
+            with observe_storage("copy"):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                try:
+                    os.link(source, path)
+                except OSError:
+                    # Інша файлова система або ціль уже є - звичайна атомарна копія
+                    with open(source, "rb") as f:
+                        target._write(path, iter(lambda: f.read(DOWNLOAD_CHUNK), b""))
+        except OSError as e:
+            logger.error("Error copying file %s: %s", source_path, e)
+            raise Exception(f"Failed to copy file: {str(e)}")
+
+    def copy_to(self, target: "LocalStorageService", file_path: str):
+        """Hard link into target's directory under the same key (a byte copy across file systems)"""
+        self._link(file_path, target, file_path)
+
+    def get_file(self, file_path: str) -> bytes:
+        try:
+            with observe_storage("get"):
+                with open(self._path(file_path), "rb") as f:
+                    data = f.read()
+        except (OSError, ValueError) as e:
+            logger.error("Error getting file %s: %s", file_path, e)
+            raise Exception(f"Failed to get file: {str(e)}")
+        record_storage_bytes("get", len(data))
+        return data
+
+    def download_file(self, file_path: str, fileobj) -> int:
+        try:
+            size = 0
+            with observe_storage("get"):
+                for chunk in self.iter_file(file_path):
+                    fileobj.write(chunk)
+                    size += len(chunk)
+            return size
+        except (OSError, ValueError) as e:
+            logger.error("Error downloading file %s: %s", file_path, e)
+            raise Exception(f"Failed to get file: {str(e)}")
+
+    def stat_file(self, file_path: str) -> Optional[StoredObject]:
+        try:
+            stat = os.stat(self._path(file_path))
+        except (OSError, ValueError):
+            return None
+        return StoredObject(
+            file_path, stat.st_size, datetime.fromtimestamp(stat.st_mtime, timezone.utc),
+            etag=f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+        )
+
+    def iter_file(self, file_path: str, offset: int = 0, length: Optional[int] = None) -> Iterator[bytes]:
+        with open(self._path(file_path), "rb") as f:
+            f.seek(offset)
+            remaining = length
+            while remaining is None or remaining > 0:
+                chunk = f.read(DOWNLOAD_CHUNK if remaining is None else min(DOWNLOAD_CHUNK, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                record_storage_bytes("get", len(chunk))
+                yield chunk
+
+    def local_path(self, file_path: str) -> Optional[str]:
+        try:
+            return self._path(file_path)
+        except ValueError:
+            return None
+
+    def delete_file(self, file_path: str) -> bool:
+        """Delete the file; a missing file counts as deleted, as in S3"""
+        try:
+            with observe_storage("delete"):
+                os.remove(self._path(file_path))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.error("Error deleting file %s: %s", file_path, e)
+            return False
+        return True
+
+    def _list_dir(self, directory: str, prefix: str, start_after: Optional[str], match: str) -> Iterator[StoredObject]:
+        entries = []
+        with os.scandir(directory) as scan:
+            for entry in scan:
+                if not prefix and entry.name == self.INTERNAL_DIR:
+                    continue
+                # Каталог "a" сортується як "a/": так обхід дає той самий порядок, що й S3
+                is_dir = entry.is_dir(follow_symlinks=False)
+                entries.append((prefix + entry.name + ("/" if is_dir else ""), entry, is_dir))
+        for key, entry, is_dir in sorted(entries, key=lambda item: item[0]):
+            if is_dir:
+                # Пропускаємо каталоги, всі ключі яких не більші за start_after або поза match
+                if start_after and key < start_after and not start_after.startswith(key):
+                    continue
+                if not key.startswith(match) and not match.startswith(key):
+                    continue
+                yield from self._list_dir(entry.path, key, start_after, match)
+            elif (not start_after or key > start_after) and key.startswith(match):
+                stat = entry.stat(follow_symlinks=False)
+                yield StoredObject(key, stat.st_size, datetime.fromtimestamp(stat.st_mtime, timezone.utc))
+
+    def list_files(self, start_after: Optional[str] = None, prefix: Optional[str] = None) -> Iterator[StoredObject]:
+        # Обхід починається з найглибшого каталогу, що містить prefix
+        directory = posixpath.dirname(prefix or "")
+        try:
+            path = self._path(directory) if directory else self.root
+        except ValueError:
+            return iter(())
+        if not os.path.isdir(path):
+            return iter(())
+        return self._list_dir(path, directory + "/" if directory else "", start_after, prefix or "")
+
+    def delete_prefix(self, prefix: str) -> List[str]:
+        """Remove the directory of prefix as a whole; returns the keys that were not deleted"""
+        if not prefix.endswith("/"):
+            raise ValueError(f"Prefix {prefix!r} must end with /")
+        try:
+            path = self._path(prefix)
+        except ValueError:
+            return []
+        if not os.path.isdir(path):
+            return []
+        failed = []
+
+        def onerror(function, failed_path, exc_info):
+            logger.error("Error deleting %s: %s", failed_path, exc_info[1])
+            failed.append(os.path.relpath(failed_path, self.root).replace(os.sep, "/"))
+
+        with observe_storage("delete_many"):
+            shutil.rmtree(path, onerror=onerror)
+        return failed
+
+    def file_exists(self, file_path: str) -> bool:
+        try:
+            return os.path.isfile(self._path(file_path))
+        except ValueError:
+            return False
+
+STORAGE_BACKENDS = {
+    "minio": lambda archive: MinIOStorageService(
+        settings.MINIO_ARCHIVE_BUCKET_NAME if archive else settings.MINIO_BUCKET_NAME
+    ),
+    "local": lambda archive: LocalStorageService(
+        settings.STORAGE_ARCHIVE_PATH if archive else settings.STORAGE_LOCAL_PATH
+    ),
+}
+
+def create_storage_service(backend: Optional[str] = None, archive: bool = False) -> StorageBackend:
+    """Storage backend named by settings.STORAGE_BACKEND (or backend); archive - its cold tier"""
+    backend = backend or settings.STORAGE_BACKEND
+    if backend not in STORAGE_BACKENDS:
+        raise ValueError(f"Unknown storage backend {backend!r}, expected one of {', '.join(STORAGE_BACKENDS)}")
+    return STORAGE_BACKENDS[backend](archive)
 
 # Create a global instance
-storage_service = MinIOStorageService()
+storage_service = create_storage_service()
+# Холодний рівень: оригінали фото архівованих галерей (archive.py)
+archive_storage = create_storage_service(archive=True)
+
+def tier_storage(archived: bool) -> StorageBackend:
+    """Storage holding a photo's object, by Photo.archived"""
+    return archive_storage if archived else storage_service
 
 # Alias for compatibility
 minio_client = storage_service
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+
+import argparse
+import sys
+from database import SessionLocal
+from orphans import sweep, SWEEP_BATCH, GRACE_HOURS
+
+def sweep_orphans(delete_orphans=False, delete_dangling=False, grace_hours=GRACE_HOURS, rate=0,
+                  batch=SWEEP_BATCH, checkpoint=None, report=False):
+    """Find MinIO objects without photos and photos without objects, optionally deleting them"""
+    db = SessionLocal()
+    try:
+        stats = sweep(
+            db, delete_orphans, delete_dangling, grace_hours, rate, batch, checkpoint,
+            sys.stdout if report else None
+        )
+    finally:
+        db.close()
+    print(
+        f"Scanned {stats['objects']} objects and {stats['photos']} photos: "
+        f"{stats['orphan_objects']} orphan objects ({stats['orphan_bytes']} bytes, {stats['deleted_objects']} deleted), "
+        f"{stats['dangling_photos']} dangling photos ({stats['deleted_photos']} deleted), "
+        f"{stats['skipped_recent']} skipped as too recent"
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=sweep_orphans.__doc__)
+    parser.add_argument("--delete-orphans", action="store_true", help="delete objects no photo refers to")
+    parser.add_argument("--delete-dangling", action="store_true", help="delete photos whose object is missing")
+    parser.add_argument("--grace-hours", type=float, default=GRACE_HOURS, help="ignore anything younger")
+    parser.add_argument("--rate", type=float, default=0, help="max listed objects per second, 0 - unlimited")
+    parser.add_argument("--batch", type=int, default=SWEEP_BATCH)
+    parser.add_argument("--checkpoint", help="file to resume from and to save progress to")
+    parser.add_argument("--report", action="store_true", help="print every mismatch as a tab separated line")
+    args = parser.parse_args()
+    sweep_orphans(args.delete_orphans, args.delete_dangling, args.grace_hours, args.rate,
+                  args.batch, args.checkpoint, args.report)
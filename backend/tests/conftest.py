@@ -0,0 +1,53 @@
+"""Shared fixtures: a temporary SQLite database and in-memory MinIO.
+
+Run from backend/:
+
+    pip install -r tests/requirements.txt
+    python -m pytest -q
+"""
+import os
+import tempfile
+
+# DATABASE_URL має бути задано до імпорту config; тести ніколи не йдуть у справжню базу
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/tests.db"
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture(scope="session")
+def app():
+    import storage
+    from benchmarks.memory_minio import MemoryMinio
+    from database import engine, Base
+    import main
+
+    storage.storage_service.client = storage.archive_storage.client = MemoryMinio()
+    Base.metadata.create_all(engine)
+    return main.app
+
+
+@pytest.fixture(scope="session")
+def client(app):
+    # Без `with`: lifespan (воркери, бакет) тестам не потрібен
+    return TestClient(app)
+
+
+@pytest.fixture(scope="session")
+def seeded(app):
+    from database import SessionLocal
+    from benchmarks.seed import seed
+
+    db = SessionLocal()
+    try:
+        return seed(db, galleries=2, scenes=2, photos=4, image_size=32, image_variants=2)
+    finally:
+        db.close()
+
+
+@pytest.fixture(scope="session")
+def auth_headers(client, seeded):
+    from benchmarks.seed import BENCH_EMAIL, BENCH_PASSWORD
+
+    response = client.post("/api/auth/login", json={"email": BENCH_EMAIL, "password": BENCH_PASSWORD})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
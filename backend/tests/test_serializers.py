@@ -0,0 +1,158 @@
+"""ORJSONResponse payloads must be byte-identical to response_model output.
+
+The endpoints below build their JSON by hand (serializers.py) and bypass
+FastAPI's response_model validation. Each test captures the content an
+endpoint passes to ORJSONResponse and renders the same content the way
+FastAPI would have: validated and serialized through the route's
+response_model, jsonable_encoder, then JSONResponse. The bytes must match,
+for the naive datetimes SQLite returns and for tz-aware ones as PostgreSQL
+returns them.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+from starlette.routing import Match
+
+from serializers import ORJSONResponse
+
+SESSION_TOKEN = "parity-session"
+
+
+@pytest.fixture(scope="module")
+def photos(client, seeded, auth_headers):
+    """Photos with NULL and filled placeholder/EXIF fields, favorites and a cover"""
+    from database import SessionLocal
+    from models import Gallery, Photo
+
+    gallery_id = seeded["gallery_ids"][0]
+    db = SessionLocal()
+    try:
+        photo_ids = [
+            photo_id for (photo_id,) in db.query(Photo.id).filter(Photo.gallery_id == gallery_id).order_by(Photo.id)
+        ]
+        bare, detailed = photo_ids[0], photo_ids[1]
+        db.query(Photo).filter(Photo.id == bare).update({
+            Photo.placeholder: None,
+            Photo.dominant_color: None,
+            Photo.taken_at: None,
+            Photo.camera: None,
+            Photo.lens: None,
+            Photo.focal_length: None,
+            Photo.orientation: None,
+        })
+        db.query(Photo).filter(Photo.id == detailed).update({
+            Photo.taken_at: datetime(2024, 6, 1, 14, 3, 7, 120000),
+            Photo.camera: "NIKON Z 9",
+            Photo.lens: "Об'єктив 50mm f/1.8",
+            Photo.focal_length: 35.5,
+            Photo.orientation: 6,
+        })
+        db.query(Gallery).filter(Gallery.id == gallery_id).update({Gallery.name: "Весілля «Ліс»"})
+        db.commit()
+    finally:
+        db.close()
+
+    client.put(f"/api/photos/{detailed}/set-cover", headers=auth_headers)
+    client.post("/api/photos/favorites", json={"photo_id": detailed}, headers=auth_headers)
+    client.post("/api/photos/favorites", json={"photo_id": bare, "session_id": SESSION_TOKEN})
+    return {"bare": bare, "detailed": detailed}
+
+
+@pytest.fixture
+def rendered(monkeypatch):
+    """(content, body) of every ORJSONResponse rendered during the test"""
+    captured = []
+    render = ORJSONResponse.render
+
+    def capture(self, content):
+        body = render(self, content)
+        captured.append((content, body))
+        return body
+
+    monkeypatch.setattr(ORJSONResponse, "render", capture)
+    return captured
+
+
+def response_model_body(app, path: str, content) -> bytes:
+    """What FastAPI sends for content returned from the GET route serving path"""
+    route = next(
+        route for route in app.routes
+        if isinstance(route, APIRoute)
+        and route.matches({"type": "http", "path": path, "method": "GET"})[0] == Match.FULL
+    )
+    value = asyncio.run(serialize_response(field=route.response_field, response_content=content))
+    return JSONResponse(value).body
+
+
+def with_timezone(content, tz):
+    """content with every naive datetime made aware in tz"""
+    if isinstance(content, datetime):
+        return content.replace(tzinfo=tz) if content.tzinfo is None else content
+    if isinstance(content, dict):
+        return {key: with_timezone(value, tz) for key, value in content.items()}
+    if isinstance(content, list):
+        return [with_timezone(value, tz) for value in content]
+    return content
+
+
+ENDPOINTS = [
+    # (назва, шлях, параметри, з токеном власника)
+    ("get_gallery", "/api/galleries/{gallery_id}", {}, True),
+    ("get_gallery_taken_at", "/api/galleries/{gallery_id}", {"sort": "taken_at"}, True),
+    ("get_gallery_layouts", "/api/galleries/{gallery_id}", {"layout_widths": [360, 1280]}, True),
+    ("get_public_gallery", "/api/galleries/{gallery_id}/public", {"session_id": SESSION_TOKEN}, False),
+    ("get_public_gallery_user", "/api/galleries/{gallery_id}/public", {}, True),
+    ("get_scene", "/api/galleries/scenes/{scene_id}", {"layout_widths": [768]}, True),
+    ("get_photos", "/api/galleries/scenes/{scene_id}/photos", {}, True),
+    ("get_public_photos", "/api/galleries/scenes/{scene_id}/photos/public", {"session_id": SESSION_TOKEN}, False),
+    ("user_favorites", "/api/photos/favorites", {}, True),
+    ("session_favorites", "/api/photos/favorites", {"session_id": SESSION_TOKEN}, False),
+    ("gallery_favorites", "/api/galleries/{gallery_id}/favorites", {}, True),
+]
+
+
+@pytest.mark.parametrize("name, template, params, owner", ENDPOINTS, ids=[endpoint[0] for endpoint in ENDPOINTS])
+def test_orjson_matches_response_model(app, client, seeded, auth_headers, photos, rendered,
+                                       name, template, params, owner):
+    path = template.format(gallery_id=seeded["gallery_ids"][0], scene_id=seeded["scene_ids"][0])
+    response = client.get(path, params=params, headers=auth_headers if owner else {})
+    assert response.status_code == 200, response.text
+    assert len(rendered) == 1
+    content, body = rendered[0]
+    assert response.content == body
+    assert content, "the endpoint returned an empty payload - nothing was compared"
+
+    assert body == response_model_body(app, path, content)
+    for tz in (timezone.utc, timezone(timedelta(hours=2))):
+        aware = with_timezone(content, tz)
+        assert ORJSONResponse(aware).body == response_model_body(app, path, aware)
+
+
+def test_gallery_payload_fields(client, seeded, auth_headers, photos):
+    """The hand-built fields the schema defaults would otherwise hide"""
+    gallery_id = seeded["gallery_ids"][0]
+    gallery = client.get(f"/api/galleries/{gallery_id}", headers=auth_headers).json()
+    assert gallery["cover_photo_id"] == photos["detailed"]
+
+    for scene in gallery["scenes"]:
+        assert scene["photo_count"] == len(scene["photos"]) > 0
+        assert scene["total_bytes"] == sum(photo["file_size"] for photo in scene["photos"])
+        assert scene["cover_url"] == scene["photos"][0]["url"]
+        assert scene["layout"] is None
+
+    by_id = {photo["id"]: photo for scene in gallery["scenes"] for photo in scene["photos"]}
+    bare = by_id[photos["bare"]]
+    assert [bare[field] for field in ("placeholder", "dominant_color", "taken_at", "camera", "lens",
+                                      "focal_length", "orientation")] == [None] * 7
+    assert by_id[photos["detailed"]]["taken_at"] == "2024-06-01T14:03:07.120000"
+    assert by_id[photos["detailed"]]["is_favorite"] is True
+
+
+def test_public_gallery_marks_session_favorites(client, seeded, photos):
+    gallery_id = seeded["gallery_ids"][0]
+    gallery = client.get(f"/api/galleries/{gallery_id}/public", params={"session_id": SESSION_TOKEN}).json()
+    favorites = {photo["id"] for scene in gallery["scenes"] for photo in scene["photos"] if photo["is_favorite"]}
+    assert favorites == {photos["bare"]}
@@ -0,0 +1,164 @@
+import base64
+import binascii
+import logging
+import tempfile
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from config import settings
+from models import Photo, Scene, UploadSession
+from ordering import ORDER_GAP
+from storage import storage_service
+from imaging import image_info
+from layout import invalidate_layouts
+from usage import QuotaExceeded, add_photos
+
+logger = logging.getLogger(__name__)
+
+# Файли до цього розміру читаються для обробки в пам'ять, більші - через тимчасовий файл
+SPOOL_MAX_BYTES = 16 * 1024 * 1024
+# Скільки прострочених завантажень скасовувати за одну транзакцію
+EXPIRE_BATCH = 100
+
+
+class OffsetConflict(Exception):
+    """Another request already moved the upload past the expected offset"""
+
+
+def parse_metadata(header: Optional[str]) -> Dict[str, str]:
+    """Decode a tus Upload-Metadata header: comma separated `key base64(value)` pairs"""
+    metadata = {}
+    for pair in (header or "").split(","):
+        pair = pair.strip()
+        if not pair:
+            continue
+        key, _, encoded = pair.partition(" ")
+        try:
+            metadata[key] = base64.b64decode(encoded.strip(), validate=True).decode()
+        except (binascii.Error, UnicodeDecodeError):
+            raise ValueError(f"Invalid Upload-Metadata value for {key}")
+    return metadata
+
+
+def expires_at(upload: UploadSession) -> datetime:
+    updated_at = upload.updated_at
+    if updated_at.tzinfo is None:
+        # SQLite повертає naive datetime в UTC
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    return updated_at + timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)
+
+
+def store_part(db: Session, upload_id: str, filename: str, multipart_upload_id: str,
+               part_size: int, offset: int, data: bytes) -> int:
+    """Write one part at offset and advance the upload; returns the new offset.
+
+    The part number follows from the offset, so a retried or concurrent write
+    of the same range replaces the same part instead of duplicating it.
+    """
+    storage_service.upload_part(filename, multipart_upload_id, offset // part_size + 1, data)
+    updated = db.query(UploadSession).filter(
+        UploadSession.id == upload_id,
+        UploadSession.upload_offset == offset
+    ).update({
+        UploadSession.upload_offset: offset + len(data),
+        UploadSession.updated_at: datetime.now(timezone.utc)
+    }, synchronize_session=False)
+    db.commit()
+    if not updated:
+        raise OffsetConflict()
+    return offset + len(data)
+
+
+def complete_upload(db: Session, upload_id: str) -> Photo:
+    """Assemble the stored parts and create the Photo for a fully received upload.
+
+    Raises ValueError (after removing the object) when the file is not an
+    image, QuotaExceeded (likewise) when it no longer fits into the quota and
+    LookupError when the target scene no longer exists.
+    """
+    upload = db.query(UploadSession).filter(UploadSession.id == upload_id).with_for_update().one()
+    if upload.photo_id is not None:
+        return db.get(Photo, upload.photo_id)
+
+    scene = db.get(Scene, upload.scene_id)
+    if scene is None:
+        storage_service.abort_multipart_upload(upload.filename, upload.multipart_upload_id)
+        db.delete(upload)
+        db.commit()
+        raise LookupError("Scene not found")
+
+    # Після збою між complete і commit об'єкт уже зібраний, а multipart upload закритий
+    if not storage_service.file_exists(upload.filename):
+        storage_service.complete_multipart_upload(upload.filename, upload.multipart_upload_id)
+    try:
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as spool:
+            storage_service.download_file(upload.filename, spool)
+            spool.seek(0)
+            info = image_info(spool)
+    except Exception as e:
+        logger.error("Uploaded file %s is not a valid image: %s", upload.original_filename, e)
+        storage_service.delete_file(upload.filename)
+        db.delete(upload)
+        db.commit()
+        raise ValueError(f"File {upload.original_filename} is not a valid image")
+
+    max_order = db.query(func.max(Photo.order_index)).filter(Photo.scene_id == scene.id).scalar()
+    photo = Photo(
+        filename=upload.filename,
+        original_filename=upload.original_filename,
+        file_path=f"/uploads/{upload.filename}",
+        mime_type=upload.mime_type,
+        file_size=upload.upload_length,
+        **info._asdict(),
+        scene_id=scene.id,
+        gallery_id=scene.gallery_id,
+        owner_id=upload.owner_id,
+        order_index=(max_order + ORDER_GAP) if max_order is not None else 0
+    )
+    db.add(photo)
+    db.flush()
+    invalidate_layouts(db, [scene.id])
+    # Резерв цього завантаження переходить у фото; check_quota при створенні не атомарний,
+    # тож остаточна перевірка - тут, з резервами інших незавершених завантажень
+    try:
+        add_photos(db, [photo], enforce=True, upload_id=upload.id)
+    except QuotaExceeded:
+        db.rollback()
+        storage_service.delete_file(upload.filename)
+        db.delete(upload)
+        db.commit()
+        raise
+    upload.photo_id = photo.id
+    upload.updated_at = datetime.now(timezone.utc)
+    db.commit()
+    logger.info("Completed resumable upload %s as photo %s", upload_id, photo.id)
+    return photo
+
+
+def expire_upload_sessions(db: Session, ttl_hours: Optional[int] = None, batch: int = EXPIRE_BATCH) -> int:
+    """Abort uploads idle for longer than the TTL and forget finished ones.
+
+    Returns the number of upload sessions removed.
+    """
+    ttl_hours = settings.UPLOAD_SESSION_TTL_HOURS if ttl_hours is None else ttl_hours
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=ttl_hours)
+    removed = 0
+    while True:
+        uploads = db.query(
+            UploadSession.id, UploadSession.filename, UploadSession.multipart_upload_id, UploadSession.photo_id
+        ).filter(UploadSession.updated_at < cutoff).limit(batch).all()
+        if not uploads:
+            break
+        for upload in uploads:
+            if upload.photo_id is None:
+                storage_service.abort_multipart_upload(upload.filename, upload.multipart_upload_id)
+        db.query(UploadSession).filter(
+            UploadSession.id.in_([upload.id for upload in uploads])
+        ).delete(synchronize_session=False)
+        db.commit()
+        removed += len(uploads)
+
+    if removed:
+        logger.info("Removed %d upload sessions idle for more than %d hours", removed, ttl_hours)
+    return removed
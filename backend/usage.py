@@ -0,0 +1,186 @@
+"""Maintained storage usage of users and galleries.
+
+users/galleries.storage_bytes and photo_count change in the transaction that
+adds, removes or moves the photos they count, through atomic `x = x + delta`
+updates, so reading usage never sums photos. reconcile_usage() recomputes
+them from the photos table and repairs any drift.
+"""
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session
+from config import settings
+from database import advisory_lock
+from models import User, Gallery, Photo, UploadSession
+from ordering import bulk_update
+
+logger = logging.getLogger(__name__)
+
+# Скільки користувачів / галерей звіряється за одну транзакцію
+RECONCILE_BATCH = 500
+
+# Звірка блокує лічильники - одночасно її виконує лише один воркер або скрипт
+RECONCILE_LOCK = "usage_reconcile"
+
+
+class QuotaExceeded(Exception):
+    """The change would take the user over their storage quota"""
+
+
+def effective_quota(storage_quota: Optional[int]) -> Optional[int]:
+    """Quota in bytes for a User.storage_quota value; None - unlimited"""
+    quota = settings.STORAGE_QUOTA_BYTES if storage_quota is None else storage_quota
+    return quota or None
+
+
+def _reserved(user_id: int, exclude_upload: Optional[str] = None):
+    query = select(func.coalesce(func.sum(UploadSession.upload_length), 0)).where(
+        UploadSession.owner_id == user_id,
+        UploadSession.photo_id.is_(None)
+    )
+    if exclude_upload is not None:
+        query = query.where(UploadSession.id != exclude_upload)
+    return query
+
+
+def reserved_bytes(db: Session, user_id: int) -> int:
+    """Bytes announced by the user's unfinished resumable uploads"""
+    return db.execute(_reserved(user_id)).scalar()
+
+
+def check_quota(db: Session, user_id: int, incoming: int):
+    """Raise QuotaExceeded when incoming more bytes do not fit into the user's quota.
+
+    Unfinished resumable uploads count as used. This is the early check made
+    before any bytes are read; add_photos(..., enforce=True) is the final one
+    and counts them the same way.
+    """
+    user = db.query(User.storage_bytes, User.storage_quota).filter(User.id == user_id).one()
+    quota = effective_quota(user.storage_quota)
+    if quota is None:
+        return
+    used = user.storage_bytes + reserved_bytes(db, user_id)
+    if used + incoming > quota:
+        raise QuotaExceeded(
+            f"Storage quota exceeded: {used} of {quota} bytes used, {incoming} more requested"
+        )
+
+
+def _totals(photos: Iterable, key: str) -> Dict[int, List[int]]:
+    """{owner_id or gallery_id: [bytes, count]} of photos"""
+    totals = defaultdict(lambda: [0, 0])
+    for photo in photos:
+        total = totals[getattr(photo, key)]
+        total[0] += photo.file_size
+        total[1] += 1
+    return totals
+
+
+def _add_gallery_usage(db: Session, deltas: Dict[int, List[int]]):
+    # Завжди в порядку id - паралельні транзакції блокують рядки в одному порядку
+    for gallery_id in sorted(deltas):
+        size, count = deltas[gallery_id]
+        if count:
+            db.execute(update(Gallery).where(Gallery.id == gallery_id).values(
+                storage_bytes=Gallery.storage_bytes + size,
+                photo_count=Gallery.photo_count + count
+            ).execution_options(synchronize_session=False))
+
+
+def _add_usage(db: Session, photos: List, sign: int, enforce: bool = False,
+               exclude_upload: Optional[str] = None):
+    for user_id, (size, count) in sorted(_totals(photos, "owner_id").items()):
+        stmt = update(User).where(User.id == user_id).values(
+            storage_bytes=User.storage_bytes + sign * size,
+            photo_count=User.photo_count + sign * count
+        )
+        if enforce:
+            # Перевірка і збільшення одним UPDATE - паралельні завантаження не проскочать квоту;
+            # незавершені resumable-завантаження рахуються зайнятими, як і в check_quota
+            quota = func.coalesce(User.storage_quota, settings.STORAGE_QUOTA_BYTES)
+            reserved = _reserved(user_id, exclude_upload).scalar_subquery()
+            stmt = stmt.where(or_(quota == 0, User.storage_bytes + reserved + size <= quota))
+        result = db.execute(stmt.execution_options(synchronize_session=False))
+        if enforce and not result.rowcount:
+            raise QuotaExceeded(f"Storage quota exceeded: {size} more bytes do not fit")
+    _add_gallery_usage(db, {
+        gallery_id: [sign * size, sign * count]
+        for gallery_id, (size, count) in _totals(photos, "gallery_id").items()
+    })
+
+
+def add_photos(db: Session, photos: Iterable, enforce: bool = False, upload_id: Optional[str] = None):
+    """Count new photos (anything with owner_id, gallery_id and file_size) in the usage.
+
+    With enforce, raises QuotaExceeded instead of going over the quota; the
+    caller rolls back and removes the stored files. upload_id is the resumable
+    upload the photos complete, whose reservation they replace. Does not commit.
+    """
+    _add_usage(db, list(photos), 1, enforce, upload_id)
+
+
+def remove_photos(db: Session, photos: Iterable):
+    """Subtract deleted photos from the usage. Does not commit."""
+    _add_usage(db, list(photos), -1)
+
+
+def move_photos(db: Session, photos: Iterable, gallery_id: int):
+    """Move the usage of photos (with their old gallery_id) to gallery_id; owners keep it. Does not commit."""
+    deltas = {
+        source_id: [-size, -count]
+        for source_id, (size, count) in _totals(photos, "gallery_id").items()
+        if source_id != gallery_id
+    }
+    deltas[gallery_id] = [
+        -sum(delta[0] for delta in deltas.values()),
+        -sum(delta[1] for delta in deltas.values())
+    ]
+    _add_gallery_usage(db, deltas)
+
+
+def _reconcile(db: Session, model, photo_column, batch: int) -> int:
+    fixed = 0
+    last_id = 0
+    while True:
+        # Рядки лічильників блокуються до commit: зміни фото, що вже в дорозі, застосують
+        # свою дельту після перерахунку, а не будуть ним перезаписані
+        rows = db.query(model.id, model.storage_bytes, model.photo_count).filter(
+            model.id > last_id
+        ).order_by(model.id).limit(batch).with_for_update().all()
+        if not rows:
+            db.commit()
+            return fixed
+        last_id = rows[-1].id
+
+        actual = {
+            row.id: (row.storage_bytes, row.photo_count)
+            for row in db.query(
+                photo_column.label("id"),
+                func.coalesce(func.sum(Photo.file_size), 0).label("storage_bytes"),
+                func.count(Photo.id).label("photo_count")
+            ).filter(photo_column.in_([row.id for row in rows])).group_by(photo_column)
+        }
+        drifted = []
+        for row in rows:
+            storage_bytes, photo_count = actual.get(row.id, (0, 0))
+            if (row.storage_bytes, row.photo_count) != (storage_bytes, photo_count):
+                drifted.append({"id": row.id, "storage_bytes": storage_bytes, "photo_count": photo_count})
+        fixed += bulk_update(db, model, drifted)
+        db.commit()
+
+
+def reconcile_usage(db: Session, batch: int = RECONCILE_BATCH) -> Tuple[int, int]:
+    """Recompute the usage counters from photos; returns the numbers of users and galleries fixed.
+
+    Skipped (returns zeros) while another worker or script reconciles.
+    """
+    with advisory_lock(db.get_bind(), RECONCILE_LOCK) as locked:
+        if not locked:
+            logger.debug("Storage usage is reconciled elsewhere, skipped")
+            return 0, 0
+        users = _reconcile(db, User, Photo.owner_id, batch)
+        galleries = _reconcile(db, Gallery, Photo.gallery_id, batch)
+    if users or galleries:
+        logger.warning("Fixed drifted storage usage of %d users and %d galleries", users, galleries)
+    return users, galleries
@@ -0,0 +1,172 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional, Set
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from config import settings
+from models import UserFavorite, VisitorSession
+from ordering import bulk_update
+
+logger = logging.getLogger(__name__)
+
+# Скільки прострочених сесій видаляти за одну транзакцію
+CLEANUP_BATCH = 1000
+# last_seen_at оновлюється при читанні не частіше - інакше кожен перегляд писав би в базу
+SESSION_TOUCH_INTERVAL = timedelta(days=1)
+
+
+def find_session_id(db: Session, token: str, gallery_id: int) -> Optional[int]:
+    """Id of the visitor session for token in gallery, if there is one"""
+    return db.query(VisitorSession.id).filter(
+        VisitorSession.token == token,
+        VisitorSession.gallery_id == gallery_id
+    ).scalar()
+
+
+def touch_session(db: Session, token: str, gallery_id: Optional[int] = None):
+    """Mark the visitor's sessions (in one gallery or all) as seen, at most once per SESSION_TOUCH_INTERVAL.
+
+    Reading favorites keeps them alive as toggling does. Does not commit.
+    """
+    now = datetime.now(timezone.utc)
+    query = db.query(VisitorSession).filter(
+        VisitorSession.token == token,
+        VisitorSession.last_seen_at < now - SESSION_TOUCH_INTERVAL
+    )
+    if gallery_id is not None:
+        query = query.filter(VisitorSession.gallery_id == gallery_id)
+    query.update({VisitorSession.last_seen_at: now}, synchronize_session=False)
+
+
+def get_or_create_session_id(db: Session, token: str, gallery_id: int) -> int:
+    """Return the visitor session for token in gallery, creating it if unknown.
+
+    Marks the session as seen now. Does not commit.
+    """
+    session_id = find_session_id(db, token, gallery_id)
+    if session_id is not None:
+        db.query(VisitorSession).filter(VisitorSession.id == session_id).update(
+            {VisitorSession.last_seen_at: datetime.now(timezone.utc)}, synchronize_session=False
+        )
+        return session_id
+
+    session = VisitorSession(token=token, gallery_id=gallery_id)
+    try:
+        with db.begin_nested():
+            db.add(session)
+        return session.id
+    except IntegrityError:
+        # Паралельний запит цього ж відвідувача вже створив сесію
+        return find_session_id(db, token, gallery_id)
+
+
+def favorite_photo_ids(db: Session, gallery_id: int, user_id: Optional[int] = None,
+                       session_token: Optional[str] = None) -> Set[int]:
+    """Ids of photos in one gallery favorited by a user or a visitor session"""
+    if user_id is not None:
+        query = db.query(UserFavorite.photo_id).filter(
+            UserFavorite.gallery_id == gallery_id,
+            UserFavorite.user_id == user_id
+        )
+    elif session_token:
+        query = db.query(UserFavorite.photo_id).join(VisitorSession).filter(
+            VisitorSession.token == session_token,
+            VisitorSession.gallery_id == gallery_id
+        )
+    else:
+        return set()
+    return {photo_id for (photo_id,) in query}
+
+
+def merge_session_favorites(db: Session, token: str, user_id: int) -> int:
+    """Move the favorites of every visitor session with token to user_id.
+
+    Photos the user already favorited are skipped; the sessions are removed
+    afterwards. Returns the number of favorites moved. Does not commit.
+    """
+    session_ids = [
+        session_id for (session_id,) in db.query(VisitorSession.id).filter(VisitorSession.token == token)
+    ]
+    if not session_ids:
+        return 0
+
+    rows = db.query(UserFavorite.id, UserFavorite.photo_id).filter(
+        UserFavorite.visitor_session_id.in_(session_ids)
+    ).order_by(UserFavorite.id).all()
+    already = {
+        photo_id for (photo_id,) in db.query(UserFavorite.photo_id).filter(
+            UserFavorite.user_id == user_id,
+            UserFavorite.photo_id.in_({row.photo_id for row in rows})
+        )
+    }
+
+    moved_ids = []
+    for row in rows:
+        if row.photo_id not in already:
+            already.add(row.photo_id)
+            moved_ids.append(row.id)
+
+    if moved_ids:
+        db.query(UserFavorite).filter(UserFavorite.id.in_(moved_ids)).update(
+            {UserFavorite.user_id: user_id, UserFavorite.visitor_session_id: None},
+            synchronize_session=False
+        )
+    # Дублікати видаляються явно: SQLite не виконує ON DELETE CASCADE без PRAGMA
+    db.query(UserFavorite).filter(UserFavorite.visitor_session_id.in_(session_ids)).delete(
+        synchronize_session=False
+    )
+    db.query(VisitorSession).filter(VisitorSession.id.in_(session_ids)).delete(synchronize_session=False)
+    return len(moved_ids)
+
+
+def reassign_favorites(db: Session, photo_ids: Iterable[int], gallery_id: int):
+    """Keep favorites of photos moved into gallery_id attached to that gallery.
+
+    Visitor favorites move to the same visitor's session in the new gallery.
+    Does not commit.
+    """
+    photo_ids = list(photo_ids)
+    db.query(UserFavorite).filter(
+        UserFavorite.photo_id.in_(photo_ids),
+        UserFavorite.user_id.isnot(None),
+        UserFavorite.gallery_id != gallery_id
+    ).update({UserFavorite.gallery_id: gallery_id}, synchronize_session=False)
+
+    rows = db.query(UserFavorite.id, VisitorSession.token).join(VisitorSession).filter(
+        UserFavorite.photo_id.in_(photo_ids),
+        UserFavorite.gallery_id != gallery_id
+    ).all()
+    sessions = {token: get_or_create_session_id(db, token, gallery_id) for token in {row.token for row in rows}}
+    bulk_update(db, UserFavorite, [
+        {"id": row.id, "visitor_session_id": sessions[row.token], "gallery_id": gallery_id}
+        for row in rows
+    ])
+
+
+def cleanup_expired_sessions(db: Session, ttl_days: Optional[int] = None, batch: int = CLEANUP_BATCH) -> int:
+    """Delete visitor sessions idle for longer than the TTL, with their favorites.
+
+    Works in batches, committing each one, and returns the number of
+    sessions removed.
+    """
+    ttl_days = settings.VISITOR_SESSION_TTL_DAYS if ttl_days is None else ttl_days
+    cutoff = datetime.now(timezone.utc) - timedelta(days=ttl_days)
+    removed = 0
+    while True:
+        session_ids = [
+            session_id for (session_id,) in db.query(VisitorSession.id).filter(
+                VisitorSession.last_seen_at < cutoff
+            ).limit(batch)
+        ]
+        if not session_ids:
+            break
+        db.query(UserFavorite).filter(UserFavorite.visitor_session_id.in_(session_ids)).delete(
+            synchronize_session=False
+        )
+        db.query(VisitorSession).filter(VisitorSession.id.in_(session_ids)).delete(synchronize_session=False)
+        db.commit()
+        removed += len(session_ids)
+
+    if removed:
+        logger.info("Removed %d visitor sessions idle for more than %d days", removed, ttl_days)
+    return removed